@@ -13,7 +13,7 @@ Plugins(name="XutheringWavesUID", force_prefix=["ww"], allow_empty_prefix=False)
 # 安装 Bot 消息发送 Hook
 from .utils.bot_send_hook import install_bot_hooks
 from .utils.database.waves_subscribe import WavesSubscribe
-from .utils.database.waves_user_activity import WavesUserActivity
+from .utils.database.waves_user_activity import activity_buffer
 from .utils.plugin_checker import is_from_waves_plugin
 
 # 注册 WavesSubscribe 的 hook
@@ -43,10 +43,8 @@ async def waves_user_activity_hook(user_id: str, bot_id: str, bot_self_id: str):
     )
 
     if user_id:
-        try:
-            await WavesUserActivity.update_user_activity(user_id, bot_id, bot_self_id)
-        except Exception as e:
-            logger.warning(f"[XutheringWavesUID] 用户活跃度更新失败: {e}")
+        # 只记录到内存，由定时任务批量写入数据库
+        activity_buffer.record(user_id, bot_id, bot_self_id)
 
 # 安装 hooks 并注册
 install_bot_hooks()
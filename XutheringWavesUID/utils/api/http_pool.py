@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Dict, Tuple, Optional
+
+import httpx
+import aiohttp
+
+from gsuid_core.logger import logger
+
+
+class PoolStats:
+    """连接统计：请求数 / 新建连接数，其余请求复用了已有连接"""
+
+    def __init__(self):
+        self.requests = 0
+        self.opened = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        reused = max(self.requests - self.opened, 0)
+        return {
+            "requests": self.requests,
+            "opened": self.opened,
+            "reused": reused,
+            "reuse_rate": reused / self.requests if self.requests else 0.0,
+        }
+
+
+def _get_pool_config() -> Tuple[int, int, int, int]:
+    """(总连接数, 单 host 连接数, keepalive 秒数, DNS 缓存秒数)"""
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    def _int(key: str, default: int) -> int:
+        try:
+            return max(0, int(WutheringWavesConfig.get_config(key).data))
+        except Exception:
+            return default
+
+    return (
+        _int("HttpPoolLimit", 100),
+        _int("HttpPoolLimitPerHost", 20),
+        _int("HttpKeepAlive", 30),
+        _int("HttpDnsCacheTTL", 300),
+    )
+
+
+class HttpPool:
+    """共享连接池
+
+    库洛 API 使用 aiohttp，上传 / wwapi 使用 httpx，两者都按 (事件循环, 代理/ssl) 复用同一个客户端，
+    避免每次请求都重新建立 TCP / TLS 连接。
+    任务分发器运行在独立线程的事件循环中，客户端不能跨事件循环使用，因此按循环区分。
+    """
+
+    def __init__(self):
+        self._aiohttp: Dict[Tuple[int, str, bool], aiohttp.ClientSession] = {}
+        self._httpx: Dict[Tuple[int, bool], httpx.AsyncClient] = {}
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        self.aiohttp_stats = PoolStats()
+        self.httpx_stats = PoolStats()
+
+    def _loop_key(self) -> int:
+        loop = asyncio.get_running_loop()
+        self._loops[id(loop)] = loop
+        return id(loop)
+
+    # aiohttp
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.aiohttp_stats
+        trace = aiohttp.TraceConfig()
+
+        async def on_request(session, ctx, params):
+            stats.requests += 1
+
+        async def on_create(session, ctx, params):
+            stats.opened += 1
+
+        trace.on_request_start.append(on_request)
+        trace.on_connection_create_end.append(on_create)
+        return trace
+
+    def get_aiohttp_session(self, proxy: Optional[str] = None, ssl: bool = True) -> aiohttp.ClientSession:
+        key = (self._loop_key(), proxy or "no_proxy", ssl)
+        session = self._aiohttp.get(key)
+        if session is not None and not session.closed:
+            return session
+
+        limit, limit_per_host, keepalive, dns_ttl = _get_pool_config()
+        connector = aiohttp.TCPConnector(
+            ssl=ssl,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive or None,
+            ttl_dns_cache=dns_ttl or None,
+            use_dns_cache=dns_ttl > 0,
+            force_close=keepalive == 0,
+        )
+        session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+        self._aiohttp[key] = session
+        return session
+
+    # httpx
+
+    async def _httpx_trace(self, event_name: str, info: Dict[str, Any]):
+        if event_name == "connection.connect_tcp.complete":
+            self.httpx_stats.opened += 1
+
+    async def _httpx_on_request(self, request: httpx.Request):
+        self.httpx_stats.requests += 1
+        request.extensions["trace"] = self._httpx_trace
+
+    def get_httpx_client(self, verify: Any = True) -> httpx.AsyncClient:
+        """共享的 httpx 客户端，不要使用 async with 关闭"""
+        key = (self._loop_key(), verify is True)
+        client = self._httpx.get(key)
+        if client is not None and not client.is_closed:
+            return client
+
+        limit, limit_per_host, keepalive, _ = _get_pool_config()
+        # httpx 不区分 host，上传 / wwapi 都是同一个 host，按单 host 限制
+        max_conn = limit_per_host or limit or None
+        client = httpx.AsyncClient(
+            verify=verify,
+            limits=httpx.Limits(
+                max_connections=max_conn,
+                max_keepalive_connections=max_conn if keepalive else 0,
+                keepalive_expiry=keepalive or None,
+            ),
+            event_hooks={"request": [self._httpx_on_request]},
+        )
+        self._httpx[key] = client
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            "aiohttp": self.aiohttp_stats.snapshot(),
+            "httpx": self.httpx_stats.snapshot(),
+        }
+
+    async def close(self):
+        """关闭当前事件循环中的客户端，其他循环中的客户端投递到所属循环关闭"""
+        current = asyncio.get_running_loop()
+        sessions = list(self._aiohttp.items())
+        clients = list(self._httpx.items())
+        self._aiohttp.clear()
+        self._httpx.clear()
+
+        async def _close(obj):
+            try:
+                if isinstance(obj, aiohttp.ClientSession):
+                    if not obj.closed:
+                        await obj.close()
+                elif not obj.is_closed:
+                    await obj.aclose()
+            except Exception as e:
+                logger.warning(f"[鸣潮] 关闭连接池失败: {e}")
+
+        for (loop_id, *_), obj in [*sessions, *clients]:
+            loop = self._loops.get(loop_id)
+            if loop is None or loop is current:
+                await _close(obj)
+            elif not loop.is_closed() and loop.is_running():
+                fut = asyncio.run_coroutine_threadsafe(_close(obj), loop)
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(fut), timeout=5)
+                except Exception:
+                    pass
+        self._loops.clear()
+
+
+http_pool = HttpPool()
@@ -2,7 +2,6 @@ import json
 import random
 import string
 import asyncio
-import inspect
 from typing import Any, Dict, List, Union, Literal, Mapping, Optional
 
 import aiohttp
@@ -10,7 +9,8 @@ from gsuid_core.logger import logger
 from aiohttp import ClientTimeout, ContentTypeError
 
 from .captcha import get_solver
-from ..util import timed_async_cache
+from .http_pool import http_pool
+from ..util import ttl_async_cache, timed_async_cache
 from .captcha.base import CaptchaResult
 from ..error_reply import WAVES_CODE_999
 from .captcha.errors import CaptchaError
@@ -71,6 +71,49 @@ from .api import (
 )
 
 
+# 接口 url -> 接口名，NeedProxyFunc 配置按接口名决定是否走代理
+PROXY_ROUTES: Dict[str, str] = {
+    ROLE_LIST_URL: "get_kuro_role_list",
+    GAME_DATA_URL: "get_daily_info",
+    REFRESH_URL: "refresh_data",
+    LOGIN_LOG_URL: "login_log",
+    BASE_DATA_URL: "get_base_info",
+    ROLE_DATA_URL: "get_role_info",
+    WIKI_TREE_URL: "get_tree",
+    WIKI_DETAIL_URL: "get_wiki",
+    ROLE_DETAIL_URL: "get_role_detail_info",
+    CALABASH_DATA_URL: "get_calabash_data",
+    EXPLORE_DATA_URL: "get_explore_data",
+    CHALLENGE_DATA_URL: "get_challenge_data",
+    TOWER_DETAIL_URL: "get_abyss_data",
+    TOWER_INDEX_URL: "get_abyss_index",
+    SLASH_INDEX_URL: "get_slash_index",
+    SLASH_DETAIL_URL: "get_slash_detail",
+    MORE_ACTIVITY_URL: "get_more_activity",
+    REQUEST_TOKEN: "get_request_token",
+    CALCULATOR_REFRESH_DATA_URL: "calculator_refresh_data",
+    ONLINE_LIST_ROLE: "get_online_list_role",
+    ONLINE_LIST_WEAPON: "get_online_list_weapon",
+    ONLINE_LIST_PHANTOM: "get_online_list_phantom",
+    OWNED_ROLE_INFO: "get_owned_role_info",
+    ROLE_CULTIVATE_STATUS: "get_develop_role_cultivate_status",
+    BATCH_ROLE_COST: "get_batch_role_cost",
+    PERIOD_LIST_URL: "get_period_list",
+    MONTH_LIST_URL: "get_period_detail",
+    WEEK_LIST_URL: "get_period_detail",
+    VERSION_LIST_URL: "get_period_detail",
+    GACHA_LOG_URL: "get_gacha_log",
+    GACHA_NET_LOG_URL: "get_gacha_log",
+    ANN_LIST_URL: "get_ann_list_by_type",
+    ANN_CONTENT_URL: "get_ann_detail",
+    BBS_LIST: "get_bbs_list",
+    MINE_V2_URL: "get_user_mine_v2",
+    WIKI_HOME_URL: "get_wiki_home",
+    WIKI_ENTRY_DETAIL_URL: "get_entry_detail",
+    LOGIN_URL: "login",
+}
+
+
 def generate_random_jwt_token() -> str:
     chars = string.ascii_letters + string.digits
     payload = "".join(random.choice(chars) for _ in range(58))
@@ -78,6 +121,11 @@ def generate_random_jwt_token() -> str:
     return f"eyJhbGciOiJIUzI1NiJ9.{payload}.{signature}"
 
 
+def _resp_success(resp: Any) -> bool:
+    """只缓存成功的接口结果"""
+    return isinstance(resp, KuroApiResp) and resp.success
+
+
 class WavesApi:
     ssl_verify = True
     ann_map = {}
@@ -86,30 +134,13 @@ class WavesApi:
 
     entry_detail_map = {}
 
-    _sessions: Dict[str, aiohttp.ClientSession] = {}
-    _session_lock = asyncio.Lock()
-
     def __init__(self):
         self.captcha_solver = get_solver()
         if self.captcha_solver:
             logger.success(f"使用过码器: {self.captcha_solver.get_name()}")
 
     async def get_session(self, proxy: Optional[str] = None) -> aiohttp.ClientSession:
-        key = f"{proxy or 'no_proxy'}"
-
-        if key in self._sessions and not self._sessions[key].closed:
-            return self._sessions[key]
-
-        async with self._session_lock:
-            if key in self._sessions and not self._sessions[key].closed:
-                return self._sessions[key]
-
-            session = aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=self.ssl_verify),
-            )
-
-            self._sessions[key] = session
-            return session
+        return http_pool.get_aiohttp_session(proxy=proxy, ssl=self.ssl_verify)
 
     def is_net(self, roleId):
         _temp = int(roleId)
@@ -250,6 +281,7 @@ class WavesApi:
 
         return await self._waves_request(ROLE_LIST_URL, "POST", header, data=data)
 
+    @ttl_async_cache(30, 1024, _resp_success)
     async def get_daily_info(self, roleId: str, token: str, gameId: Union[str, int] = WAVES_GAME_ID):
         """每日"""
         header = await get_base_header()
@@ -296,6 +328,7 @@ class WavesApi:
         data = {}
         return await self._waves_request(LOGIN_LOG_URL, "POST", header, data=data)
 
+    @ttl_async_cache(60, 1024, _resp_success)
     async def get_base_info(self, roleId: str, token: str, serverId: Optional[str] = None):
         header = await get_base_header()
         used_headers = await self.get_used_headers(cookie=token, uid=roleId)
@@ -322,6 +355,7 @@ class WavesApi:
             info = await self._waves_request(BASE_DATA_URL, "POST", header, data=data)
         return info
 
+    @ttl_async_cache(60, 256, _resp_success)
     async def get_role_info(self, roleId: str, token: str, serverId: Optional[str] = None):
         header = await get_base_header()
         used_headers = await self.get_used_headers(cookie=token, uid=roleId)
@@ -389,6 +423,7 @@ class WavesApi:
             role_detail = await self._waves_request(ROLE_DETAIL_URL, "POST", header, data=data)
         return role_detail
 
+    @ttl_async_cache(300, 256, _resp_success)
     async def get_calabash_data(self, roleId: str, token: str, serverId: Optional[str] = None):
         """数据坞"""
         header = await get_base_header()
@@ -416,6 +451,7 @@ class WavesApi:
             calabash_data = await self._waves_request(CALABASH_DATA_URL, "POST", header, data=data)
         return calabash_data
 
+    @ttl_async_cache(300, 256, _resp_success)
     async def get_explore_data(
         self,
         roleId: str,
@@ -450,6 +486,7 @@ class WavesApi:
             explore_data = await self._waves_request(EXPLORE_DATA_URL, "POST", header, data=data)
         return explore_data
 
+    @ttl_async_cache(120, 256, _resp_success)
     async def get_challenge_data(self, roleId: str, token: str, serverId: Optional[str] = None):
         """全息"""
         header = await get_base_header()
@@ -477,6 +514,7 @@ class WavesApi:
             challenge_data = await self._waves_request(CHALLENGE_DATA_URL, "POST", header, data=data)
         return challenge_data
 
+    @ttl_async_cache(120, 256, _resp_success)
     async def get_abyss_data(self, roleId: str, token: str, serverId: Optional[str] = None):
         """深渊"""
         header = await get_base_header()
@@ -503,6 +541,7 @@ class WavesApi:
             abyss_data = await self._waves_request(TOWER_DETAIL_URL, "POST", header, data=data)
         return abyss_data
 
+    @ttl_async_cache(120, 256, _resp_success)
     async def get_abyss_index(self, roleId: str, token: str, serverId: Optional[str] = None):
         """深渊"""
         header = await get_base_header()
@@ -530,6 +569,7 @@ class WavesApi:
             abyss_index = await self._waves_request(TOWER_INDEX_URL, "POST", header, data=data)
         return abyss_index
 
+    @ttl_async_cache(120, 256, _resp_success)
     async def get_slash_index(self, roleId: str, token: str, serverId: Optional[str] = None):
         """冥海"""
         header = await get_base_header()
@@ -557,6 +597,7 @@ class WavesApi:
             slash_index = await self._waves_request(SLASH_INDEX_URL, "POST", header, data=data)
         return slash_index
 
+    @ttl_async_cache(120, 256, _resp_success)
     async def get_slash_detail(self, roleId: str, token: str, serverId: Optional[str] = None):
         """冥海"""
         header = await get_base_header()
@@ -724,6 +765,7 @@ class WavesApi:
         }
         return await self._waves_request(BATCH_ROLE_COST, "POST", header, data=data)
 
+    @ttl_async_cache(600, 256, _resp_success)
     async def get_period_list(
         self,
         roleId: str,
@@ -914,12 +956,16 @@ class WavesApi:
         data: Optional[Dict[str, Any]] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        endpoint: Optional[str] = None,
     ) -> KuroApiResp[Union[str, Dict[str, Any], List[Any]]]:
+        """endpoint: 接口名，用于匹配 NeedProxyFunc 配置，不传时按 PROXY_ROUTES 由 url 查出"""
         if header is None:
             header = await get_base_header()
 
         proxy_func = get_need_proxy_func()
-        if inspect.stack()[1].function in proxy_func or "all" in proxy_func:
+        if endpoint is None:
+            endpoint = PROXY_ROUTES.get(url)
+        if "all" in proxy_func or endpoint in proxy_func:
             proxy_url = get_local_proxy_url()
         else:
             proxy_url = None
@@ -1,48 +1,40 @@
 import copy
 import re
+from functools import lru_cache
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
 from gsuid_core.logger import logger
 
 from .model import CharacterModel
+from .frozen import FrozenResult
+from .lazy_map import LazyJsonMap
 from ..ascension.constant import fixed_name, sum_percentages
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "char"
-char_id_data = {}
-_data_loaded = False
-
-
-def read_char_json_files(directory):
-    global char_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                char_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"read_char_json_files load fail decoding {file}", e)
+char_id_data = LazyJsonMap(MAP_PATH)
 
 
 def ensure_data_loaded(force: bool = False):
     """确保角色数据已加载
 
+    数据按 id 在首次使用时读取，这里只在 force 时丢弃已加载的数据
+
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，下次使用时重新读取所有数据
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_char_json_files(MAP_PATH)
-    _data_loaded = True
+    if force:
+        char_id_data.reset()
+        _cached_char_detail.cache_clear()
+
 
+def invalidate_data():
+    """资源更新后调用，下次使用时重新加载"""
+    char_id_data.reset()
+    _cached_char_detail.cache_clear()
 
-class WavesCharResult:
+
+class WavesCharResult(FrozenResult):
     def __init__(self):
         self.name = ""
         self.starLevel = 4
@@ -120,7 +112,18 @@ def get_char_detail(char_id: Union[str, int], level: int, breach: Union[int, Non
     """
     breach 突破
     resonLevel 精炼
+
+    同一参数的结果只计算一次，返回共享的只读对象，需要修改时先 copy.deepcopy
     """
+    return _cached_char_detail(str(char_id), level, breach)
+
+
+@lru_cache(maxsize=4096)
+def _cached_char_detail(char_id: str, level: int, breach: Union[int, None]) -> WavesCharResult:
+    return _build_char_detail(char_id, level, breach).freeze()
+
+
+def _build_char_detail(char_id: Union[str, int], level: int, breach: Union[int, None] = None) -> WavesCharResult:
     ensure_data_loaded()
     result = WavesCharResult()
     if str(char_id) not in char_id_data:
@@ -177,11 +180,13 @@ def get_char_detail2(role) -> WavesCharResult:
 
 def get_char_id(char_name, loose: bool = False) -> Optional[str]:
     ensure_data_loaded()
+    # 只需要名称，不解析完整数据
+    summaries = char_id_data.summaries()
     if not loose:
-        return next((_id for _id, value in char_id_data.items() if value["name"] == char_name), None)
+        return next((_id for _id, value in summaries.items() if value.name == char_name), None)
     else:
-        for _id, value in char_id_data.items():
-            if char_name in value["name"] or value["name"] in char_name:
+        for _id, value in summaries.items():
+            if char_name in value.name or value.name in char_name:
                 return _id
         return None
 
@@ -1,42 +1,28 @@
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
-from gsuid_core.logger import logger
-
 from .model import EchoModel
+from .lazy_map import LazyJsonMap
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "echo"
-echo_id_data = {}
-_data_loaded = False
-
-
-def read_echo_json_files(directory):
-    global echo_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                echo_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"read_echo_json_files load fail decoding {file}", e)
+echo_id_data = LazyJsonMap(MAP_PATH)
 
 
 def ensure_data_loaded(force: bool = False):
     """确保声骸数据已加载
 
+    数据按 id 在首次使用时读取，这里只在 force 时丢弃已加载的数据
+
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，下次使用时重新读取所有数据
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_echo_json_files(MAP_PATH)
-    _data_loaded = True
+    if force:
+        echo_id_data.reset()
+
+
+def invalidate_data():
+    """资源更新后调用，下次使用时重新加载"""
+    echo_id_data.reset()
 
 
 def get_echo_model(echo_id: Union[int, str]) -> Optional[EchoModel]:
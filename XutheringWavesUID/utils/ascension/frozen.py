@@ -0,0 +1,62 @@
+import copy
+from typing import Any
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("缓存的结果为只读，请先 copy.deepcopy")
+
+
+class FrozenDict(dict):
+    """只读 dict，copy / deepcopy 得到普通 dict"""
+
+    __slots__ = ()
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+def freeze(obj: Any) -> Any:
+    """递归转换为只读结构：dict -> FrozenDict，list -> tuple"""
+    if isinstance(obj, dict):
+        return FrozenDict((k, freeze(v)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+class FrozenResult:
+    """freeze 之后不能再修改属性，可在多个调用方之间共享"""
+
+    _frozen = False
+
+    def __setattr__(self, name: str, value: Any):
+        if self._frozen:
+            raise AttributeError(f"{type(self).__name__} 为只读的缓存结果")
+        object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # copy.deepcopy 得到可修改的副本
+        state = dict(vars(self))
+        state.pop("_frozen", None)
+        return state
+
+    def freeze(self):
+        for name, value in list(vars(self).items()):
+            object.__setattr__(self, name, freeze(value))
+        object.__setattr__(self, "_frozen", True)
+        return self
@@ -0,0 +1,171 @@
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Iterator, Optional
+
+import msgspec
+from msgspec import json as msgjson
+
+from gsuid_core.logger import logger
+
+# 每类数据在内存中保留的已解析条目数量
+DEFAULT_CAPACITY = 128
+
+
+class EntrySummary(msgspec.Struct):
+    """按名称查找时只解析的字段"""
+
+    name: str = ""
+    alias: List[str] = msgspec.field(default_factory=list)
+
+
+class LazyJsonMap:
+    """按 id 延迟加载的 json 数据
+
+    目录下每个 {id}.json 对应一个条目。首次使用时只扫描目录建立 id -> 文件的索引，
+    条目在第一次被访问时才读取解析，解析结果按 LRU 保留 capacity 个，遍历全部条目时不计入 LRU。
+    按名称查找时只解析 name / alias 字段并缓存。
+
+    对外表现为只读的 dict，可直接替换原来模块级的 {id: data}。
+    """
+
+    def __init__(self, directory: Path, capacity: int = DEFAULT_CAPACITY):
+        self.directory = directory
+        self.capacity = capacity
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Path]] = None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._summaries: Optional[Dict[str, EntrySummary]] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    # 索引
+
+    def _get_index(self) -> Dict[str, Path]:
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    index = {}
+                    if self.directory.exists():
+                        for file in self.directory.rglob("*.json"):
+                            index[file.name.split(".")[0]] = file
+                    self._index = index
+                index = self._index
+        return index
+
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def reset(self):
+        """资源更新后调用，下次访问时重新扫描目录"""
+        with self._lock:
+            self._index = None
+            self._entries.clear()
+            self._summaries = None
+
+    # 条目
+
+    def _decode(self, file: Path) -> Any:
+        try:
+            return msgjson.decode(file.read_bytes())
+        except Exception as e:
+            logger.exception(f"LazyJsonMap load fail decoding {file}", e)
+            return None
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        key = str(key)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        index = self._get_index()
+        file = index.get(key)
+        if file is None:
+            return default
+        data = self._decode(file)
+        if data is None:
+            return default
+
+        with self._lock:
+            self.misses += 1
+            if self._index is not index:
+                return data
+            self._entries[key] = data
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return data
+
+    def __getitem__(self, key: Any) -> Any:
+        data = self.get(key)
+        if data is None:
+            raise KeyError(key)
+        return data
+
+    def __contains__(self, key: Any) -> bool:
+        return str(key) in self._get_index()
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._get_index()))
+
+    def keys(self) -> List[str]:
+        return list(self._get_index())
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """遍历全部条目（列表类功能使用）
+
+        已缓存的条目直接使用，其余条目逐个解析但不放入 LRU，以免挤掉伤害计算常用的条目。
+        代价是列表类命令每次都要读取解析全部未缓存的文件（武器、声骸各有一两百个），
+        与原先启动时一次性加载全部数据的解析量相同，只是发生在每次命令中。
+        """
+        index = self._get_index()
+        for key, file in list(index.items()):
+            with self._lock:
+                data = self._entries.get(key)
+            if data is None:
+                data = self._decode(file)
+            if data is not None:
+                yield key, data
+
+    def values(self) -> Iterator[Any]:
+        for _, data in self.items():
+            yield data
+
+    # 名称
+
+    def summaries(self) -> Dict[str, EntrySummary]:
+        """{id: name/alias}，只解析这两个字段"""
+        summaries = self._summaries
+        if summaries is None:
+            summaries = {}
+            index = self._get_index()
+            for key, file in list(index.items()):
+                try:
+                    summaries[key] = msgjson.decode(file.read_bytes(), type=EntrySummary)
+                except Exception:
+                    data = self.get(key)
+                    if isinstance(data, dict):
+                        summaries[key] = EntrySummary(name=str(data.get("name", "")))
+            with self._lock:
+                # 期间被 reset 时不保存旧目录的结果
+                if self._summaries is None and self._index is index:
+                    self._summaries = summaries
+        return summaries
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "ids": len(self._index) if self._index is not None else 0,
+            "decoded": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -5,30 +5,17 @@ from pydantic import Field, BaseModel
 
 from gsuid_core.logger import logger
 
+from .lazy_map import LazyJsonMap
 from ..resource.RESOURCE_PATH import MAP_PATH, MAP_DETAIL_PATH
 
 MAP_PATH_SONATA = MAP_DETAIL_PATH / "sonata"
 SONATA_ID_MAP_PATH = MAP_PATH / "sonata_id.json"
 
-sonata_id_data = {}
+sonata_id_data = LazyJsonMap(MAP_PATH_SONATA)
 sonata_name_to_id = {}  # 中文名称 -> ID 映射
 _data_loaded = False
 
 
-def read_sonata_json_files(directory):
-    global sonata_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                sonata_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"read_char_json_files load fail decoding {file}", e)
-
-
 def load_sonata_name_mapping():
     """加载 sonata_id.json 映射文件"""
     global sonata_name_to_id
@@ -51,13 +38,22 @@ def ensure_data_loaded(force: bool = False):
         force: 如果为 True，强制重新加载所有数据，即使已经加载过
     """
     global _data_loaded
+    if force:
+        sonata_id_data.reset()
     if (_data_loaded and not force) or not MAP_PATH_SONATA.exists():
         return
-    read_sonata_json_files(MAP_PATH_SONATA)
+    # 套装数据按 id 在首次使用时读取，这里只加载名称映射
     load_sonata_name_mapping()
     _data_loaded = True
 
 
+def invalidate_data():
+    """资源更新后调用，下次使用时重新加载"""
+    global _data_loaded
+    sonata_id_data.reset()
+    _data_loaded = False
+
+
 class SonataSet(BaseModel):
     desc: str = Field(default="")
     effect: str = Field(default="")
@@ -1,47 +1,37 @@
 import copy
+from functools import lru_cache
 from typing import Union, Optional
 
-from msgspec import json as msgjson
-
-from gsuid_core.logger import logger
-
 from .model import WeaponModel
+from .frozen import FrozenResult
+from .lazy_map import LazyJsonMap
 from ..ascension.constant import fixed_name
 from ..resource.RESOURCE_PATH import MAP_DETAIL_PATH
 
 MAP_PATH = MAP_DETAIL_PATH / "weapon"
-weapon_id_data = {}
-_data_loaded = False
-
-
-def read_weapon_json_files(directory):
-    global weapon_id_data
-    files = directory.rglob("*.json")
-
-    for file in files:
-        try:
-            with open(file, "r", encoding="utf-8") as f:
-                data = msgjson.decode(f.read())
-                file_name = file.name.split(".")[0]
-                weapon_id_data[file_name] = data
-        except Exception as e:
-            logger.exception(f"read_weapon_json_files load fail decoding {file}", e)
+weapon_id_data = LazyJsonMap(MAP_PATH)
 
 
 def ensure_data_loaded(force: bool = False):
     """确保武器数据已加载
 
+    数据按 id 在首次使用时读取，这里只在 force 时丢弃已加载的数据
+
     Args:
-        force: 如果为 True，强制重新加载所有数据，即使已经加载过
+        force: 如果为 True，下次使用时重新读取所有数据
     """
-    global _data_loaded
-    if (_data_loaded and not force) or not MAP_PATH.exists():
-        return
-    read_weapon_json_files(MAP_PATH)
-    _data_loaded = True
+    if force:
+        weapon_id_data.reset()
+        _cached_weapon_detail.cache_clear()
+
 
+def invalidate_data():
+    """资源更新后调用，下次使用时重新加载"""
+    weapon_id_data.reset()
+    _cached_weapon_detail.cache_clear()
 
-class WavesWeaponResult:
+
+class WavesWeaponResult(FrozenResult):
     def __init__(self):
         self.name: str = ""
         self.starLevel: int = 4
@@ -85,7 +75,23 @@ def get_weapon_detail(
     """
     breach 突破
     resonLevel 精炼
+
+    同一参数的结果只计算一次，返回共享的只读对象，需要修改时先 copy.deepcopy
     """
+    return _cached_weapon_detail(str(weapon_id), level, breach, 1 if resonLevel is None else resonLevel)
+
+
+@lru_cache(maxsize=4096)
+def _cached_weapon_detail(weapon_id: str, level: int, breach: Union[int, None], resonLevel: int) -> WavesWeaponResult:
+    return _build_weapon_detail(weapon_id, level, breach, resonLevel).freeze()
+
+
+def _build_weapon_detail(
+    weapon_id: Union[str, int],
+    level: int,
+    breach: Union[int, None] = None,
+    resonLevel: Union[int, None] = 1,
+) -> WavesWeaponResult:
     ensure_data_loaded()
     result = WavesWeaponResult()
     if str(weapon_id) not in weapon_id_data:
@@ -129,17 +135,19 @@ def get_weapon_detail(
 
 def get_weapon_id(weapon_name, loose: bool = False) -> Optional[str]:
     ensure_data_loaded()
+    # 只需要名称和别名，不解析完整数据
+    summaries = weapon_id_data.summaries()
     if not loose:
         return next(
-            (_id for _id, value in weapon_id_data.items() if value["name"] == weapon_name),
+            (_id for _id, value in summaries.items() if value.name == weapon_name),
             None,
         )
     else:
-        for _id, value in weapon_id_data.items():
-            if value["name"] == weapon_name:
+        for _id, value in summaries.items():
+            if value.name == weapon_name:
                 return _id
-        for _id, value in weapon_id_data.items():
-            for alias in value.get("alias", []):
+        for _id, value in summaries.items():
+            for alias in value.alias:
                 if alias == weapon_name:
                     return _id
     return None
@@ -0,0 +1,197 @@
+import os
+import json
+import asyncio
+import hashlib
+from pathlib import Path
+from datetime import date, datetime
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from gsuid_core.logger import logger
+
+from ..version import XutheringWavesUID_version
+from .resource.RESOURCE_PATH import CARD_CACHE_PATH
+from ..wutheringwaves_config import WutheringWavesConfig
+
+
+def _json_default(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        # 文件内容变化时 mtime/size 随之变化
+        try:
+            st = obj.stat()
+            return f"{obj}:{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if isinstance(obj, bytes):
+        return hashlib.sha256(obj).hexdigest()
+    return repr(obj)
+
+
+def make_card_key(name: str, *inputs: Any) -> str:
+    """由绘制函数/模板名和输入数据生成缓存 key，插件版本变化后全部失效"""
+    h = hashlib.sha256(f"{XutheringWavesUID_version}:{name}".encode())
+    for data in inputs:
+        h.update(b"\0")
+        h.update(json.dumps(data, sort_keys=True, ensure_ascii=False, default=_json_default).encode())
+    return h.hexdigest()
+
+
+class CardCache:
+    """卡片图片缓存
+
+    以输入数据的指纹为 key 缓存最终图片，数据不变时直接返回上次的图片。
+    内存中按 LRU 保留 CardCacheMemMB，磁盘上保留 CardCacheDiskMB，超出后按最近访问时间淘汰。
+    """
+
+    def __init__(self, path: Path = CARD_CACHE_PATH):
+        self.path = path
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+
+        self.mem_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(WutheringWavesConfig.get_config("CardCacheEnable").data)
+
+    @staticmethod
+    def _limit(key: str) -> int:
+        return max(0, int(WutheringWavesConfig.get_config(key).data)) * 1024 * 1024
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.jpg"
+
+    def _remember(self, key: str, data: bytes):
+        limit = self._limit("CardCacheMemMB")
+        if len(data) > limit:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > limit and self._memory:
+            _, v = self._memory.popitem(last=False)
+            self._memory_bytes -= len(v)
+
+    # 磁盘
+
+    def _disk_read(self, key: str) -> Optional[bytes]:
+        path = self._file(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _disk_usage(self) -> int:
+        if self._disk_bytes is None:
+            total = 0
+            for f in self.path.glob("*.jpg"):
+                try:
+                    total += f.stat().st_size
+                except OSError:
+                    pass
+            self._disk_bytes = total
+        return self._disk_bytes
+
+    def _disk_write(self, key: str, data: bytes):
+        limit = self._limit("CardCacheDiskMB")
+        if len(data) > limit:
+            return
+        path = self._file(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._disk_bytes = self._disk_usage() + len(data)
+
+        if self._disk_bytes <= limit:
+            return
+        # 淘汰到上限的 90%，避免频繁扫描目录
+        files = []
+        for f in self.path.glob("*.jpg"):
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        files.sort(key=lambda x: x[0])
+        total = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if total <= limit * 0.9:
+                break
+            try:
+                f.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def _disk_clear(self):
+        for f in self.path.glob("*.jpg"):
+            try:
+                f.unlink()
+            except OSError:
+                pass
+        self._disk_bytes = 0
+
+    # 接口
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled():
+            return None
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.mem_hits += 1
+            return data
+
+        data = await asyncio.to_thread(self._disk_read, key)
+        if data is not None:
+            self.disk_hits += 1
+            self._remember(key, data)
+            return data
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, data: Any):
+        if not self.enabled() or not isinstance(data, bytes) or not data:
+            return
+        self._remember(key, data)
+        try:
+            await asyncio.to_thread(self._disk_write, key, data)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 卡片缓存写入失败: {e}")
+
+    def clear(self):
+        """资源更新后调用，图片素材变化时旧图片作废"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        self._disk_clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.mem_hits + self.disk_hits + self.misses
+        return {
+            "mem_hits": self.mem_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.mem_hits + self.disk_hits) / total if total else 0.0,
+            "mem_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes or 0,
+        }
+
+
+card_cache = CardCache()
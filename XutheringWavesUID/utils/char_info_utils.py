@@ -1,5 +1,6 @@
 import json
-from typing import Any, Dict, Union, Generator
+from typing import Any, Dict, List, Tuple, Union, Optional, Generator
+from collections import OrderedDict
 
 import aiofiles
 
@@ -7,15 +8,96 @@ from gsuid_core.logger import logger
 
 from ..utils.api.model import RoleDetailData
 from .resource.RESOURCE_PATH import PLAYER_PATH
+from ..wutheringwaves_config import WutheringWavesConfig
 
 PATTERN = r"[\u4e00-\u9fa5a-zA-Z0-9\U0001F300-\U0001FAFF\U00002600-\U000027BF\U00002B00-\U00002BFF\U00003200-\U000032FF-—·()（）]{1,15}"
 
+
+class RoleDetailCache:
+    """rawData.json 解析结果的 LRU 缓存
+
+    以 uid 为键，记录文件的 (mtime_ns, size)，文件变化后自动失效。
+    容量同时受条目数和文件总大小限制，文件大小近似代表解析后的内存占用。
+
+    缓存中的 RoleDetailData 由所有调用方共享，不要原地修改，需要修改时先 deepcopy。
+    """
+
+    def __init__(self):
+        self.cache: OrderedDict[str, Tuple[Tuple[int, int], List[RoleDetailData]]] = OrderedDict()
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _limits() -> Tuple[int, int]:
+        maxsize = WutheringWavesConfig.get_config("RolePanelCacheSize").data
+        max_mb = WutheringWavesConfig.get_config("RolePanelCacheMaxMB").data
+        return int(maxsize or 0), int(max_mb or 0) * 1024 * 1024
+
+    def get(self, uid: str, stat: Tuple[int, int]) -> Optional[List[RoleDetailData]]:
+        item = self.cache.get(uid)
+        if item is None or item[0] != stat:
+            self.misses += 1
+            return None
+        self.cache.move_to_end(uid)
+        self.hits += 1
+        return item[1]
+
+    def set(self, uid: str, stat: Tuple[int, int], roles: List[RoleDetailData]):
+        self.delete(uid)
+        maxsize, max_bytes = self._limits()
+        if maxsize <= 0 or max_bytes <= 0 or stat[1] > max_bytes:
+            return
+
+        self.cache[uid] = (stat, roles)
+        self.total_size += stat[1]
+        while self.cache and (len(self.cache) > maxsize or self.total_size > max_bytes):
+            _, (old_stat, _) = self.cache.popitem(last=False)
+            self.total_size -= old_stat[1]
+
+    def delete(self, uid: str):
+        item = self.cache.pop(uid, None)
+        if item is not None:
+            self.total_size -= item[0][1]
+
+    def clear(self):
+        self.cache.clear()
+        self.total_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self.cache),
+            "bytes": self.total_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+role_detail_cache = RoleDetailCache()
+
+
+def invalidate_role_detail_cache(uid: str):
+    """rawData.json 被改写后调用"""
+    role_detail_cache.delete(uid)
+
+
 async def get_all_role_detail_info_list(
     uid: str,
 ) -> Union[Generator[RoleDetailData, Any, None], None]:
     path = PLAYER_PATH / uid / "rawData.json"
-    if not path.exists():
+    try:
+        st = path.stat()
+    except OSError:
+        role_detail_cache.delete(uid)
         return None
+    stat = (st.st_mtime_ns, st.st_size)
+
+    cached = role_detail_cache.get(uid, stat)
+    if cached is not None:
+        return iter(cached)
+
     try:
         async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
             player_data = json.loads(await f.read())
@@ -24,7 +106,9 @@ async def get_all_role_detail_info_list(
         path.unlink(missing_ok=True)
         return None
 
-    return iter(RoleDetailData(**r) for r in player_data)
+    role_details = [RoleDetailData(**r) for r in player_data]
+    role_detail_cache.set(uid, stat, role_details)
+    return iter(role_details)
 
 
 async def get_all_role_detail_info(uid: str) -> Union[Dict[str, RoleDetailData], None]:
@@ -5,10 +5,15 @@ from ...utils.damage.damage import DamageAttribute
 
 class WavesRegister(object):
     _id_cls_map = {}
+    # 未注册的 id 按需加载，返回加载到的类或 None
+    _loader = None
 
     @classmethod
     def find_class(cls, _id):
-        return cls._id_cls_map.get(_id)
+        clz = cls._id_cls_map.get(_id)
+        if clz is None and cls._loader is not None:
+            clz = cls._loader(_id)
+        return clz
 
     @classmethod
     def register_class(cls, _id, _clz):
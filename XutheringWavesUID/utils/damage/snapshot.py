@@ -0,0 +1,124 @@
+import copy
+import types
+import weakref
+from typing import Any, Dict, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# 不可变的值，副本之间直接共享
+_ATOMIC = frozenset(
+    {
+        type(None),
+        type(Ellipsis),
+        type(NotImplemented),
+        int,
+        float,
+        bool,
+        complex,
+        str,
+        bytes,
+        range,
+        frozenset,
+        type,
+        types.FunctionType,
+        types.BuiltinFunctionType,
+        types.CodeType,
+        weakref.ref,
+        property,
+    }
+)
+
+
+def _plain_state(cls: type) -> bool:
+    """状态只保存在 __dict__ 中，且没有自定义复制方式"""
+    # 内置容器的子类还保存了元素，copy.copy 只浅复制元素，交给 deepcopy
+    if issubclass(cls, (dict, list, set, frozenset, tuple)):
+        return False
+    if issubclass(cls, BaseModel):
+        return cls.__deepcopy__ is BaseModel.__deepcopy__
+    return (
+        not any("__slots__" in vars(c) for c in cls.__mro__)
+        and getattr(cls, "__deepcopy__", None) is None
+        and cls.__reduce_ex__ is object.__reduce_ex__
+        and cls.__reduce__ is object.__reduce__
+        and getattr(cls, "__getstate__", None) is getattr(object, "__getstate__", None)
+        and getattr(cls, "__setstate__", None) is None
+    )
+
+
+_plain_cache: Dict[type, bool] = {}
+
+
+def _fork(obj: Any, memo: Dict[int, Any]) -> Any:
+    cls = type(obj)
+    if cls in _ATOMIC:
+        return obj
+
+    oid = id(obj)
+    if oid in memo:
+        return memo[oid]
+
+    if cls is list:
+        if all(type(v) in _ATOMIC for v in obj):
+            new = obj.copy()
+            memo[oid] = new
+            return new
+        new = []
+        memo[oid] = new
+        new.extend([_fork(v, memo) for v in obj])
+        return new
+
+    if cls is dict:
+        if all(type(v) in _ATOMIC for v in obj.values()):
+            new = obj.copy()
+            memo[oid] = new
+            return new
+        new = {}
+        memo[oid] = new
+        for k, v in obj.items():
+            new[k] = _fork(v, memo)
+        return new
+
+    if cls is tuple:
+        if all(type(v) in _ATOMIC for v in obj):
+            return obj
+        new = tuple([_fork(v, memo) for v in obj])
+        # 元素中有引用自身的情况时沿用已生成的副本
+        return memo.setdefault(oid, new)
+
+    if cls is set and all(type(v) in _ATOMIC for v in obj):
+        new = obj.copy()
+        memo[oid] = new
+        return new
+
+    plain = _plain_cache.get(cls)
+    if plain is None:
+        plain = _plain_cache[cls] = hasattr(obj, "__dict__") and _plain_state(cls)
+    if not plain:
+        return copy.deepcopy(obj, memo)
+
+    new = copy.copy(obj)
+    memo[oid] = new
+    state = new.__dict__
+    for k, v in state.items():
+        state[k] = _fork(v, memo)
+    if isinstance(new, BaseModel):
+        for name in ("__pydantic_extra__", "__pydantic_private__"):
+            value = getattr(new, name, None)
+            if value:
+                object.__setattr__(new, name, _fork(value, memo))
+    return new
+
+
+def fork(obj: T) -> T:
+    """生成可独立修改的副本，结果与 copy.deepcopy 相同
+
+    数字、字符串、元组等不可变的值在副本之间共享，只包含不可变值的 list / dict
+    直接整体复制，对象只复制 __dict__，不经过 deepcopy 的逐值分派。
+    有自定义复制方式（__deepcopy__、__reduce__、__getstate__ 等）的对象仍使用 deepcopy。
+
+    用于每条伤害计算前复制 DamageAttribute、修改面板前复制 RoleDetailData。
+    """
+    return _fork(obj, {})
@@ -41,6 +41,7 @@ exec_list.extend(
         "ALTER TABLE WavesUser DROP COLUMN pgr_sign_switch",
         "ALTER TABLE WavesUser DROP COLUMN pgr_uid",
         "DELETE FROM WavesStaminaRecord WHERE id NOT IN (SELECT MAX(id) FROM WavesStaminaRecord GROUP BY user_id, bot_id, uid)",
+        "CREATE INDEX IF NOT EXISTS ix_WavesUserActivity_user_bot ON WavesUserActivity (user_id, bot_id, bot_self_id)",
     ]
 )
 
@@ -582,6 +583,66 @@ class WavesStaminaRecord(BaseModel, table=True):
         )
         return True
 
+    @classmethod
+    @with_session
+    async def get_stamina_push_records(
+        cls: Type[T_WavesStaminaRecord],
+        session: AsyncSession,
+    ) -> List[T_WavesStaminaRecord]:
+        """获取开启体力推送且 CK 未失效的记录"""
+        sql = select(cls).where(
+            and_(
+                cls.stamina_push_switch != "off",
+                cls.stamina_push_switch != "",
+                or_(col(cls.is_ck_valid).is_(None), col(cls.is_ck_valid).is_(True)),
+            )
+        )
+        result = await session.execute(sql)
+        return list(result.scalars().all())
+
+    @classmethod
+    @with_session
+    async def set_stamina_push(
+        cls: Type[T_WavesStaminaRecord],
+        session: AsyncSession,
+        user_id: str,
+        bot_id: str,
+        bot_self_id: str,
+        uid: str,
+        switch: str,
+        threshold: Optional[int] = None,
+    ) -> bool:
+        """设置体力推送开关和阈值，记录不存在时创建"""
+        sql = select(cls).where(
+            and_(
+                cls.user_id == user_id,
+                cls.bot_id == bot_id,
+                cls.uid == uid,
+            )
+        )
+        result = await session.execute(sql)
+        record = result.scalars().first()
+
+        if record:
+            record.bot_self_id = bot_self_id
+            record.stamina_push_switch = switch
+            if threshold is not None:
+                record.stamina_threshold = threshold
+            session.add(record)
+            return True
+
+        session.add(
+            cls(
+                user_id=user_id,
+                bot_id=bot_id,
+                bot_self_id=bot_self_id,
+                uid=uid,
+                stamina_push_switch=switch,
+                stamina_threshold=threshold,
+            )
+        )
+        return True
+
     @classmethod
     @with_session
     async def delete_by_uid(
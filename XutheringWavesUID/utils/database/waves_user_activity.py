@@ -1,14 +1,22 @@
-from typing import Any, Dict, Optional, Type, TypeVar
+import time
+import asyncio
+from typing import Any, Dict, List, Type, Tuple, TypeVar, Iterable, Optional
 
 from sqlmodel import Field, select
-from sqlalchemy import update
+from sqlalchemy import insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import and_, or_
 
+from gsuid_core.logger import logger
 from gsuid_core.utils.database.base_models import BaseBotIDModel, with_session
 
 T_WavesUserActivity = TypeVar("T_WavesUserActivity", bound="WavesUserActivity")
 
+# (user_id, bot_id, bot_self_id)
+ActivityKey = Tuple[str, str, str]
+# 批量写入时每次查询的 user_id 数量（SQLite 变量数量限制）
+FLUSH_QUERY_CHUNK = 500
+
 
 class WavesUserActivity(BaseBotIDModel, table=True):
     """用户活跃度记录表
@@ -44,8 +52,6 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         Returns:
             bool: 是否成功更新
         """
-        import time
-
         current_time = int(time.time())
 
         # 查询现有记录（新字段）
@@ -91,6 +97,77 @@ class WavesUserActivity(BaseBotIDModel, table=True):
 
         return True
 
+    @classmethod
+    @with_session
+    async def bulk_update_activity(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        records: Dict[ActivityKey, int],
+    ) -> int:
+        """批量写入活跃时间，在同一个事务中完成
+
+        按 user_id 一次查出已有记录（包括旧格式记录），已有记录只在时间更新时修改，
+        其余的新建。
+
+        Args:
+            records: {(user_id, bot_id, bot_self_id): 活跃时间戳}
+
+        Returns:
+            int: 新建的记录数量
+        """
+        if not records:
+            return 0
+
+        user_ids = list({key[0] for key in records})
+        rows: List[T_WavesUserActivity] = []
+        for i in range(0, len(user_ids), FLUSH_QUERY_CHUNK):
+            sql = select(cls).where(cls.user_id.in_(user_ids[i : i + FLUSH_QUERY_CHUNK]))
+            result = await session.execute(sql)
+            rows.extend(result.scalars().all())
+
+        existing: Dict[ActivityKey, T_WavesUserActivity] = {}
+        # 兼容旧数据：bot_id 里存的是 bot_self_id，且 bot_self_id 为空
+        legacy: Dict[Tuple[str, str], T_WavesUserActivity] = {}
+        for row in rows:
+            if row.bot_self_id:
+                existing.setdefault((row.user_id, row.bot_id, row.bot_self_id), row)
+            else:
+                legacy.setdefault((row.user_id, row.bot_id), row)
+                existing.setdefault((row.user_id, row.bot_id, ""), row)
+
+        new_rows: Dict[ActivityKey, int] = {}
+        for (user_id, bot_id, bot_self_id), active_time in records.items():
+            record = existing.get((user_id, bot_id, bot_self_id))
+            if record is not None and not bot_self_id:
+                legacy.pop((user_id, bot_id), None)
+            elif record is None and bot_self_id:
+                record = legacy.pop((user_id, bot_self_id), None)
+                if record is not None:
+                    record.bot_id = bot_id
+                    record.bot_self_id = bot_self_id
+                    existing[(user_id, bot_id, bot_self_id)] = record
+            if record is None:
+                new_rows[(user_id, bot_id, bot_self_id)] = active_time
+                continue
+            if record.last_active_time is None or record.last_active_time < active_time:
+                record.last_active_time = active_time
+                session.add(record)
+
+        if new_rows:
+            await session.execute(
+                insert(cls),
+                [
+                    {
+                        "user_id": user_id,
+                        "bot_id": bot_id,
+                        "bot_self_id": bot_self_id,
+                        "last_active_time": active_time,
+                    }
+                    for (user_id, bot_id, bot_self_id), active_time in new_rows.items()
+                ],
+            )
+        return len(new_rows)
+
     @classmethod
     @with_session
     async def get_user_last_active_time(
@@ -109,6 +186,11 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         Returns:
             Optional[int]: 最后活跃时间戳，不存在返回 None
         """
+        # 尚未写入数据库的活跃时间一定是最新的
+        buffered = activity_buffer.get(user_id, bot_id, bot_self_id)
+        if buffered is not None:
+            return buffered
+
         sql = select(cls).where(
             and_(
                 cls.user_id == user_id,
@@ -133,6 +215,61 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         legacy = legacy_result.scalars().first()
         return legacy.last_active_time if legacy else None
 
+    @classmethod
+    @with_session
+    async def get_last_active_times(
+        cls: Type[T_WavesUserActivity],
+        session: AsyncSession,
+        keys: Iterable[ActivityKey],
+    ) -> Dict[ActivityKey, int]:
+        """批量获取用户最后活跃时间
+
+        与 get_user_last_active_time 结果相同，但所有用户只查询一次，
+        尚未写入数据库的活跃时间优先。
+
+        Args:
+            keys: {(user_id, bot_id, bot_self_id)}
+
+        Returns:
+            Dict[ActivityKey, int]: 有记录的用户的最后活跃时间戳
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        user_ids = list({key[0] for key in keys})
+        # 旧数据的 bot_id 存的是 bot_self_id
+        bot_ids = list({key[1] for key in keys} | {key[2] for key in keys})
+        exact: Dict[ActivityKey, int] = {}
+        legacy: Dict[Tuple[str, str], int] = {}
+        for i in range(0, len(user_ids), FLUSH_QUERY_CHUNK):
+            sql = select(cls.user_id, cls.bot_id, cls.bot_self_id, cls.last_active_time).where(
+                and_(
+                    cls.user_id.in_(user_ids[i : i + FLUSH_QUERY_CHUNK]),
+                    cls.bot_id.in_(bot_ids),
+                    cls.last_active_time.is_not(None),
+                )
+            )
+            result = await session.execute(sql)
+            for user_id, bot_id, bot_self_id, last_active_time in result.all():
+                if bot_self_id:
+                    exact.setdefault((user_id, bot_id, bot_self_id), last_active_time)
+                else:
+                    legacy.setdefault((user_id, bot_id), last_active_time)
+                    exact.setdefault((user_id, bot_id, ""), last_active_time)
+
+        times: Dict[ActivityKey, int] = {}
+        for key in keys:
+            user_id, bot_id, bot_self_id = key
+            active_time = activity_buffer.get(user_id, bot_id, bot_self_id)
+            if active_time is None:
+                active_time = exact.get(key)
+            if active_time is None and bot_self_id:
+                active_time = legacy.get((user_id, bot_self_id))
+            if active_time is not None:
+                times[key] = active_time
+        return times
+
     @classmethod
     @with_session
     async def get_active_user_count(
@@ -148,7 +285,7 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         Returns:
             int: 活跃用户数量
         """
-        import time
+        await activity_buffer.flush()
 
         current_time = int(time.time())
         threshold_time = current_time - (active_days * 24 * 60 * 60)
@@ -184,8 +321,6 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         Returns:
             bool: 是否活跃
         """
-        import time
-
         last_active_time = await cls.get_user_last_active_time(user_id, bot_id, bot_self_id)
         if last_active_time is None:
             return False
@@ -194,3 +329,50 @@ class WavesUserActivity(BaseBotIDModel, table=True):
         threshold_time = current_time - (active_days * 24 * 60 * 60)
 
         return last_active_time >= threshold_time
+
+
+class ActivityBuffer:
+    """用户活跃时间写入缓冲
+
+    发送消息时只在内存中记录每个 (user_id, bot_id, bot_self_id) 的最后活跃时间，
+    由定时任务和关闭时的 flush 批量写入数据库，发送消息的路径上不访问数据库。
+    """
+
+    def __init__(self):
+        self._pending: Dict[ActivityKey, int] = {}
+        self._lock = asyncio.Lock()
+
+        self.recorded = 0
+        self.flushed = 0
+
+    def record(self, user_id: str, bot_id: str, bot_self_id: str, active_time: Optional[int] = None):
+        self._pending[(user_id, bot_id, bot_self_id)] = active_time or int(time.time())
+        self.recorded += 1
+
+    def get(self, user_id: str, bot_id: str, bot_self_id: str) -> Optional[int]:
+        return self._pending.get((user_id, bot_id, bot_self_id))
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """写入缓冲中的活跃时间，返回写入的记录数量"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                await WavesUserActivity.bulk_update_activity(pending)
+            except Exception as e:
+                # 放回缓冲，下次再写入，期间更新过的保留较新的时间
+                for key, active_time in pending.items():
+                    if self._pending.get(key, 0) < active_time:
+                        self._pending[key] = active_time
+                logger.warning(f"[鸣潮] 用户活跃度写入失败，{len(pending)} 条将在下次重试: {e}")
+                return 0
+            self.flushed += len(pending)
+            logger.debug(f"[鸣潮] 已写入 {len(pending)} 条用户活跃度")
+            return len(pending)
+
+
+activity_buffer = ActivityBuffer()
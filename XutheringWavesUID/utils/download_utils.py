@@ -6,6 +6,8 @@ from pathlib import Path
 
 from gsuid_core.logger import logger
 
+from .resource.resource_sync import file_state, file_sha256
+
 
 def count_files(directory: Path, pattern: str = "*") -> int:
     """统计目录下指定模式的文件数量"""
@@ -18,16 +20,14 @@ def get_file_hash(file_path):
     """计算单个文件的哈希值"""
     hash_md5 = hashlib.md5()
     with open(file_path, "rb") as f:
-        hash_md5.update(f.read())
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hash_md5.update(chunk)
     return hash_md5.hexdigest()
 
 
 def get_file_hash_sha256(file_path):
     """计算单个文件的 SHA256 哈希值"""
-    hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        hash_sha256.update(f.read())
-    return hash_sha256.hexdigest()
+    return file_sha256(file_path)
 
 
 def check_file_hash(path: Path) -> bool:
@@ -50,7 +50,8 @@ def check_file_hash(path: Path) -> bool:
 
             if filename in hash_data:
                 try:
-                    file_hash = get_file_hash_sha256(file)
+                    # 大小和 mtime 未变化时使用记录的哈希
+                    file_hash = file_state.sha256(file)
                     expected_hash = hash_data[filename]
 
                     if file_hash != expected_hash:
@@ -89,7 +90,7 @@ def copy_if_different(src, dst, name, soft=False):
                 needs_update = True
                 break
 
-            if get_file_hash(src_file) != get_file_hash(dst_file):
+            if file_state.sha256(src_file) != file_state.sha256(dst_file):
                 needs_update = True
                 break
 
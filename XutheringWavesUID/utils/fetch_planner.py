@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Dict, TypeVar, Hashable, Optional, Callable, Awaitable
+
+from .waves_api import waves_api
+from ..wutheringwaves_config import WutheringWavesConfig
+
+T = TypeVar("T")
+
+
+class FetchPlanner:
+    """单条命令内的请求计划
+
+    多 UID 的命令开始时一次性发起所有 UID 的请求，接口请求共用一个信号量限制并发；
+    CK（get_self_waves_ck 内含登录校验和刷新两次请求）、头像等数据在命令内只获取一次。
+    每个 UID 的数据就绪后即可开始绘制，绘制与其余 UID 的网络请求重叠进行。
+    """
+
+    def __init__(self, user_id: str, bot_id: str, concurrency: Optional[int] = None):
+        self.user_id = user_id
+        self.bot_id = bot_id
+        if concurrency is None:
+            concurrency = WutheringWavesConfig.get_config("MultiUidConcurrency").data
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._shared: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """在并发限制内调用接口"""
+        async with self._sem:
+            return await func(*args, **kwargs)
+
+    def shared(self, key: Hashable, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+        """同一 key 在命令内只执行一次，之后的调用等待同一个结果"""
+        fut = self._shared.get(key)
+        if fut is None:
+            fut = self._shared[key] = asyncio.ensure_future(func(*args, **kwargs))
+        return fut
+
+    def get_ck(self, uid: str) -> "asyncio.Future[Optional[str]]":
+        return self.shared(
+            ("ck", uid),
+            self.call,
+            waves_api.get_self_waves_ck,
+            uid,
+            self.user_id,
+            self.bot_id,
+        )
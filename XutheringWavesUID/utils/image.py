@@ -226,19 +226,24 @@ async def get_role_pile_with_path(
         return False, Image.open(path).convert("RGBA"), path
     return False, Image.open(ROLE_PILE_PATH / "role_pile_1503.png").convert("RGBA"), None
 
-async def get_role_pile_default(resource_id: Union[int, str], custom: bool = False) -> Image.Image:
+def get_role_pile_default_path(resource_id: Union[int, str], custom: bool = False) -> Path:
+    """选出 get_role_pile_default 使用的图片，自定义图片随机选取"""
     if custom:
         custom_dir = f"{CUSTOM_MR_CARD_PATH}/{resource_id}"
         if os.path.isdir(custom_dir) and len(os.listdir(custom_dir)) > 0:
             path = _random_image_from_dir(custom_dir)
             if path:
-                return Image.open(f"{custom_dir}/{path}").convert("RGBA")
+                return Path(custom_dir) / path
 
     name = f"role_pile_{resource_id}.png"
     path = ROLE_PILE_PATH / name
     if not os.path.exists(path):
         path = ROLE_PILE_PATH / "role_pile_1503.png"
-    return Image.open(path).convert("RGBA")
+    return path
+
+
+async def get_role_pile_default(resource_id: Union[int, str], custom: bool = False) -> Image.Image:
+    return Image.open(get_role_pile_default_path(resource_id, custom)).convert("RGBA")
 
 
 async def get_square_avatar(resource_id: Union[int, str]) -> Image.Image:
@@ -337,6 +342,19 @@ def get_custom_waves_bg(  # 不是所有地方都适合替换为custom，函数
     return img
 
 
+def get_custom_waves_bg_inputs() -> tuple:
+    """影响 get_custom_waves_bg 结果的配置，用于卡片缓存 key"""
+    bg_path = None
+    if ShowConfig.get_config("CardBg").data:
+        bg_path = Path(ShowConfig.get_config("CardBgPath").data)
+    return (
+        bg_path,
+        ShowConfig.get_config("BlurRadius").data,
+        ShowConfig.get_config("BlurBrightness").data,
+        ShowConfig.get_config("BlurContrast").data,
+    )
+
+
 def get_crop_waves_bg(w: int, h: int, bg: str = "bg") -> Image.Image:
     img = Image.open(TEXT_PATH / f"{bg}.jpg").convert("RGBA")
 
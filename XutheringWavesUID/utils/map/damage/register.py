@@ -1,4 +1,8 @@
+import sys
+import threading
 import importlib
+import importlib.util
+from functools import partial
 
 from gsuid_core.logger import logger
 
@@ -57,37 +61,55 @@ ID_MAPPING = {
 
 IMPORT_WARNING_SHOWN = False
 
-def _dynamic_load_and_register(attr_name, register_cls, force_reload=False):
+_load_lock = threading.RLock()
+# 资源更新后需要重新加载的计算模块
+_stale_modules = set()
+
+
+def _load_one(char_id, attr_name, register_cls):
+    """首次查找某个角色时才导入对应的计算模块并注册"""
     global IMPORT_WARNING_SHOWN
-    current_globals = globals()
-    for char_id, module_suffix in ID_MAPPING.items():
-        module_path = f"..waves_build.damage_{module_suffix}"
+    char_id = str(char_id)
+    module_suffix = ID_MAPPING.get(char_id)
+    if module_suffix is None:
+        return None
+
+    module_path = f"..waves_build.damage_{module_suffix}"
+    with _load_lock:
+        target_obj = register_cls._id_cls_map.get(char_id)
+        if target_obj is not None:
+            return target_obj
         try:
             module = importlib.import_module(module_path, package=__package__)
-            if force_reload:
-                importlib.reload(module)
-            if not hasattr(module, attr_name):
-                continue
-
-            target_obj = getattr(module, attr_name)
-            register_cls.register_class(char_id, target_obj)
-            global_var_name = f"{attr_name.split('_')[0]}_{char_id}"
-            current_globals[global_var_name] = target_obj
-
+            if module.__name__ in _stale_modules:
+                module = importlib.reload(module)
+                _stale_modules.discard(module.__name__)
         except ImportError:
             if not IMPORT_WARNING_SHOWN:
-                logger.warning(f"[Warning] 计算模块未找到，请观察下载是否进行，并等待下载完成后再进行其他操作，除非遇到下载问题。")
+                logger.warning("[Warning] 计算模块未找到，请观察下载是否进行，并等待下载完成后再进行其他操作，除非遇到下载问题。")
                 IMPORT_WARNING_SHOWN = True
+            return None
         except Exception as e:
             logger.warning(f"[Warning] Failed to load {module_path} for {char_id}: {e}")
+            return None
 
-
-def register_damage(reload=False):
-    _dynamic_load_and_register(attr_name="damage_detail", register_cls=DamageDetailRegister, force_reload=reload)
+        target_obj = getattr(module, attr_name, None)
+        if target_obj is None:
+            return None
+        register_cls.register_class(char_id, target_obj)
+        globals()[f"{attr_name.split('_')[0]}_{char_id}"] = target_obj
+        return target_obj
 
 
-def register_rank(reload=False):
-    _dynamic_load_and_register(attr_name="rank", register_cls=DamageRankRegister, force_reload=reload)
+def reset_damage_register():
+    """清空已注册的计算模块，之后按角色首次使用时重新加载"""
+    prefix = importlib.util.resolve_name("..waves_build.damage_", __package__)
+    with _load_lock:
+        _stale_modules.update(name for name in list(sys.modules) if name.startswith(prefix))
+        DamageDetailRegister._id_cls_map.clear()
+        DamageRankRegister._id_cls_map.clear()
+    DamageDetailRegister._loader = partial(_load_one, attr_name="damage_detail", register_cls=DamageDetailRegister)
+    DamageRankRegister._loader = partial(_load_one, attr_name="rank", register_cls=DamageRankRegister)
 
 
 def reload_all_register():
@@ -100,8 +122,8 @@ def reload_all_register():
     register_weapon()
     register_echo()
 
-    register_damage(reload=True)
-    register_rank(reload=True)
+    # 约 50 个计算模块在首次使用对应角色时再导入
+    reset_damage_register()
 
     register_char()
 
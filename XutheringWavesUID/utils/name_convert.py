@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Callable, Optional
 
 from msgspec import json as msgjson
 
@@ -28,10 +28,97 @@ sonata_alias_data: Dict[str, List[str]] = {}
 echo_alias_data: Dict[str, List[str]] = {}
 char_id_data: Dict[str, Dict[str, str]] = {}
 id2name: Dict[str, str] = {}
+# id2name 的反向索引，同名时保留最先出现的 id
+name2id: Dict[str, str] = {}
 
 _data_loaded = False
 
 
+def _substrings(text: str):
+    n = len(text)
+    return {text[i:j] for i in range(n + 1) for j in range(i, n + 1)}
+
+
+class AliasIndex:
+    """别名查找索引
+
+    原先的查找按字典顺序逐个比较名称和别名，这里预先建立 名称/子串 -> 序号 的映射，
+    查找时取序号最小的命中项，结果与按顺序遍历一致。
+    名称都很短，子串数量有限，直接用哈希表保存全部子串。
+
+    Args:
+        data: {标准名: [别名]}
+        normalize: 建索引和查找前对名称的处理
+        alias_substrings: 是否为别名建立子串索引
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, List[str]],
+        normalize: Optional[Callable[[str], str]] = None,
+        alias_substrings: bool = False,
+    ):
+        self.keys = list(data.keys())
+        self.normalize = normalize
+        # 标准名或别名完全相同
+        self.exact: Dict[str, int] = {}
+        # 标准名的子串
+        self.key_sub: Dict[str, int] = {}
+        # 别名的子串
+        self.alias_sub: Dict[str, int] = {}
+
+        for idx, (key, aliases) in enumerate(data.items()):
+            key = self._norm(key)
+            self.exact.setdefault(key, idx)
+            for sub in _substrings(key):
+                self.key_sub.setdefault(sub, idx)
+            for alias in aliases:
+                alias = self._norm(alias)
+                self.exact.setdefault(alias, idx)
+                if alias_substrings and alias:
+                    for sub in _substrings(alias):
+                        self.alias_sub.setdefault(sub, idx)
+
+    def _norm(self, name: str) -> str:
+        return self.normalize(name) if self.normalize else name
+
+    def first(self, name: str, exact: bool = False, in_key: bool = False, in_alias: bool = False) -> Optional[str]:
+        """返回启用的匹配方式中最靠前的标准名"""
+        name = self._norm(name)
+        hits = []
+        if exact:
+            hits.append(self.exact.get(name))
+        if in_key:
+            hits.append(self.key_sub.get(name))
+        if in_alias:
+            hits.append(self.alias_sub.get(name))
+        hits = [i for i in hits if i is not None]
+        return self.keys[min(hits)] if hits else None
+
+    def is_name(self, name: str) -> bool:
+        return self._norm(name) in self.exact
+
+
+char_alias_index = AliasIndex({})
+weapon_alias_index = AliasIndex({})
+sonata_alias_index = AliasIndex({})
+echo_alias_index = AliasIndex({})
+
+
+def _strip_suit(name: str) -> str:
+    # 合鸣名称的“套”字可省略
+    return name.rstrip("套")
+
+
+def build_alias_index():
+    """别名数据变化后重建索引"""
+    global char_alias_index, weapon_alias_index, sonata_alias_index, echo_alias_index
+    char_alias_index = AliasIndex(char_alias_data)
+    weapon_alias_index = AliasIndex(weapon_alias_data)
+    sonata_alias_index = AliasIndex(sonata_alias_data, normalize=_strip_suit, alias_substrings=True)
+    echo_alias_index = AliasIndex(echo_alias_data, alias_substrings=True)
+
+
 def add_dictionaries(dict1, dict2):
     all_keys = set(dict1.keys()) | set(dict2.keys())
     return {key: list(set(dict1.get(key, []) + dict2.get(key, []))) for key in all_keys}
@@ -111,6 +198,8 @@ def load_alias_data():
     with open(CUSTOM_ECHO_ALIAS_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(echo_alias_data, indent=2, ensure_ascii=False))
 
+    build_alias_index()
+
 
 def ensure_data_loaded(force: bool = False):
     """确保所有数据已加载
@@ -118,7 +207,7 @@ def ensure_data_loaded(force: bool = False):
     Args:
         force: 如果为 True，强制重新加载所有数据，即使已经加载过
     """
-    global _data_loaded, char_id_data, id2name
+    global _data_loaded, char_id_data, id2name, name2id
 
     if _data_loaded and not force:
         return
@@ -161,48 +250,42 @@ def ensure_data_loaded(force: bool = False):
     with open(CUSTOM_ID2NAME_PATH, "w", encoding="UTF-8") as f:
         f.write(json.dumps(id2name, indent=2, ensure_ascii=False))
 
+    _name2id: Dict[str, str] = {}
+    for id, name in id2name.items():
+        _name2id.setdefault(name, id)
+    name2id = _name2id
+
     _data_loaded = True
 
 
+def _find_char(char_name: str) -> Optional[str]:
+    # 先完全匹配标准名和别名，再模糊匹配标准名
+    return char_alias_index.first(char_name, exact=True) or char_alias_index.first(char_name, in_key=True)
+
+
 def alias_to_char_name(char_name: str) -> str:
     ensure_data_loaded()
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return char_name
+    return _find_char(char_name) or char_name
 
 
 def is_valid_char_name(char_name: str) -> bool:
     ensure_data_loaded()
-    all_names = set(char_alias_data.keys()) | {alias for aliases in char_alias_data.values() for alias in aliases}
-    return char_name in sorted(all_names, key=len, reverse=True)
+    return char_alias_index.is_name(char_name)
 
 
 def alias_to_char_name_optional(char_name: Optional[str]) -> Optional[str]:
     ensure_data_loaded()
     if not char_name:
         return None
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return key
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return i
-    return None
+    return _find_char(char_name)
 
 
 def alias_to_char_name_list(char_name: str) -> List[str]:
     ensure_data_loaded()
-    for key, aliases in char_alias_data.items():
-        if char_name == key or char_name in aliases:
-            return aliases
-    for i in char_alias_data:
-        if (char_name in i) or (char_name in char_alias_data[i]):
-            return char_alias_data[i]
-    return []
+    key = _find_char(char_name)
+    if key is None:
+        return []
+    return char_alias_data[key]
 
 
 def char_id_to_char_name(char_id: str) -> Optional[str]:
@@ -217,84 +300,51 @@ def char_id_to_char_name(char_id: str) -> Optional[str]:
 def char_name_to_char_id(char_name: str) -> Optional[str]:
     ensure_data_loaded()
     char_name = alias_to_char_name(char_name)
-    for id, name in id2name.items():
-        if char_name == name:
-            from .resource.constant import SPECIAL_CHAR_RANK_MAP
-            mapped_id = SPECIAL_CHAR_RANK_MAP.get(id, id)
-            return mapped_id
-    else:
+    id = name2id.get(char_name)
+    if id is None:
         return None
+    from .resource.constant import SPECIAL_CHAR_RANK_MAP
+
+    return SPECIAL_CHAR_RANK_MAP.get(id, id)
 
 
 def alias_to_weapon_name(weapon_name: str) -> str:
     ensure_data_loaded()
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
+    name = weapon_alias_index.first(weapon_name, exact=True, in_key=True)
+    if name:
+        return name
 
     if "专武" in weapon_name:
         char_name = weapon_name.replace("专武", "")
         name = alias_to_char_name(char_name)
         weapon_name = f"{name}专武"
 
-    for i in weapon_alias_data:
-        if (weapon_name in i) or (weapon_name in weapon_alias_data[i]):
-            return i
-
-    return weapon_name
+    return weapon_alias_index.first(weapon_name, exact=True, in_key=True) or weapon_name
 
 
 def weapon_name_to_weapon_id(weapon_name: str) -> Optional[str]:
     ensure_data_loaded()
     weapon_name = alias_to_weapon_name(weapon_name)
-    for id, name in id2name.items():
-        if weapon_name == name:
-            return id
-    else:
-        return None
+    return name2id.get(weapon_name)
 
 
 def alias_to_sonata_name(sonata_name: str | None) -> str | None:
     ensure_data_loaded()
     if sonata_name is None:
         return None
-    # Remove "套" character to make it optional
-    normalized_sonata_name = sonata_name.rstrip('套')
-    for i in sonata_alias_data:
-        # Check if normalized input matches the key (with "套" stripped)
-        normalized_key = i.rstrip('套')
-        if normalized_sonata_name in normalized_key:
-            return i
-        # Check if normalized input matches any alias (with "套" stripped)
-        for alias in sonata_alias_data[i]:
-            if normalized_sonata_name in alias.rstrip('套'):
-                return i
-    return None
+    # 索引中的名称已去掉“套”字，输入可省略“套”
+    return sonata_alias_index.first(sonata_name, in_key=True, in_alias=True)
 
 
 def alias_to_echo_name(echo_name: str) -> str:
     ensure_data_loaded()
-    for i, j in echo_alias_data.items():
-        if echo_name == i:
-            return i
-        if echo_name in j:
-            return i
-        for k in j:
-            if k and echo_name in k:
-                return i
-        if echo_name in i:
-            return i
-    return echo_name
+    return echo_alias_index.first(echo_name, exact=True, in_key=True, in_alias=True) or echo_name
 
 
 def echo_name_to_echo_id(echo_name: str) -> Optional[str]:
     ensure_data_loaded()
     echo_name = alias_to_echo_name(echo_name)
-    for id, name in id2name.items():
-        if echo_name == name:
-            return id
-    else:
-        return None
+    return name2id.get(echo_name)
 
 
 def easy_id_to_name(id: str, default: str = "") -> str:
@@ -0,0 +1,192 @@
+import json
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple, Union, Iterable, Optional
+
+import aiofiles
+
+from gsuid_core.logger import logger
+
+from .resource.RESOURCE_PATH import PLAYER_PATH, PANEL_STORE_PATH
+
+# rawData.json 的 (mtime_ns, size)，用于判断索引是否过期
+FileStat = Tuple[int, int]
+
+
+class PanelStore:
+    """角色面板索引库
+
+    以 (uid, role_id) 为主键保存 rawData.json 中每个角色的数据，
+    排行等只需要单个角色的场景按索引读取一行即可，无需解析整个 rawData.json。
+
+    rawData.json 仍是权威数据，索引库记录写入时的文件 mtime/size，
+    不一致（如被外部修改、旧数据未建立索引）时从文件重建该 uid 的索引。
+    """
+
+    def __init__(self, path=PANEL_STORE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS panel_role (
+                    uid TEXT NOT NULL,
+                    role_id INTEGER NOT NULL,
+                    pos INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (uid, role_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS panel_meta (
+                    uid TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _replace(self, uid: str, roles: List[Dict[str, Any]], stat: FileStat):
+        rows = []
+        for pos, r in enumerate(roles):
+            try:
+                rows.append((uid, int(r["role"]["roleId"]), pos, json.dumps(r, ensure_ascii=False)))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute("DELETE FROM panel_role WHERE uid = ?", (uid,))
+                conn.executemany(
+                    "INSERT OR REPLACE INTO panel_role (uid, role_id, pos, data) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO panel_meta (uid, mtime_ns, size) VALUES (?, ?, ?)",
+                    (uid, stat[0], stat[1]),
+                )
+
+    def _remove(self, uid: str):
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute("DELETE FROM panel_role WHERE uid = ?", (uid,))
+                conn.execute("DELETE FROM panel_meta WHERE uid = ?", (uid,))
+
+    def _query(self, uid: str, role_ids: List[int], stat: FileStat) -> Tuple[bool, List[str]]:
+        """返回 (索引是否有效, 命中的角色数据)"""
+        with self._lock:
+            conn = self._get_conn()
+            meta = conn.execute(
+                "SELECT mtime_ns, size FROM panel_meta WHERE uid = ?",
+                (uid,),
+            ).fetchone()
+            if not meta or tuple(meta) != stat:
+                return False, []
+
+            placeholders = ",".join("?" * len(role_ids))
+            # 按 rawData.json 中的顺序返回，与原先顺序查找的结果保持一致
+            cursor = conn.execute(
+                f"SELECT data FROM panel_role WHERE uid = ? AND role_id IN ({placeholders}) ORDER BY pos",
+                (uid, *role_ids),
+            )
+            return True, [data for (data,) in cursor.fetchall()]
+
+    def _run(self, func, *args):
+        with self._lock:
+            return func(self._get_conn(), *args)
+
+    async def run(self, func, *args):
+        """在线程中以 func(conn, *args) 的形式访问索引库，供排行索引等复用同一数据库"""
+        return await asyncio.to_thread(self._run, func, *args)
+
+    @staticmethod
+    def get_stat(uid: str) -> Optional[FileStat]:
+        path = PLAYER_PATH / uid / "rawData.json"
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def save(self, uid: str, roles: List[Dict[str, Any]]):
+        """rawData.json 写入后调用，同步该 uid 的索引"""
+        stat = self.get_stat(uid)
+        if stat is None:
+            return
+        try:
+            await asyncio.to_thread(self._replace, uid, roles, stat)
+        except Exception as e:
+            logger.exception(f"[鸣潮] 面板索引写入失败 uid={uid}:", e)
+
+    async def rebuild(self, uid: str) -> Optional[List[Dict[str, Any]]]:
+        """从 rawData.json 重建该 uid 的索引，返回文件中的角色数据"""
+        stat = self.get_stat(uid)
+        if stat is None:
+            await asyncio.to_thread(self._remove, uid)
+            return None
+
+        path = PLAYER_PATH / uid / "rawData.json"
+        try:
+            async with aiofiles.open(path, mode="r", encoding="utf-8") as f:
+                roles = json.loads(await f.read())
+        except Exception as e:
+            logger.exception(f"[鸣潮] 面板索引重建失败 {path}:", e)
+            return None
+
+        if not isinstance(roles, list):
+            return None
+
+        await asyncio.to_thread(self._replace, uid, roles, stat)
+        return roles
+
+    async def find_role(
+        self,
+        uid: str,
+        role_ids: Iterable[Union[int, str]],
+    ) -> Optional[Dict[str, Any]]:
+        """按 (uid, role_id) 查找一个角色的原始数据，多个 role_id 时返回 rawData 中靠前的一个"""
+        ids = [int(i) for i in role_ids if str(i).isdigit()]
+        if not ids:
+            return None
+
+        stat = self.get_stat(uid)
+        if stat is None:
+            return None
+
+        try:
+            valid, datas = await asyncio.to_thread(self._query, uid, ids, stat)
+        except Exception as e:
+            logger.exception(f"[鸣潮] 面板索引查询失败 uid={uid}:", e)
+            valid, datas = False, []
+
+        if valid:
+            return json.loads(datas[0]) if datas else None
+
+        # 索引缺失或过期，从文件重建
+        try:
+            roles = await self.rebuild(uid)
+        except Exception as e:
+            logger.exception(f"[鸣潮] 面板索引重建失败 uid={uid}:", e)
+            roles = None
+        if not roles:
+            return None
+
+        for r in roles:
+            try:
+                if int(r["role"]["roleId"]) in ids:
+                    return r
+            except (KeyError, TypeError, ValueError):
+                continue
+        return None
+
+
+panel_store = PanelStore()
@@ -5,7 +5,8 @@ import httpx
 from gsuid_core.logger import logger
 
 from .const import QUEUE_SCORE_RANK, QUEUE_ABYSS_RECORD, QUEUE_SLASH_RECORD
-from .queues import event_handler, start_dispatcher
+from .queues import batch_handler, start_dispatcher
+from ..api.http_pool import http_pool
 from ..api.wwapi import (
     UPLOAD_URL,
     UPLOAD_ABYSS_RECORD_URL,
@@ -13,94 +14,61 @@ from ..api.wwapi import (
 )
 
 
-@event_handler(QUEUE_SCORE_RANK)
-async def send_score_rank(item: Any):
+async def _upload_item(url: str, item: Any, name: str) -> bool:
+    """上传单条数据，返回 False 时由 batch_handler 退避重试"""
     if not item:
-        return
+        return True
     if not isinstance(item, dict):
-        return
+        return True
     from ...wutheringwaves_config import WutheringWavesConfig
 
     WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
     if not WavesToken:
-        return
-
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传面板结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传面板失败: {res.text if res else ''} {e}")
-
-
-@event_handler(QUEUE_ABYSS_RECORD)
-async def send_abyss_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
+        return True
+
+    client = http_pool.get_httpx_client()
+    res = None
+    try:
+        res = await client.post(
+            url,
+            json=item,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        logger.info(f"上传{name}结果: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"上传{name}失败: {res.text if res else ''} {e}")
+        return False
+
+    # 服务端异常或限流时重试，其余状态码重试也不会成功
+    return not (res.status_code >= 500 or res.status_code == 429)
+
+
+def score_rank_key(item: Any) -> str:
+    # 单角色刷新只覆盖同一批角色，全量刷新覆盖上一次全量刷新
+    if item.get("single_refresh"):
+        char_ids = ",".join(str(c.get("char_id")) for c in item.get("char_info", []))
+        return f"{item['waves_id']}:{char_ids}"
+    return f"{item['waves_id']}:all"
+
+
+@batch_handler(QUEUE_SCORE_RANK, key=score_rank_key)
+async def send_score_rank(item: Any):
+    return await _upload_item(UPLOAD_URL, item, "面板")
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
-    if not WavesToken:
-        return
-
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_ABYSS_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传深渊结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传深渊失败: {res.text if res else ''} {e}")
-
-
-@event_handler(QUEUE_SLASH_RECORD)
-async def send_slash_record(item: Any):
-    if not item:
-        return
-    if not isinstance(item, dict):
-        return
-    from ...wutheringwaves_config import WutheringWavesConfig
+@batch_handler(QUEUE_ABYSS_RECORD, key=lambda item: item["waves_id"])
+async def send_abyss_record(item: Any):
+    return await _upload_item(UPLOAD_ABYSS_RECORD_URL, item, "深渊")
 
-    WavesToken = WutheringWavesConfig.get_config("WavesToken").data
 
-    if not WavesToken:
-        return
-
-    async with httpx.AsyncClient() as client:
-        res = None
-        try:
-            res = await client.post(
-                UPLOAD_SLASH_RECORD_URL,
-                json=item,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.info(f"上传冥海结果: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"上传冥海失败: {res.text if res else ''} {e}")
+@batch_handler(QUEUE_SLASH_RECORD, key=lambda item: f"{item['wavesId']}:{item['challengeId']}")
+async def send_slash_record(item: Any):
+    return await _upload_item(UPLOAD_SLASH_RECORD_URL, item, "冥海")
 
 
 def init_queues():
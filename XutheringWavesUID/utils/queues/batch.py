@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import random
+import asyncio
+from typing import Any, Dict, List, Tuple, Callable, Optional
+
+from gsuid_core.logger import logger
+
+from ..resource.RESOURCE_PATH import UPLOAD_SPILL_PATH
+
+# spill 文件中超过该时间（秒）的数据在重启后不再发送
+SPILL_MAX_AGE = 24 * 3600
+# 重试退避：RETRY_BASE * 2^(n-1) 秒，最长 RETRY_MAX 秒
+RETRY_BASE = 5
+RETRY_MAX = 300
+
+
+def _get_int(key: str, default: int) -> int:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    try:
+        return max(1, int(WutheringWavesConfig.get_config(key).data))
+    except Exception:
+        return default
+
+
+class _Pending:
+    __slots__ = ("item", "ts", "attempts", "next_at")
+
+    def __init__(self, item: Any, ts: float):
+        self.item = item
+        self.ts = ts
+        self.attempts = 0
+        self.next_at = 0.0
+
+
+class Batcher:
+    """合并上传
+
+    同一 key 的数据只保留最新一条，待发送数量达到 UploadBatchSize 或每隔 UploadBatchInterval 秒发送一批，
+    同时发送的数量受 UploadConcurrency 限制。
+    handler 返回 False 或抛出异常视为发送失败，按指数退避重试，超过 UploadMaxRetries 次后丢弃。
+
+    新数据追加写入 spill 文件，每批发送后重写为剩余的数据，重启后继续发送。
+    """
+
+    def __init__(
+        self,
+        task_type: str,
+        handler: Callable[[Any], Any],
+        key_func: Callable[[Any], Any],
+        task_stats: Optional[Any] = None,
+    ):
+        self.task_type = task_type
+        self.handler = handler
+        self.key_func = key_func
+        # 分发器中该任务类型的 TaskStats，每次发送计入 done/failed 和耗时
+        self.task_stats = task_stats
+        self.path = UPLOAD_SPILL_PATH / f"{task_type}.jsonl"
+        self.pending: Dict[str, _Pending] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    # spill 文件
+
+    def _append(self, key: str, item: Any, ts: float):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "ts": ts, "item": item}, ensure_ascii=False, default=str) + "\n")
+        except Exception as e:
+            logger.warning(f"[鸣潮] 写入待上传数据失败 {self.task_type}: {e}")
+
+    def _rewrite(self):
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for key, p in self.pending.items():
+                    f.write(json.dumps({"key": key, "ts": p.ts, "item": p.item}, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 写入待上传数据失败 {self.task_type}: {e}")
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        expire = time.time() - SPILL_MAX_AGE
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                        key, ts, item = row["key"], float(row["ts"]), row["item"]
+                    except Exception:
+                        continue
+                    if ts < expire:
+                        continue
+                    self.pending.pop(key, None)
+                    self.pending[key] = _Pending(item, ts)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 读取待上传数据失败 {self.task_type}: {e}")
+            return
+        self._rewrite()
+        if self.pending:
+            logger.info(f"[鸣潮] 恢复待上传数据 {self.task_type}: {len(self.pending)} 条")
+
+    # 发送
+
+    def add(self, item: Any):
+        try:
+            key = str(self.key_func(item))
+        except Exception:
+            return
+
+        now = time.time()
+        if self.pending.pop(key, None) is not None:
+            self.coalesced += 1
+        self.pending[key] = _Pending(item, now)
+        self._append(key, item, now)
+
+        if self._wakeup and len(self.pending) >= _get_int("UploadBatchSize", 50):
+            self._wakeup.set()
+
+    async def _call(self, item: Any) -> bool:
+        try:
+            result = self.handler(item)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result is not False
+        except Exception as e:
+            logger.exception(f"任务执行错误 ({self.task_type}): {e}")
+            return False
+
+    async def flush(self) -> int:
+        """发送一批到期的数据，返回本批数量"""
+        batch_size = _get_int("UploadBatchSize", 50)
+        max_retries = _get_int("UploadMaxRetries", 5)
+        now = time.time()
+
+        due: List[Tuple[str, _Pending]] = []
+        for key, p in self.pending.items():
+            if p.next_at <= now:
+                due.append((key, p))
+                if len(due) >= batch_size:
+                    break
+        if not due:
+            return 0
+        for key, _ in due:
+            del self.pending[key]
+
+        sem = asyncio.Semaphore(_get_int("UploadConcurrency", 4))
+
+        async def _send(key: str, p: _Pending):
+            async with sem:
+                start = time.monotonic()
+                if self.task_stats is not None:
+                    self.task_stats.running += 1
+                ok = await self._call(p.item)
+                if self.task_stats is not None:
+                    self.task_stats.running -= 1
+                    self.task_stats.record(time.monotonic() - start, not ok)
+            if ok:
+                self.sent += 1
+                return
+            p.attempts += 1
+            if key in self.pending:
+                # 发送期间已有更新的数据，旧数据不再重试
+                return
+            if p.attempts >= max_retries:
+                self.dropped += 1
+                logger.warning(f"[鸣潮] 上传失败次数过多，放弃 {self.task_type}: {key}")
+                return
+            self.retried += 1
+            delay = min(RETRY_BASE * 2 ** (p.attempts - 1), RETRY_MAX)
+            p.next_at = time.time() + delay * random.uniform(0.8, 1.2)
+            self.pending[key] = p
+
+        await asyncio.gather(*[_send(key, p) for key, p in due])
+        self._rewrite()
+        return len(due)
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        self._load()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=_get_int("UploadBatchInterval", 5))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                # 积压较多时连续发送，直到不足一批
+                while await self.flush() >= _get_int("UploadBatchSize", 50):
+                    pass
+            except Exception as e:
+                logger.exception(f"任务处理异常 ({self.task_type}): {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self.pending),
+            "sent": self.sent,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
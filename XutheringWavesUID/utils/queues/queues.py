@@ -1,15 +1,84 @@
+import time
 import asyncio
 import threading
-from typing import Any, Dict, List, Union, Callable, Coroutine
+from collections import defaultdict
+from typing import Any, Set, Dict, List, Tuple, Union, Callable, Optional, Coroutine
 
 from gsuid_core.logger import logger
 
+from .batch import Batcher
+
+
+# block 策略下普通线程最长等待时间（秒）
+BLOCK_TIMEOUT = 30
+
+
+def _get_config(key: str, default: Any) -> Any:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    try:
+        return WutheringWavesConfig.get_config(key).data
+    except Exception:
+        return default
+
+
+class TaskStats:
+    """单个任务类型的统计"""
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dropped = 0
+        self.done = 0
+        self.failed = 0
+        self.running = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+        self.run_max = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        finished = self.done + self.failed
+        return {
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "done": self.done,
+            "failed": self.failed,
+            "running": self.running,
+            "wait_avg": self.wait_total / finished if finished else 0.0,
+            "wait_max": self.wait_max,
+            "run_avg": self.run_total / finished if finished else 0.0,
+            "run_max": self.run_max,
+        }
+
+    def record(self, cost: float, failed: bool) -> None:
+        self.run_total += cost
+        self.run_max = max(self.run_max, cost)
+        if failed:
+            self.failed += 1
+        else:
+            self.done += 1
+
 
 class TaskDispatcher:
+    """任务分发器
+
+    在独立线程的事件循环中处理任务，队列长度受 DispatcherQueueSize 限制，队列满时按 DispatcherFullPolicy 处理：
+    drop_new 丢弃新任务，drop_old 丢弃最早的任务，block 由发送方等待（在事件循环中调用时不会阻塞，
+    改为在分发器内排队等待，等待数量超过队列长度后丢弃）。
+
+    同时执行的任务数不超过 DispatcherWorkers，每种任务类型不超过 DispatcherMaxInflight。
+    """
+
     def __init__(self):
-        self.queue = asyncio.Queue()
+        self.queue: Optional[asyncio.Queue] = None
         self.running = False
         self.handlers: Dict[str, List[Callable]] = {}
+        self.batchers: Dict[str, Batcher] = {}
+        self.stats: Dict[str, TaskStats] = defaultdict(TaskStats)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batcher_tasks: Set[asyncio.Task] = set()
+        self._type_sems: Dict[str, asyncio.Semaphore] = {}
+        self._put_waiters = 0
 
     def register_handler(
         self,
@@ -24,56 +93,177 @@ class TaskDispatcher:
         self.handlers[task_type].append(handler)
         logger.info(f"注册任务处理器: {task_type} -> {handler.__name__}")
 
+    def register_batch_handler(
+        self,
+        task_type: str,
+        handler: Callable[[Any], Union[Any, Coroutine[Any, Any, Any]]],
+        key: Callable[[Any], Any],
+    ) -> None:
+        """注册合并发送的处理器，同一 key 只发送最新的数据，见 Batcher"""
+        if task_type in self.batchers:
+            logger.warning(f"任务 {task_type} 已有合并处理器，将被替换")
+        batcher = Batcher(task_type, handler, key, self.stats[task_type])
+        self.batchers[task_type] = batcher
+        logger.info(f"注册合并任务处理器: {task_type} -> {handler.__name__}")
+
+        if self.running and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._start_batcher, batcher)
+
+    def _start_batcher(self, batcher: Batcher) -> None:
+        task = asyncio.create_task(batcher.run())
+        self._batcher_tasks.add(task)
+        task.add_done_callback(self._batcher_tasks.discard)
+
     def emit(self, task_type: str, data: Any) -> None:
-        if not self.running:
+        """投递任务，可在任意线程调用，在事件循环中调用时不会阻塞"""
+        if not self.running or self._loop is None or self.queue is None:
             logger.warning("任务分发器未启动或已关闭")
             return
-        if task_type not in self.handlers:
+        if task_type not in self.handlers and task_type not in self.batchers:
+            return
+
+        item = (task_type, data, time.monotonic())
+        policy = _get_config("DispatcherFullPolicy", "drop_old")
+        if policy == "block" and not self._in_event_loop():
+            # 普通线程中调用，等待队列有空位
+            fut = asyncio.run_coroutine_threadsafe(self._put_wait(item), self._loop)
+            try:
+                fut.result(timeout=BLOCK_TIMEOUT)
+            except Exception as e:
+                fut.cancel()
+                logger.warning(f"任务投递失败 ({task_type}): {e!r}")
             return
 
         try:
-            loop = asyncio.get_event_loop()
-            asyncio.run_coroutine_threadsafe(self.queue.put((task_type, data)), loop)
+            self._loop.call_soon_threadsafe(self._put, item, policy)
         except RuntimeError:
-            # 如果没有事件循环，创建一个新的
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.queue.put((task_type, data)))
+            logger.warning("任务分发器未启动或已关闭")
+
+    @staticmethod
+    def _in_event_loop() -> bool:
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def _put(self, item: Tuple[str, Any, float], policy: str) -> None:
+        """在分发器事件循环中执行"""
+        assert self.queue is not None
+        task_type = item[0]
+        try:
+            self.queue.put_nowait(item)
+            self.stats[task_type].enqueued += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if policy == "drop_old":
+            old_type = self.queue.get_nowait()[0]
+            self.queue.task_done()
+            self.stats[old_type].dropped += 1
+            self.queue.put_nowait(item)
+            self.stats[task_type].enqueued += 1
+        elif policy == "block" and self._put_waiters < self.queue.maxsize:
+            self._put_waiters += 1
+            task = asyncio.create_task(self._put_wait(item))
+            task.add_done_callback(lambda _: self._release_waiter())
+        else:
+            self.stats[task_type].dropped += 1
+            logger.warning(f"任务队列已满，丢弃任务 ({task_type})")
+
+    def _release_waiter(self) -> None:
+        self._put_waiters -= 1
+
+    async def _put_wait(self, item: Tuple[str, Any, float]) -> None:
+        assert self.queue is not None
+        await self.queue.put(item)
+        self.stats[item[0]].enqueued += 1
+
+    def _get_type_sem(self, task_type: str) -> asyncio.Semaphore:
+        sem = self._type_sems.get(task_type)
+        if sem is None:
+            sem = asyncio.Semaphore(max(1, int(_get_config("DispatcherMaxInflight", 4))))
+            self._type_sems[task_type] = sem
+        return sem
 
     async def _process(self) -> None:
-        while True:
+        assert self.queue is not None
+        for batcher in self.batchers.values():
+            self._start_batcher(batcher)
+
+        workers = asyncio.Semaphore(max(1, int(_get_config("DispatcherWorkers", 8))))
+        while self.running:
             try:
-                if not self.running:
-                    break
+                await workers.acquire()
+                try:
+                    task_type, data, enqueue_time = await asyncio.wait_for(self.queue.get(), timeout=3.0)
+                except asyncio.TimeoutError:
+                    workers.release()
+                    continue
 
-                task_type, data = await asyncio.wait_for(self.queue.get(), timeout=3.0)
+                self.queue.task_done()
+                stats = self.stats[task_type]
+                wait = time.monotonic() - enqueue_time
+                stats.wait_total += wait
+                stats.wait_max = max(stats.wait_max, wait)
 
-                # 获取所有处理器并依次执行
-                handlers = self.handlers.get(task_type, [])
-                for handler in handlers:
-                    asyncio.create_task(self._run_task(handler, data, task_type))
+                batcher = self.batchers.get(task_type)
+                if batcher is not None:
+                    # 合并发送的数据在 Batcher 实际发送时计入统计
+                    batcher.add(data)
+                if not self.handlers.get(task_type):
+                    workers.release()
+                    continue
 
-                self.queue.task_done()
+                task = asyncio.create_task(self._run_task(task_type, data))
+                task.add_done_callback(lambda _: workers.release())
 
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.exception(f"任务处理异常: {e}")
 
-    async def _run_task(self, handler: Callable, data: Any, task_type: str) -> None:
+    async def _run_task(self, task_type: str, data: Any) -> None:
+        stats = self.stats[task_type]
+        async with self._get_type_sem(task_type):
+            stats.running += 1
+            start = time.monotonic()
+            failed = False
+            # 获取所有处理器并依次执行
+            for handler in self.handlers.get(task_type, []):
+                try:
+                    result = handler(data)
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    failed = True
+                    logger.exception(f"任务执行错误 ({task_type}): {e}")
+            stats.running -= 1
+            stats.record(time.monotonic() - start, failed)
+
+    def _run_loop(self) -> None:
+        assert self._loop is not None
+        asyncio.set_event_loop(self._loop)
         try:
-            result = handler(data)
-            if asyncio.iscoroutine(result):
-                await result
-        except Exception as e:
-            logger.exception(f"任务执行错误 ({task_type}): {e}")
+            self._loop.run_until_complete(self._process())
+        finally:
+            self._loop.close()
 
     def start(self, daemon: bool = True) -> None:
         if self.running:
             return
 
         self.running = True
-        threading.Thread(target=lambda: asyncio.run(self._process()), daemon=daemon).start()
+        # 队列和事件循环在启动线程前创建，启动期间投递的任务不会丢失
+        self._loop = asyncio.new_event_loop()
+        self.queue = asyncio.Queue(maxsize=max(1, int(_get_config("DispatcherQueueSize", 1000))))
+        threading.Thread(target=self._run_loop, name="waves-dispatcher", daemon=daemon).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.queue.qsize() if self.queue is not None else 0,
+            "types": {k: v.snapshot() for k, v in list(self.stats.items())},
+            "batchers": {k: v.stats() for k, v in list(self.batchers.items())},
+        }
 
 
 # 创建全局任务分发器实例
@@ -87,6 +277,14 @@ def register_handler(
     dispatcher.register_handler(task_type, handler)
 
 
+def register_batch_handler(
+    task_type: str,
+    handler: Callable[[Any], Union[Any, Coroutine[Any, Any, Any]]],
+    key: Callable[[Any], Any],
+) -> None:
+    dispatcher.register_batch_handler(task_type, handler, key)
+
+
 def start_dispatcher(daemon: bool = True) -> None:
     dispatcher.start(daemon=daemon)
 
@@ -117,3 +315,23 @@ def event_handler(task_type: str) -> Callable:
         return func
 
     return decorator
+
+
+def batch_handler(task_type: str, key: Callable[[Any], Any]) -> Callable:
+    """
+    合并发送处理器装饰器，用于上传等可以合并的任务；
+
+    同一 key 的数据只保留最新一条，按数量或时间批量发送，失败后退避重试，
+    未发送的数据保存在磁盘，重启后继续发送。handler 返回 False 表示需要重试。
+
+    Examples:
+        @batch_handler("score_rank", key=lambda item: item["waves_id"])
+        async def upload_score_rank(item):
+            ...
+    """
+
+    def decorator(func: Callable) -> Callable:
+        dispatcher.register_batch_handler(task_type, func, key)
+        return func
+
+    return decorator
@@ -0,0 +1,419 @@
+import hashlib
+import sqlite3
+from typing import Dict, List, Tuple, Union, Iterable, Optional
+
+from pydantic import BaseModel
+
+from ..version import XutheringWavesUID_version
+from .panel_store import FileStat, PanelStore, panel_store
+from .resource.RESOURCE_PATH import BUILD_PATH, PLAYER_PATH, MAP_BUILD_PATH
+
+# sqlite 单条语句参数数量有限，uid 列表分批查询
+SQL_CHUNK = 500
+
+
+class RankEntry(BaseModel):
+    """单个角色的排行数据（评分、期望伤害）"""
+
+    uid: str
+    role_id: int
+    level: int
+    chain: int
+    score: float
+    score_bg: str
+    expected_damage: str
+    expected_damage_int: int
+    sonata_name: str
+
+
+class GachaRankEntry(BaseModel):
+    """单个 uid 的抽卡排行数据（角色、武器精准调谐）"""
+
+    uid: str
+    total: int
+    char_avg: float
+    weapon_avg: float
+    char_gold: int
+    weapon_gold: int
+
+
+_calc_version: Optional[str] = None
+
+
+def get_calc_version() -> str:
+    """排行计算结果的版本
+
+    由插件版本和计算模块文件指纹组成，计算模块更新后旧的排行数据自动失效
+    """
+    global _calc_version
+    if _calc_version is None:
+        h = hashlib.md5(XutheringWavesUID_version.encode())
+        for root in (BUILD_PATH, MAP_BUILD_PATH):
+            if not root.exists():
+                continue
+            for path in sorted(root.rglob("*")):
+                if "__pycache__" in path.parts or not path.is_file():
+                    continue
+                st = path.stat()
+                h.update(f"{path.relative_to(root)}:{st.st_size}:{st.st_mtime_ns}".encode())
+        _calc_version = h.hexdigest()
+    return _calc_version
+
+
+def reset_calc_version():
+    """计算模块重新加载后调用"""
+    global _calc_version
+    _calc_version = None
+
+
+def _chunks(items: List, size: int = SQL_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class RankIndex:
+    """角色排行索引
+
+    按角色保存每个 uid 的评分和期望伤害，随面板刷新只更新变化的角色。
+    每行记录计算时 rawData.json 的 mtime/size 和计算版本，不一致的行视为过期，
+    由查询方重新计算后写回。score 为 NULL 的行表示该 uid 没有可上榜的该角色。
+
+    练度排行使用的角色评分（charListData.json）同步保存在 practice_score 表，
+    practice_stat 记录保存时 charListData.json 的 mtime/size，不一致时视为过期；
+    群练度排行直接在库中按阈值汇总。
+
+    抽卡排行使用的统计随抽卡记录更新写入 gacha_rank 表，记录抽卡存储 meta.json 的 mtime/size，
+    群抽卡排行只需查询一次，无需逐个读取抽卡记录。
+    """
+
+    def __init__(self, store: PanelStore):
+        self.store = store
+        self._schema_ready = False
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        if self._schema_ready:
+            return
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS rank_role (
+                role_id INTEGER NOT NULL,
+                uid TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                level INTEGER,
+                chain INTEGER,
+                score REAL,
+                score_bg TEXT,
+                expected_damage TEXT,
+                expected_damage_int INTEGER,
+                sonata_name TEXT,
+                PRIMARY KEY (role_id, uid)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_rank_role_uid ON rank_role (uid);
+            CREATE TABLE IF NOT EXISTS practice_score (
+                uid TEXT NOT NULL,
+                role_id TEXT NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (uid, role_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS practice_stat (
+                uid TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS gacha_rank (
+                uid TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                version TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                char_avg REAL NOT NULL,
+                weapon_avg REAL NOT NULL,
+                char_gold INTEGER NOT NULL,
+                weapon_gold INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            """
+        )
+        self._schema_ready = True
+
+    # 角色排行
+
+    def _update(
+        self,
+        conn: sqlite3.Connection,
+        uid: str,
+        entries: Dict[int, Optional[RankEntry]],
+        old_stat: Optional[FileStat],
+        new_stat: FileStat,
+        version: str,
+    ):
+        self._ensure_schema(conn)
+        rows = []
+        for role_id, e in entries.items():
+            if e is None:
+                rows.append((role_id, uid, *new_stat, version, None, None, None, None, None, None, None))
+            else:
+                rows.append(
+                    (
+                        role_id,
+                        uid,
+                        *new_stat,
+                        version,
+                        e.level,
+                        e.chain,
+                        e.score,
+                        e.score_bg,
+                        e.expected_damage,
+                        e.expected_damage_int,
+                        e.sonata_name,
+                    )
+                )
+
+        with conn:
+            if old_stat is not None and old_stat != new_stat:
+                # 未变化的角色沿用旧结果，只需更新对应的文件状态
+                conn.execute(
+                    "UPDATE rank_role SET mtime_ns = ?, size = ? "
+                    "WHERE uid = ? AND mtime_ns = ? AND size = ? AND version = ?",
+                    (*new_stat, uid, *old_stat, version),
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO rank_role VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def update(
+        self,
+        uid: str,
+        entries: Dict[int, Optional[RankEntry]],
+        old_stat: Optional[FileStat] = None,
+    ):
+        """写入 uid 的角色排行数据
+
+        Args:
+            entries: {roleId: RankEntry}，None 表示该角色不上榜
+            old_stat: 本次写入 rawData.json 前的文件状态，传入时其余角色的旧结果继续有效
+        """
+        new_stat = PanelStore.get_stat(uid)
+        if new_stat is None:
+            return
+        await self.store.run(self._update, uid, entries, old_stat, new_stat, get_calc_version())
+
+    def _query(
+        self,
+        conn: sqlite3.Connection,
+        role_ids: List[int],
+        uids: List[str],
+        version: str,
+    ) -> Tuple[Dict[str, RankEntry], List[str]]:
+        self._ensure_schema(conn)
+        stats = {uid: PanelStore.get_stat(uid) for uid in uids}
+        found: Dict[str, Dict[int, Optional[RankEntry]]] = {}
+
+        id_marks = ",".join("?" * len(role_ids))
+        for chunk in _chunks([uid for uid, st in stats.items() if st is not None]):
+            uid_marks = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                "SELECT role_id, uid, mtime_ns, size, version, level, chain, score, score_bg, "
+                "expected_damage, expected_damage_int, sonata_name FROM rank_role "
+                f"WHERE role_id IN ({id_marks}) AND uid IN ({uid_marks})",
+                (*role_ids, *chunk),
+            )
+            for row in cursor.fetchall():
+                role_id, uid, mtime_ns, size, row_version = row[:5]
+                if row_version != version or (mtime_ns, size) != stats[uid]:
+                    continue
+                entry = None
+                if row[7] is not None:
+                    entry = RankEntry(
+                        uid=uid,
+                        role_id=role_id,
+                        level=row[5],
+                        chain=row[6],
+                        score=row[7],
+                        score_bg=row[8],
+                        expected_damage=row[9],
+                        expected_damage_int=row[10],
+                        sonata_name=row[11],
+                    )
+                found.setdefault(uid, {})[role_id] = entry
+
+        result: Dict[str, RankEntry] = {}
+        stale: List[str] = []
+        for uid, st in stats.items():
+            if st is None:
+                continue
+            rows = found.get(uid, {})
+            if len(rows) != len(role_ids):
+                stale.append(uid)
+                continue
+            entry = next((rows[i] for i in role_ids if rows[i] is not None), None)
+            if entry is not None:
+                result[uid] = entry
+        return result, stale
+
+    async def query(
+        self,
+        role_ids: Iterable[Union[int, str]],
+        uids: Iterable[str],
+    ) -> Tuple[Dict[str, RankEntry], List[str]]:
+        """查询一组 uid 的角色排行数据
+
+        Returns:
+            ({uid: RankEntry}, 需要重新计算的 uid 列表)
+        """
+        ids = sorted({int(i) for i in role_ids})
+        uid_list = list(dict.fromkeys(uids))
+        if not ids or not uid_list:
+            return {}, []
+        return await self.store.run(self._query, ids, uid_list, get_calc_version())
+
+    # 练度排行
+
+    @staticmethod
+    def get_practice_stat(uid: str) -> Optional[FileStat]:
+        path = PLAYER_PATH / uid / "charListData.json"
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _save_practice(self, conn: sqlite3.Connection, uid: str, scores: Dict[str, float]):
+        self._ensure_schema(conn)
+        stat = self.get_practice_stat(uid)
+        with conn:
+            conn.execute("DELETE FROM practice_score WHERE uid = ?", (uid,))
+            conn.execute("DELETE FROM practice_stat WHERE uid = ?", (uid,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO practice_score (uid, role_id, score) VALUES (?, ?, ?)",
+                [(uid, str(role_id), float(score)) for role_id, score in scores.items()],
+            )
+            if stat is not None:
+                conn.execute("INSERT INTO practice_stat VALUES (?, ?, ?)", (uid, *stat))
+
+    async def save_practice(self, uid: str, scores: Dict[str, float]):
+        """与 charListData.json 同步保存角色评分，需在写入文件之后调用"""
+        await self.store.run(self._save_practice, uid, scores)
+
+    def _query_practice(
+        self,
+        conn: sqlite3.Connection,
+        uids: List[str],
+        threshold: float,
+    ) -> Tuple[Dict[str, Tuple[float, List[str]]], List[str]]:
+        self._ensure_schema(conn)
+        # 没有 rawData.json 的 uid 无法展示角色详情，不参与排行
+        uids = [uid for uid in uids if PanelStore.get_stat(uid) is not None]
+        indexed = set()
+        result: Dict[str, Tuple[float, List[str]]] = {}
+        for chunk in _chunks(uids):
+            uid_marks = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                f"SELECT uid, mtime_ns, size FROM practice_stat WHERE uid IN ({uid_marks})",
+                chunk,
+            )
+            for uid, mtime_ns, size in cursor.fetchall():
+                if (mtime_ns, size) == self.get_practice_stat(uid):
+                    indexed.add(uid)
+            cursor = conn.execute(
+                f"SELECT uid, role_id, score FROM practice_score WHERE uid IN ({uid_marks})",
+                chunk,
+            )
+            for uid, role_id, score in cursor.fetchall():
+                if uid not in indexed or score < threshold:
+                    continue
+                total, role_list = result.get(uid, (0.0, []))
+                role_list.append(role_id)
+                result[uid] = (total + score, role_list)
+        missing = [uid for uid in uids if uid not in indexed]
+        return result, missing
+
+    async def query_practice(
+        self,
+        uids: Iterable[str],
+        threshold: float,
+    ) -> Tuple[Dict[str, Tuple[float, List[str]]], List[str]]:
+        """按阈值汇总一组 uid 的练度总分
+
+        Returns:
+            ({uid: (总分, 达到阈值的角色id列表)}, 索引中没有数据或数据已过期的 uid 列表)
+        """
+        uid_list = list(dict.fromkeys(uids))
+        if not uid_list:
+            return {}, []
+        return await self.store.run(self._query_practice, uid_list, threshold)
+
+    # 抽卡排行
+
+    def _save_gacha(self, conn: sqlite3.Connection, entry: GachaRankEntry, stat: FileStat, version: str):
+        self._ensure_schema(conn)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO gacha_rank VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.uid,
+                    *stat,
+                    version,
+                    entry.total,
+                    entry.char_avg,
+                    entry.weapon_avg,
+                    entry.char_gold,
+                    entry.weapon_gold,
+                ),
+            )
+
+    async def save_gacha(self, entry: GachaRankEntry, stat: FileStat):
+        """写入 uid 的抽卡统计
+
+        Args:
+            stat: 统计对应的抽卡存储 meta.json 的文件状态
+        """
+        await self.store.run(self._save_gacha, entry, stat, get_calc_version())
+
+    def _query_gacha(
+        self,
+        conn: sqlite3.Connection,
+        stats: Dict[str, FileStat],
+        version: str,
+    ) -> Tuple[Dict[str, GachaRankEntry], List[str]]:
+        self._ensure_schema(conn)
+        result: Dict[str, GachaRankEntry] = {}
+        for chunk in _chunks(list(stats)):
+            uid_marks = ",".join("?" * len(chunk))
+            cursor = conn.execute(
+                "SELECT uid, mtime_ns, size, version, total, char_avg, weapon_avg, char_gold, weapon_gold "
+                f"FROM gacha_rank WHERE uid IN ({uid_marks})",
+                chunk,
+            )
+            for row in cursor.fetchall():
+                uid, mtime_ns, size, row_version = row[:4]
+                if row_version != version or (mtime_ns, size) != stats[uid]:
+                    continue
+                result[uid] = GachaRankEntry(
+                    uid=uid,
+                    total=row[4],
+                    char_avg=row[5],
+                    weapon_avg=row[6],
+                    char_gold=row[7],
+                    weapon_gold=row[8],
+                )
+        stale = [uid for uid in stats if uid not in result]
+        return result, stale
+
+    async def query_gacha(self, stats: Dict[str, FileStat]) -> Tuple[Dict[str, GachaRankEntry], List[str]]:
+        """查询一组 uid 的抽卡统计
+
+        Args:
+            stats: {uid: 抽卡存储 meta.json 的文件状态}
+
+        Returns:
+            ({uid: GachaRankEntry}, 需要重新统计的 uid 列表)
+        """
+        if not stats:
+            return {}, []
+        return await self.store.run(self._query_gacha, stats, get_calc_version())
+
+
+rank_index = RankIndex(panel_store)
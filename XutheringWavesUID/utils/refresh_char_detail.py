@@ -1,7 +1,7 @@
 import re
 import json
 import asyncio
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 import aiofiles
 
@@ -9,9 +9,10 @@ from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from ..utils.hint import error_reply
-from ..utils.util import get_version
-from ..utils.api.model import RoleList, AccountBaseInfo, OwnedRoleInfoResponse
+from ..utils.util import get_version, ttl_cache_invalidate
+from ..utils.api.model import RoleList, RoleDetailData, AccountBaseInfo, OwnedRoleInfoResponse
 from ..utils.waves_api import waves_api
+from ..utils.panel_store import panel_store
 from .resource.constant import SPECIAL_CHAR_INT_ALL
 from ..utils.error_reply import WAVES_CODE_101, WAVES_CODE_102
 from ..utils.queues.const import QUEUE_SCORE_RANK
@@ -19,7 +20,10 @@ from ..utils.queues.queues import push_item
 from ..utils.expression_ctx import WavesCharRank, get_waves_char_rank
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-from ..utils.char_info_utils import get_all_roleid_detail_info_int
+from ..utils.char_info_utils import (
+    get_all_roleid_detail_info_int,
+    invalidate_role_detail_cache,
+)
 
 
 def is_use_global_semaphore() -> bool:
@@ -152,6 +156,7 @@ async def save_card_info(
     #
     refresh_update = {}
     refresh_unchanged = {}
+    removed_role_ids = []
     for item in waves_data:
         role_id = item["role"]["roleId"]
 
@@ -163,6 +168,7 @@ async def save_card_info(
                     continue
                 if piaobo_id != role_id:
                     del old_data[piaobo_id]
+                    removed_role_ids.append(piaobo_id)
 
         old = old_data.get(role_id)
         cleaned_item = remove_urls_from_data(item)
@@ -177,11 +183,15 @@ async def save_card_info(
 
     await send_card(uid, user_id, save_data, is_self_ck, token, role_info, waves_data)
 
+    old_stat = panel_store.get_stat(uid)
     try:
         # 移除所有 URL 后再保存
         cleaned_data = remove_urls_from_data(save_data)
         async with aiofiles.open(path, "w", encoding="utf-8") as file:
             await file.write(json.dumps(cleaned_data, ensure_ascii=False))
+        invalidate_role_detail_cache(uid)
+        # 同步面板索引库，供排行按 (uid, roleId) 直接读取
+        await panel_store.save(uid, cleaned_data)
     except Exception as e:
         logger.exception(f"save_card_info save failed {path}:", e)
 
@@ -189,11 +199,34 @@ async def save_card_info(
     waves_char_rank = await get_waves_char_rank(uid, save_data, True)
     await save_char_list_cache(uid, waves_char_rank)
 
+    # 更新角色排行索引，只计算变化的角色
+    await save_rank_index(uid, refresh_update, removed_role_ids, old_stat)
+
     if waves_map:
         waves_map["refresh_update"] = refresh_update
         waves_map["refresh_unchanged"] = refresh_unchanged
 
 
+async def save_rank_index(
+    uid: str,
+    refresh_update: Dict,
+    removed_role_ids: List[int],
+    old_stat: Optional[Tuple[int, int]],
+):
+    try:
+        from ..wutheringwaves_rank.darw_rank_card import update_rank_index
+
+        role_details = []
+        for item in refresh_update.values():
+            try:
+                role_details.append(RoleDetailData.model_validate(item))
+            except Exception as e:
+                logger.debug(f"排行索引角色解析失败 uid={uid}: {e}")
+        await update_rank_index(uid, role_details, removed_role_ids, old_stat)
+    except Exception as e:
+        logger.exception(f"更新排行索引失败 uid={uid}:", e)
+
+
 async def save_char_list_cache(uid: str, waves_char_rank: Optional[List[WavesCharRank]]):
     """保存角色评分数据到charListData.json供练度排行使用
 
@@ -246,6 +279,8 @@ async def refresh_char(
     refresh_type: Union[str, List[str]] = "all",
 ) -> Union[str, List]:
     waves_datas = []
+    # 刷新面板时不使用接口缓存（get_self_waves_ck 每条命令都会 refresh_data，不在那里清理）
+    ttl_cache_invalidate(roleId=uid)
     if not ck:
         is_self_ck, ck = await waves_api.get_ck_result(uid, user_id, ev.bot_id)
     if not ck:
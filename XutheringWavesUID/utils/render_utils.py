@@ -3,7 +3,7 @@ import asyncio
 import time
 import re
 import logging
-from typing import Union, Optional
+from typing import Any, Dict, List, Union, Optional
 from pathlib import Path
 
 import httpx
@@ -12,6 +12,7 @@ from gsuid_core.logger import logger
 from gsuid_core.config import core_config, CONFIG_DEFAULT
 from gsuid_core.app_life import app as fastapi_app
 from fastapi.staticfiles import StaticFiles
+from .card_cache import card_cache, make_card_key
 from .resource.RESOURCE_PATH import TEMP_PATH
 from ..wutheringwaves_config.wutheringwaves_config import WutheringWavesConfig
 
@@ -52,8 +53,11 @@ _browser_uses = 0
 _last_used = 0.0
 _active_contexts = 0
 
+_browser_gen = 0
+
 _MAX_BROWSER_USES = 1000
 _BROWSER_IDLE_TTL = 3600
+_DEFAULT_VIEWPORT = {"width": 1200, "height": 1000}
 
 _FONT_CSS_NAME = "fonts.css"
 _FONTS_DIR = TEMP_PATH / "fonts"
@@ -88,7 +92,7 @@ _mount_fonts()
 
 async def _ensure_browser():
     """Get a reusable browser instance; restart periodically to bound memory."""
-    global _playwright, _browser, _browser_uses, _last_used, _active_contexts
+    global _playwright, _browser, _browser_uses, _last_used, _active_contexts, _browser_gen
 
     if not PLAYWRIGHT_AVAILABLE or async_playwright is None:
         return None
@@ -127,11 +131,134 @@ async def _ensure_browser():
                 args=["--no-sandbox", "--disable-setuid-sandbox"]
             )
             _browser_uses = 0
+            _browser_gen += 1
 
         _last_used = now
         return _browser
 
 
+def _get_font_css_url() -> str:
+    if (_FONTS_DIR / _FONT_CSS_NAME).exists():
+        return f"{_get_local_base_url()}/waves/fonts/{_FONT_CSS_NAME}"
+    # 本地没有fonts.css时，使用配置的在线字体URL
+    return WutheringWavesConfig.get_config("FontCssUrl").data
+
+
+class _PooledPage:
+    def __init__(self, context, page, gen: int):
+        self.context = context
+        self.page = page
+        self.gen = gen
+        self.uses = 0
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+
+
+class PagePool:
+    """预热页面池
+
+    每个页面使用独立的 context，创建时预先加载字体 css 及字体文件，渲染时借出页面替换内容后截图归还，
+    同一 context 内的字体缓存可以复用。页面使用 RenderPageMaxUses 次后关闭重建，浏览器重启后旧页面作废。
+    同时借出的页面数即并发渲染数，由 RenderPagePoolSize 限制（重启生效）。
+    """
+
+    def __init__(self):
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._idle: List[_PooledPage] = []
+
+        self.renders = 0
+        self.failed = 0
+        self.created = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.render_total = 0.0
+        self.render_max = 0.0
+
+    def _get_sem(self) -> asyncio.Semaphore:
+        if self._sem is None:
+            size = WutheringWavesConfig.get_config("RenderPagePoolSize").data
+            self._sem = asyncio.Semaphore(max(1, int(size)))
+        return self._sem
+
+    async def _create(self, browser) -> _PooledPage:
+        context = await browser.new_context(viewport=_DEFAULT_VIEWPORT)
+        try:
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+        pooled = _PooledPage(context, page, _browser_gen)
+        try:
+            await page.set_content(
+                f'<html><head><link rel="stylesheet" href="{_get_font_css_url()}"></head><body></body></html>'
+            )
+            # @font-face 默认用到时才下载，这里提前加载进缓存
+            await page.evaluate("() => Promise.all([...document.fonts].map((f) => f.load().catch(() => null)))")
+        except Exception as e:
+            logger.debug(f"[鸣潮] 页面预热失败: {e}")
+        self.created += 1
+        return pooled
+
+    async def acquire(self) -> Optional[_PooledPage]:
+        start = time.monotonic()
+        sem = self._get_sem()
+        await sem.acquire()
+        wait = time.monotonic() - start
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+        try:
+            browser = await _ensure_browser()
+            if browser is None:
+                sem.release()
+                return None
+            while self._idle:
+                pooled = self._idle.pop()
+                if pooled.gen == _browser_gen and not pooled.page.is_closed():
+                    return pooled
+                await pooled.close()
+            return await self._create(browser)
+        except BaseException:
+            sem.release()
+            raise
+
+    async def release(self, pooled: _PooledPage, ok: bool, cost: float):
+        self.renders += 1
+        if not ok:
+            self.failed += 1
+        self.render_total += cost
+        self.render_max = max(self.render_max, cost)
+
+        pooled.uses += 1
+        max_uses = WutheringWavesConfig.get_config("RenderPageMaxUses").data
+        try:
+            if not ok or pooled.uses >= max(1, int(max_uses)) or pooled.gen != _browser_gen:
+                await pooled.close()
+            else:
+                self._idle.append(pooled)
+        finally:
+            self._get_sem().release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "renders": self.renders,
+            "failed": self.failed,
+            "created": self.created,
+            "idle": len(self._idle),
+            "wait_avg": self.wait_total / self.renders if self.renders else 0.0,
+            "wait_max": self.wait_max,
+            "render_avg": self.render_total / self.renders if self.renders else 0.0,
+            "render_max": self.render_max,
+        }
+
+
+page_pool = PagePool()
+
+
 async def _render_via_remote(html_content: str, remote_url: str) -> Optional[bytes]:
     """使用外置渲染服务渲染 HTML"""
     start_time = time.time()
@@ -171,6 +298,14 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
 
         template = waves_templates.get_template(template_name)
 
+        # 模板和数据都未变化时直接返回上次的图片
+        template_file = Path(template.filename) if template.filename else None
+        cache_key = make_card_key(f"html:{template_name}", template_file, context)
+        cached = await card_cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"[鸣潮] HTML渲染命中缓存: {template_name}")
+            return cached
+
         remote_render_enable = WutheringWavesConfig.get_config("RemoteRenderEnable").data
         remote_url = WutheringWavesConfig.get_config("RemoteRenderUrl").data if remote_render_enable else None
 
@@ -183,6 +318,7 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
                 logger.debug(f"[鸣潮] 外置渲染已启用，尝试使用: {remote_url}")
                 remote_result = await _render_via_remote(html_content, remote_url)
                 if remote_result is not None:
+                    await card_cache.set(cache_key, remote_result)
                     return remote_result
 
                 logger.info("[鸣潮] 外置渲染失败，回退到本地渲染")
@@ -190,16 +326,7 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
                 logger.warning(f"[鸣潮] 外置渲染异常: {e}，回退到本地渲染")
 
         try:
-            font_css_path = _FONTS_DIR / _FONT_CSS_NAME
-            base_url = _get_local_base_url()
-
-            if font_css_path.exists():
-                context["font_css_url"] = f"{base_url}/waves/fonts/{_FONT_CSS_NAME}"
-            else:
-                # 本地没有fonts.css时，使用配置的在线字体URL
-                font_css_url = WutheringWavesConfig.get_config("FontCssUrl").data
-                context["font_css_url"] = font_css_url
-
+            context["font_css_url"] = _get_font_css_url()
             html_content = template.render(**context)
             logger.debug(f"[鸣潮] 使用本地字体渲染 HTML: {template_name}")
         except Exception as e:
@@ -220,15 +347,16 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
 
         local_start_time = time.time()
         try:
-            logger.debug("[鸣潮] 获取复用浏览器实例...")
-            browser = await _ensure_browser()
-            if browser is None:
+            logger.debug("[鸣潮] 获取预热页面...")
+            pooled = await page_pool.acquire()
+            if pooled is None:
                 return None
 
-            context_obj = await browser.new_context(viewport={"width": 1200, "height": 1000})
             _active_contexts += 1
+            ok = False
             try:
-                page = await context_obj.new_page()
+                page = pooled.page
+                await page.set_viewport_size(_DEFAULT_VIEWPORT)
                 logger.debug("[鸣潮] 加载HTML内容...")
                 await page.set_content(html_content)
 
@@ -255,17 +383,17 @@ async def render_html(waves_templates, template_name: str, context: dict) -> Opt
 
                 logger.debug("[鸣潮] 正在截图...")
                 screenshot = await container.screenshot(type='jpeg', quality=90)
+                ok = True
                 local_elapsed_time = time.time() - local_start_time
                 logger.info(f"[鸣潮] 本地渲染成功，耗时: {local_elapsed_time:.2f}s，图片大小: {len(screenshot)} bytes")
+                await card_cache.set(cache_key, screenshot)
                 return screenshot
             finally:
-                try:
-                    await context_obj.close()
-                except Exception:
-                    pass
                 _active_contexts = max(0, _active_contexts - 1)
                 _browser_uses += 1
                 _last_used = time.monotonic()
+                # 失败的页面直接关闭，不放回池中
+                await page_pool.release(pooled, ok, time.time() - local_start_time)
         except Exception as e:
             logger.error(f"[鸣潮] Playwright execution failed: {e}")
             raise e
@@ -16,9 +16,17 @@ ANN_DATA_PATH = MAIN_PATH / "ann_data.json"
 
 # 用户数据保存文件
 PLAYER_PATH = MAIN_PATH / "players"
+# 角色面板索引库
+PANEL_STORE_PATH = MAIN_PATH / "panel_store.db"
+# 资源文件状态（大小、mtime、sha256），未变化的文件无需重新计算哈希
+RESOURCE_STATE_PATH = MAIN_PATH / "resource_state.db"
+# 待上传数据（面板排行、深塔、冥海）
+UPLOAD_SPILL_PATH = MAIN_PATH / "upload_spill"
 
 # 储存数据保存路径
 CACHE_PATH = MAIN_PATH / "cache"
+# 卡片图片缓存
+CARD_CACHE_PATH = CACHE_PATH / "card"
 
 # 游戏素材
 RESOURCE_PATH = MAIN_PATH / "resource"
@@ -92,6 +100,8 @@ def init_dir():
     for i in [
         MAIN_PATH,
         PLAYER_PATH,
+        UPLOAD_SPILL_PATH,
+        CARD_CACHE_PATH,
         RESOURCE_PATH,
         PHANTOM_PATH,
         MATERIAL_PATH,
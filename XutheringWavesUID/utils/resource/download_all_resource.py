@@ -5,9 +5,10 @@ import asyncio
 import time
 
 from gsuid_core.logger import logger
-from gsuid_core.utils.download_resource.download_core import download_all_file
 import httpx
 
+from .resource_sync import sync_resource
+
 from .RESOURCE_PATH import (
     MAP_PATH,
     BUILD_TEMP,
@@ -166,7 +167,7 @@ async def download_all_resource(force: bool = False):
         plugin_name = "XutheringWavesUID"
         url, tag = await check_speed(plugin_name)
 
-        await download_all_file(
+        await sync_resource(
             plugin_name,
             {
                 "resource/avatar": AVATAR_PATH,
@@ -203,27 +204,31 @@ async def download_all_resource(force: bool = False):
 async def reload_all_modules():
     # 强制加载所有 map 数据
     from ..name_convert import ensure_data_loaded as ensure_name_convert_loaded
-    from ..ascension.char import ensure_data_loaded as ensure_char_loaded
-    from ..ascension.echo import ensure_data_loaded as ensure_echo_loaded
-    from ..ascension.sonata import ensure_data_loaded as ensure_sonata_loaded
-    from ..ascension.weapon import ensure_data_loaded as ensure_weapon_loaded
+    from ..ascension.char import invalidate_data as invalidate_char
+    from ..ascension.echo import invalidate_data as invalidate_echo
+    from ..ascension.sonata import invalidate_data as invalidate_sonata
+    from ..ascension.weapon import invalidate_data as invalidate_weapon
     from ..map.damage.register import reload_all_register
     from ..limit_user_card import load_limit_user_card
     from ..calc import reload_wuwacalc_module
     from ..damage.damage import reload_damage_module
     from ...wutheringwaves_wiki.char_wiki_render import clear_wiki_cache
+    from ..rank_index import reset_calc_version
+    from ..card_cache import card_cache
 
-    # 在下载完成后强制加载所有数据
+    # 别名数据用于解析命令，立即加载；角色/武器/声骸/合鸣数据在下次使用时重新加载
     ensure_name_convert_loaded(force=True)
-    ensure_char_loaded(force=True)
-    ensure_weapon_loaded(force=True)
-    ensure_echo_loaded(force=True)
-    ensure_sonata_loaded(force=True)
+    invalidate_char()
+    invalidate_weapon()
+    invalidate_echo()
+    invalidate_sonata()
     
     reload_wuwacalc_module()
     reload_damage_module()
     reload_all_register()
+    reset_calc_version()
     clear_wiki_cache()
+    card_cache.clear()
     card_list = await load_limit_user_card()
     if card_list:
         logger.info(f"[鸣潮][加载角色极限面板] 数量: {len(card_list)}")
\ No newline at end of file
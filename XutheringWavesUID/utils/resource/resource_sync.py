@@ -0,0 +1,369 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Optional
+from urllib.parse import unquote
+
+import httpx
+
+from gsuid_core.logger import logger
+
+from ..api.http_pool import http_pool
+from .RESOURCE_PATH import RESOURCE_STATE_PATH
+
+# 流式计算哈希时每次读取的大小
+HASH_CHUNK = 1024 * 1024
+# 单个文件下载失败后的尝试次数，每次从已下载的位置继续
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, read=120.0)
+# 目录中的哈希清单，文件更新后大小通常不变，每次都重新下载
+HASH_MANIFEST = "hash.json"
+
+# nginx autoindex：<a href="name">name</a>   01-Jan-2024 00:00   12345
+_LISTING_RE = re.compile(r'<a href="([^"]+)">[^<]*</a>[ \t]+\S+[ \t]+\S+[ \t]+(-|\d+)')
+
+
+def file_sha256(path: Path) -> str:
+    """分块读取计算 SHA256，不把整个文件读入内存"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_into(path: Path, h):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+
+
+class FileState:
+    """本地文件状态库
+
+    记录每个文件计算哈希时的 (大小, mtime, sha256)，大小和 mtime 未变化时直接返回记录的哈希，
+    启动时校验构建文件无需重新读取全部文件。
+    """
+
+    def __init__(self, path: Path = RESOURCE_STATE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._rows: Optional[Dict[str, Tuple[int, int, str]]] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.hashed = 0
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_state (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _get_rows(self) -> Dict[str, Tuple[int, int, str]]:
+        if self._rows is None:
+            rows = self._get_conn().execute("SELECT path, size, mtime_ns, sha256 FROM file_state")
+            self._rows = {p: (size, mtime_ns, sha) for p, size, mtime_ns, sha in rows}
+        return self._rows
+
+    def lookup(self, file: Path, st: Optional[os.stat_result] = None) -> Optional[str]:
+        """文件大小和 mtime 与记录一致时返回记录的哈希"""
+        try:
+            st = st or file.stat()
+        except OSError:
+            return None
+        with self._lock:
+            row = self._get_rows().get(str(file))
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        return None
+
+    def record(self, file: Path, sha: str, st: Optional[os.stat_result] = None):
+        try:
+            st = st or file.stat()
+        except OSError:
+            return
+        row = (st.st_size, st.st_mtime_ns, sha)
+        with self._lock:
+            rows = self._get_rows()
+            if rows.get(str(file)) == row:
+                return
+            rows[str(file)] = row
+            conn = self._get_conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO file_state VALUES (?, ?, ?, ?)", (str(file), *row))
+
+    def sha256(self, file: Path) -> str:
+        st = file.stat()
+        sha = self.lookup(file, st)
+        if sha is not None:
+            self.hits += 1
+            return sha
+        # 使用计算前的 stat，计算期间文件被修改时下次会重新计算
+        sha = file_sha256(file)
+        self.hashed += 1
+        self.record(file, sha, st)
+        return sha
+
+
+file_state = FileState()
+
+
+class CategoryReport:
+    """单个资源目录的同步结果"""
+
+    __slots__ = ("name", "files", "bytes", "skipped", "failed", "seconds")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: 下载{self.files}个 {self.bytes / 1024 / 1024:.1f}MB "
+            f"跳过{self.skipped}个 失败{self.failed}个 {self.seconds:.1f}s"
+        )
+
+
+class ResourceSync:
+    """资源同步
+
+    读取远端目录列表（文件名和大小）作为清单，目录中有 hash.json 时同时校验 SHA256。
+    本地文件大小一致且哈希记录未变化的文件直接跳过，其余文件以有限并发下载：
+    先写入 .part 文件，中断后用 Range 请求继续，校验通过后再替换原文件。
+    只续传本次同步中写入的 .part，并带上 If-Range，远端文件已变化时重新下载整个文件。
+    """
+
+    def __init__(self, plugin_name: str, url: str, tag: str, concurrency: int = 8):
+        self.plugin_name = plugin_name
+        self.url = url
+        self.tag = tag
+        self.base = f"{url.rstrip('/')}/{plugin_name}"
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        # 本次同步写入的 .part 文件对应的 ETag / Last-Modified
+        self._validators: Dict[Path, str] = {}
+
+    async def _list(self, client: httpx.AsyncClient, url: str) -> Optional[Dict[str, Optional[int]]]:
+        """{文件名: 大小}，无法解析时返回 None"""
+        async with self._sem:
+            resp = await client.get(url, timeout=DOWNLOAD_TIMEOUT)
+        resp.raise_for_status()
+        text = resp.text
+        files: Dict[str, Optional[int]] = {}
+        matched = False
+        for href, size in _LISTING_RE.findall(text):
+            matched = True
+            if href.endswith("/") or "?" in href:
+                continue
+            files[unquote(href)] = int(size) if size.isdigit() else None
+        if not matched and "<pre>" not in text:
+            return None
+        return files
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        file: Path,
+        size: Optional[int],
+        sha: Optional[str],
+    ) -> int:
+        """下载单个文件，返回本次下载的字节数"""
+        part = file.with_name(file.name + ".part")
+        validator = self._validators.pop(part, None)
+        # 之前运行留下的 .part 无法确认与远端是同一版本，大小相同的更新会被拼接成错误的文件
+        offset = part.stat().st_size if validator and part.exists() else 0
+        if not offset or (size is not None and offset >= size):
+            part.unlink(missing_ok=True)
+            offset = 0
+
+        h = hashlib.sha256()
+        received = 0
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator} if offset else {}
+        async with client.stream("GET", url, headers=headers, timeout=DOWNLOAD_TIMEOUT) as resp:
+            if resp.status_code == 416:
+                part.unlink(missing_ok=True)
+            resp.raise_for_status()
+            # 弱 ETag 不能用于 If-Range；没有校验值时中断后从头下载
+            etag = resp.headers.get("etag")
+            validator = etag if etag and not etag.startswith("W/") else resp.headers.get("last-modified")
+            if validator:
+                self._validators[part] = validator
+            if offset and resp.status_code == 206:
+                await asyncio.to_thread(_hash_into, part, h)
+                mode = "ab"
+            else:
+                offset = 0
+                mode = "wb"
+            with open(part, mode) as f:
+                async for chunk in resp.aiter_bytes():
+                    f.write(chunk)
+                    h.update(chunk)
+                    received += len(chunk)
+
+        total = offset + received
+        if size is not None and total != size:
+            if total > size:
+                part.unlink(missing_ok=True)
+            raise ValueError(f"大小不一致 {total} != {size}")
+        digest = h.hexdigest()
+        if sha and digest != sha:
+            part.unlink(missing_ok=True)
+            raise ValueError("SHA256 不一致")
+
+        self._validators.pop(part, None)
+        os.replace(part, file)
+        file_state.record(file, digest)
+        return received
+
+    async def _download(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        file: Path,
+        size: Optional[int],
+        sha: Optional[str],
+        report: CategoryReport,
+    ):
+        async with self._sem:
+            for attempt in range(1, DOWNLOAD_RETRIES + 1):
+                try:
+                    received = await self._fetch(client, url, file, size, sha)
+                    report.bytes += received
+                    report.files += 1
+                    return
+                except Exception as e:
+                    if attempt == DOWNLOAD_RETRIES:
+                        report.failed += 1
+                        logger.warning(f"{self.tag} 下载失败 {file.name}: {e}")
+                        return
+                    await asyncio.sleep(attempt)
+
+    @staticmethod
+    def _need_download(file: Path, size: Optional[int], sha: Optional[str]) -> bool:
+        try:
+            st = file.stat()
+        except OSError:
+            return True
+        if not st.st_size or (size is not None and st.st_size != size):
+            return True
+        if sha:
+            return file_state.sha256(file) != sha
+        return False
+
+    async def _sync_category(self, client: httpx.AsyncClient, endpoint: str, path: Path) -> CategoryReport:
+        report = CategoryReport(endpoint)
+        start = time.perf_counter()
+        path.mkdir(parents=True, exist_ok=True)
+        url = f"{self.base}/{endpoint}/"
+        try:
+            listing = await self._list(client, url)
+            if listing is None:
+                # 不是可解析的目录列表，交给通用下载
+                from gsuid_core.utils.download_resource.download_core import download_all_file
+
+                await download_all_file(self.plugin_name, {endpoint: path}, self.url, self.tag)
+                return report
+
+            expected: Dict[str, str] = {}
+            if HASH_MANIFEST in listing:
+                # 清单每次都会下载，不计入下载数量
+                manifest_report = CategoryReport(endpoint)
+                await self._download(client, url + HASH_MANIFEST, path / HASH_MANIFEST, None, None, manifest_report)
+                report.failed += manifest_report.failed
+                try:
+                    expected = json.loads((path / HASH_MANIFEST).read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"{self.tag} 读取 {endpoint}/{HASH_MANIFEST} 失败: {e}")
+
+            todo: List[Tuple[str, Path, Optional[int], Optional[str]]] = []
+            for name, size in listing.items():
+                if name == HASH_MANIFEST:
+                    continue
+                file = path / name
+                sha = expected.get(name)
+                if await asyncio.to_thread(self._need_download, file, size, sha):
+                    todo.append((url + name, file, size, sha))
+                else:
+                    report.skipped += 1
+
+            await asyncio.gather(*[self._download(client, u, f, size, sha, report) for u, f, size, sha in todo])
+        except Exception as e:
+            report.failed += 1
+            logger.warning(f"{self.tag} 同步 {endpoint} 失败: {e}")
+        finally:
+            report.seconds = time.perf_counter() - start
+        return report
+
+    async def run(self, epath_map: Dict[str, Path]) -> List[CategoryReport]:
+        client = http_pool.get_httpx_client()
+        return list(
+            await asyncio.gather(*[self._sync_category(client, endpoint, path) for endpoint, path in epath_map.items()])
+        )
+
+
+# 最近一次同步的结果
+last_reports: List[CategoryReport] = []
+
+
+async def sync_resource(
+    plugin_name: str,
+    epath_map: Dict[str, Path],
+    url: str,
+    tag: str,
+) -> List[CategoryReport]:
+    from ...wutheringwaves_config import WutheringWavesConfig
+
+    global last_reports
+    try:
+        concurrency = int(WutheringWavesConfig.get_config("ResourceDownloadConcurrency").data)
+    except Exception:
+        concurrency = 8
+
+    start = time.perf_counter()
+    reports = await ResourceSync(plugin_name, url, tag, concurrency).run(epath_map)
+    last_reports = reports
+
+    for r in reports:
+        if r.files or r.failed:
+            logger.info(f"[{plugin_name}] {r}")
+    files = sum(r.files for r in reports)
+    size = sum(r.bytes for r in reports)
+    failed = sum(r.failed for r in reports)
+    logger.info(
+        f"[{plugin_name}] 资源同步完成: 下载{files}个 {size / 1024 / 1024:.1f}MB "
+        f"失败{failed}个 耗时{time.perf_counter() - start:.1f}s"
+    )
+    return reports
+
+
+def get_sync_stats() -> Dict[str, Any]:
+    return {
+        "files": sum(r.files for r in last_reports),
+        "bytes": sum(r.bytes for r in last_reports),
+        "failed": sum(r.failed for r in last_reports),
+        "hash_hits": file_state.hits,
+        "hashed": file_state.hashed,
+    }
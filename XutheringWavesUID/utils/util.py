@@ -3,8 +3,9 @@ import random
 import string
 import asyncio
 import inspect
-from typing import Any, Dict, List, TypeVar, Callable, Coroutine, overload
+from typing import Any, Dict, List, Tuple, TypeVar, Callable, Coroutine, overload
 from functools import wraps
+from collections import OrderedDict
 
 import httpx
 
@@ -57,6 +58,111 @@ def timed_async_cache(expiration, condition=lambda x: True):
     return decorator
 
 
+# 所有 ttl_async_cache 包装的函数，用于按参数统一失效和统计
+_ttl_caches: List[Any] = []
+
+
+def ttl_async_cache(ttl: float, maxsize: int = 1024, condition: Callable[[Any], bool] = lambda x: True):
+    """按参数缓存的异步函数结果
+
+    以除 self / cls 之外的全部参数（绑定默认值后）为键，结果缓存 ttl 秒，最多保留 maxsize 个。
+    相同参数的并发调用只执行一次，其余调用等待同一个结果；condition 为 False 的结果
+    （如失败的 KuroApiResp）和异常不缓存。缓存的结果在调用方之间共享，不要原地修改。
+    """
+
+    def decorator(func):
+        sig = inspect.signature(func)
+        params = list(sig.parameters.keys())
+        is_cls_method = bool(params) and params[0] in ["self", "cls"]
+        arg_names = params[1:] if is_cls_method else params
+
+        # key -> (过期时间, 结果)
+        cache: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+        inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}
+        stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+        def make_key(args, kwargs) -> Tuple[Any, ...]:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments[name] for name in arg_names)
+
+        async def run(key, args, kwargs):
+            try:
+                value = await func(*args, **kwargs)
+                # 请求期间被 cache_invalidate 时不写入缓存
+                if condition(value) and inflight.get(key) is asyncio.current_task():
+                    cache[key] = (time.monotonic() + ttl, value)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+                return value
+            finally:
+                if inflight.get(key) is asyncio.current_task():
+                    del inflight[key]
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                key = make_key(args, kwargs)
+                hash(key)
+            except TypeError:
+                return await func(*args, **kwargs)
+
+            entry = cache.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    cache.move_to_end(key)
+                    stats["hits"] += 1
+                    return entry[1]
+                del cache[key]
+
+            task = inflight.get(key)
+            if task is None:
+                stats["misses"] += 1
+                task = inflight[key] = asyncio.ensure_future(run(key, args, kwargs))
+            else:
+                stats["coalesced"] += 1
+            # 单个调用方被取消时不影响其他等待同一结果的调用方
+            return await asyncio.shield(task)
+
+        def cache_invalidate(**match):
+            """删除参数与 match 一致的缓存，不传参数时全部删除"""
+            if not match:
+                cache.clear()
+                inflight.clear()
+                return
+            index = {name: arg_names.index(name) for name in match if name in arg_names}
+            if len(index) != len(match):
+                return
+            for store in (cache, inflight):
+                for key in [k for k in store if all(k[i] == match[name] for name, i in index.items())]:
+                    del store[key]
+
+        def cache_info() -> Dict[str, int]:
+            return {**stats, "size": len(cache)}
+
+        wrapper.cache_invalidate = cache_invalidate
+        wrapper.cache_info = cache_info
+        _ttl_caches.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+def ttl_cache_invalidate(**match):
+    """在所有 ttl_async_cache 中删除参数与 match 一致的缓存"""
+    for wrapper in _ttl_caches:
+        wrapper.cache_invalidate(**match)
+
+
+def ttl_cache_stats() -> Dict[str, int]:
+    total = {"hits": 0, "misses": 0, "coalesced": 0, "size": 0}
+    for wrapper in _ttl_caches:
+        for k, v in wrapper.cache_info().items():
+            total[k] += v
+    return total
+
+
 F = TypeVar("F", bound=Callable[..., Coroutine[Any, Any, Any]])
 
 
@@ -20,6 +20,7 @@ from ..utils.image import (
 )
 from .calendar_model import ImageItem, SpecialImages, VersionActivity
 from ..utils.waves_api import waves_api
+from ..utils.card_cache import card_cache, make_card_key
 from ..utils.ascension.char import get_char_id
 from ..utils.ascension.weapon import get_weapon_id
 from ..utils.fonts.waves_fonts import ww_font_20, ww_font_24, ww_font_30
@@ -125,6 +126,23 @@ async def draw_calendar_img(ev: Event, uid: str):
     # 当前时间
     now = datetime.now()
 
+    bg = f"bg{random.choice([1, 2])}"
+    kuro_calendar_path = get_latest_calendar_image(now)
+    if kuro_calendar_path is None:
+        kuro_calendar_path = CALENDAR_PATH / "calendar.png"
+
+    # 剩余时间精确到分钟，同一分钟内数据不变时直接返回上次的图片
+    cache_key = make_card_key(
+        "calendar",
+        wiki_home.get("data"),
+        now.strftime("%Y-%m-%d %H:%M"),
+        bg,
+        kuro_calendar_path,
+    )
+    cached = await card_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     gacha_char_list = []
     gacha_weapon_list = []
     content = None
@@ -161,7 +179,6 @@ async def draw_calendar_img(ev: Event, uid: str):
         total_high += temp_high
         total_high += bar1_high
 
-    bg = f"bg{random.choice([1, 2])}"
     img = await get_calendar_bg(1200, total_high, bg)
     # title
     title_img = Image.open(TEXT_PATH / "title.png")
@@ -308,9 +325,6 @@ async def draw_calendar_img(ev: Event, uid: str):
 
     img = add_footer(img)
 
-    kuro_calendar_path = get_latest_calendar_image(now)
-    if kuro_calendar_path is None:
-        kuro_calendar_path = CALENDAR_PATH / "calendar.png"
     if kuro_calendar_path.exists():
         try:
             custom_calendar = Image.open(kuro_calendar_path).convert("RGBA")
@@ -325,6 +339,7 @@ async def draw_calendar_img(ev: Event, uid: str):
             pass
 
     img = await convert_img(img)
+    await card_cache.set(cache_key, img)
     return img
 
 
@@ -1,11 +1,13 @@
 import hashlib
 import os
 import ssl
+import time
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 from PIL import Image
 from gsuid_core.logger import logger
@@ -48,6 +50,7 @@ from ..utils.resource.RESOURCE_PATH import (
     MAIN_PATH,
 )
 from ..wutheringwaves_config import WutheringWavesConfig
+from .orb_index import OrbIndex, get_orb_index
 
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
 ORB_RATIO = 0.75
@@ -55,6 +58,16 @@ ORB_MIN_MATCHES = 40
 ORB_THRESHOLD = 0.7
 ORB_BLOCK_THRESHOLD = 0.9
 ORB_FEATURES = 2000
+# 按索引投票选出的候选数量，只对这些图片做完整的 ORB 校验
+ORB_SHORTLIST = 8
+
+# 差值哈希边长（64 位）和默认的候选汉明距离
+DHASH_SIZE = 8
+DHASH_RADIUS = 20
+# 每个线程任务校验的图片对数量
+DEDUP_BATCH = 64
+# 比对进度消息的最小间隔（秒）
+DEDUP_REPORT_INTERVAL = 30
 
 CROP_PORTRAIT = (85, 265, 525, 1070)
 CROP_LANDSCAPE = (520, 0, 1100, 620)
@@ -152,6 +165,15 @@ async def _fetch_image_bytes(url: str) -> Optional[bytes]:
         return None
 
 
+def _to_features(keypoints, descriptors):
+    """按响应强度从高到低排列，索引粗筛时只使用靠前的特征点"""
+    if descriptors is None or not keypoints:
+        return None
+    order = np.argsort([-kp.response for kp in keypoints], kind="stable")
+    pts = np.float32([kp.pt for kp in keypoints])[order]
+    return pts, descriptors[order]
+
+
 def _compute_orb_features_from_image(image: Image.Image):
     if cv2 is None:
         return None
@@ -159,10 +181,40 @@ def _compute_orb_features_from_image(image: Image.Image):
     gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
     orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
     keypoints, descriptors = orb.detectAndCompute(gray, None)
-    if descriptors is None or not keypoints:
+    return _to_features(keypoints, descriptors)
+
+
+def _match_in_dir(dir_path: Path, feat_new) -> Optional[Tuple[Path, float]]:
+    """在目录中查找与 feat_new 最相似的图片
+
+    先同步目录的特征索引，按描述子最近邻投票选出 ORB_SHORTLIST 张候选，只对候选做完整校验；粗筛为空时逐个比对。
+    """
+    images = list(_iter_images(dir_path))
+    if not images:
         return None
-    pts = np.float32([kp.pt for kp in keypoints])
-    return pts, descriptors
+
+    candidates = images
+    index = _get_orb_index(dir_path)
+    if index is not None:
+        try:
+            index.sync(images, get_orb_features)
+            by_name = {p.name: p for p in images}
+            shortlist = [by_name[n] for n in index.shortlist(feat_new[1], ORB_SHORTLIST) if n in by_name]
+            # 没有桶碰撞或桶都过大时粗筛为空，退回逐个比对
+            if shortlist:
+                candidates = shortlist
+        except Exception as e:
+            logger.warning(f"[鸣潮] ORB索引查询失败，逐个比对: {dir_path}: {e}")
+
+    best: Optional[Tuple[Path, float]] = None
+    for img_path in candidates:
+        feat_old = get_orb_features(img_path)
+        if feat_old is None:
+            continue
+        sim = _orb_similarity(feat_new, feat_old)
+        if sim is not None and (best is None or sim > best[1]):
+            best = (img_path, sim)
+    return best
 
 
 async def match_hash_id_from_event(
@@ -232,17 +284,10 @@ async def match_hash_id_from_event(
             for dir_path in char_dirs:
                 if not dir_path.exists():
                     continue
-                for img_path in _iter_images(dir_path):
-                    feat_old = get_orb_features(img_path)
-                    if feat_old is None:
-                        continue
-                    sim = _orb_similarity(feat_new, feat_old)
-                    if sim is None:
-                        continue
-                    if sim > best_sim:
-                        best_sim = sim
-                        best_path = img_path
-                        best_char_id = dir_path.name
+                match = await asyncio.to_thread(_match_in_dir, dir_path, feat_new)
+                if match is not None and match[1] > best_sim:
+                    best_path, best_sim = match
+                    best_char_id = dir_path.name
 
             # 如果在当前类型找到了足够相似的结果，停止搜索其他类型
             if best_sim >= ORB_THRESHOLD:
@@ -329,6 +374,12 @@ def delete_orb_cache(image_path: Path) -> None:
             cache_path.unlink()
         except Exception:
             logger.warning(f"[鸣潮] 删除ORB缓存失败: {cache_path}")
+    index = _get_orb_index(image_path.parent)
+    if index is not None:
+        try:
+            index.remove(image_path.name)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 更新ORB索引失败: {image_path}: {e}")
 
 
 def _compute_orb_features(image_path: Path):
@@ -339,13 +390,32 @@ def _compute_orb_features(image_path: Path):
         return None
     orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
     keypoints, descriptors = orb.detectAndCompute(img, None)
-    if descriptors is None or not keypoints:
+    return _to_features(keypoints, descriptors)
+
+
+def _get_orb_index(dir_path: Path) -> Optional[OrbIndex]:
+    """图片目录对应的 ORB 特征索引"""
+    if np is None:
         return None
-    pts = np.float32([kp.pt for kp in keypoints])
-    return pts, descriptors
+    for type_name, base in CUSTOM_PATH_MAP.items():
+        try:
+            rel = dir_path.relative_to(base)
+        except ValueError:
+            continue
+        return get_orb_index(CUSTOM_ORB_PATH / type_name / rel)
+    return None
 
 
 def get_orb_features(image_path: Path):
+    index = _get_orb_index(image_path.parent)
+    if index is not None:
+        try:
+            feat = index.get(image_path.name, image_path.stat().st_mtime_ns)
+        except OSError:
+            feat = None
+        if feat is not None:
+            return feat
+
     cached = _load_orb_cache(image_path)
     if cached is not None:
         return cached
@@ -363,6 +433,138 @@ def update_orb_cache(image_path: Path) -> None:
         return
     pts, des = computed
     _save_orb_cache(image_path, pts, des)
+    index = _get_orb_index(image_path.parent)
+    if index is not None:
+        try:
+            index.put(image_path.name, image_path.stat().st_mtime_ns, computed)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 更新ORB索引失败: {image_path}: {e}")
+
+
+def _get_dhash_cache_path(image_path: Path) -> Optional[Path]:
+    cache_path = _get_orb_cache_path(image_path)
+    if not cache_path:
+        return None
+    return cache_path.with_suffix(".dhash")
+
+
+def _compute_dhash(image_path: Path) -> Optional[int]:
+    """64 位差值哈希：缩放为 9x8 灰度图，比较每行相邻像素"""
+    try:
+        with Image.open(image_path) as img:
+            img.draft("L", (DHASH_SIZE * 8, DHASH_SIZE * 8))
+            small = img.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.LANCZOS)
+            px = list(small.getdata())
+    except Exception:
+        return None
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for col in range(DHASH_SIZE):
+            value = (value << 1) | (px[offset + col] > px[offset + col + 1])
+    return value
+
+
+def get_dhash(image_path: Path) -> Optional[int]:
+    cache_path = _get_dhash_cache_path(image_path)
+    if cache_path and cache_path.exists():
+        try:
+            if cache_path.stat().st_mtime >= image_path.stat().st_mtime:
+                return int(cache_path.read_text(), 16)
+        except (OSError, ValueError):
+            pass
+    value = _compute_dhash(image_path)
+    if value is not None and cache_path:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(f"{value:016x}")
+        except OSError:
+            pass
+    return value
+
+
+def _get_dhash_radius() -> int:
+    try:
+        return max(0, int(WutheringWavesConfig.get_config("CardDedupHashRadius").data))
+    except Exception:
+        return DHASH_RADIUS
+
+
+class HammingIndex:
+    """BK 树，按汉明距离查询半径内的哈希"""
+
+    def __init__(self) -> None:
+        # 节点: (哈希, 对应的条目列表, {距离: 子节点})
+        self.root: Optional[Tuple[int, list, dict]] = None
+
+    def add(self, value: int, item) -> None:
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            dist = (node[0] ^ value).bit_count()
+            if dist == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = (value, [item], {})
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> list:
+        result = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            dist = (node[0] ^ value).bit_count()
+            if dist <= radius:
+                result.extend(node[1])
+            for d, child in node[2].items():
+                if dist - radius <= d <= dist + radius:
+                    stack.append(child)
+        return result
+
+
+def _candidate_pairs(
+    images: List[Path],
+    others: Optional[List[Path]] = None,
+    radius: Optional[int] = None,
+) -> List[Tuple[Path, Path]]:
+    """按差值哈希筛选可能重复的图片对，只有这些图片对需要 ORB 校验
+
+    不传 others 时返回 images 内部的图片对，否则返回 images 与 others 之间的图片对。
+    radius 达到 64 时不筛选。
+    """
+    if radius is None:
+        radius = _get_dhash_radius()
+
+    if radius >= DHASH_SIZE * DHASH_SIZE:
+        if others is None:
+            return [(images[i], images[j]) for i in range(len(images)) for j in range(i + 1, len(images))]
+        return [(p, o) for p in images for o in others]
+
+    index = HammingIndex()
+    pairs: List[Tuple[Path, Path]] = []
+    if others is None:
+        for p in images:
+            h = get_dhash(p)
+            if h is None:
+                continue
+            pairs.extend((o, p) for o in index.query(h, radius))
+            index.add(h, p)
+        return pairs
+
+    for o in others:
+        h = get_dhash(o)
+        if h is not None:
+            index.add(h, o)
+    for p in images:
+        h = get_dhash(p)
+        if h is not None:
+            pairs.extend((p, o) for o in index.query(h, radius))
+    return pairs
 
 
 def _orb_similarity(
@@ -425,6 +627,49 @@ class UnionFind:
         return list(grouped.values())
 
 
+def _make_dedup_executor(workers: int) -> ThreadPoolExecutor:
+    """ORB 校验使用的线程池
+
+    knnMatch / findHomography 计算时释放 GIL，耗时几乎全部在其中，线程即可并行。
+    不使用 fork 进程池：asyncio 进程中其他线程可能正持有锁（索引、日志），fork 出的子进程会死锁。
+    """
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="waves_dedup")
+
+
+def _dedup_workers() -> int:
+    return max((os.cpu_count() or 1) - 2, 1)
+
+
+def _prepare_orb_features(images: List[Path]) -> int:
+    """预先生成 ORB 缓存，每张图片只由一个线程计算"""
+    return sum(1 for p in images if get_orb_features(p) is not None)
+
+
+@lru_cache(maxsize=256)
+def _cached_orb_features(image_path: Path, mtime: float):
+    return get_orb_features(image_path)
+
+
+def _verify_pairs(
+    pairs: List[Tuple[Path, Path]],
+    threshold: float,
+) -> Tuple[int, List[Tuple[Path, Path, float]]]:
+    """ORB 校验一批候选图片对，返回 (校验数量, 相似度达到阈值的图片对)"""
+    result: List[Tuple[Path, Path, float]] = []
+    for p1, p2 in pairs:
+        try:
+            f1 = _cached_orb_features(p1, p1.stat().st_mtime)
+            f2 = _cached_orb_features(p2, p2.stat().st_mtime)
+        except OSError:
+            continue
+        if f1 is None or f2 is None:
+            continue
+        sim = _orb_similarity(f1, f2)
+        if sim is not None and sim >= threshold:
+            result.append((p1, p2, sim))
+    return len(pairs), result
+
+
 def find_duplicate_pairs_in_dir(
     dir_path: Path,
     threshold: float = ORB_THRESHOLD,
@@ -432,48 +677,80 @@ def find_duplicate_pairs_in_dir(
     images = list(_iter_images(dir_path))
     if len(images) < 2:
         return []
-    features = []
-    for img_path in images:
-        feat = get_orb_features(img_path)
-        if feat is not None:
-            features.append((img_path, feat))
-    pairs: List[Tuple[Path, Path, float]] = []
-    for i in range(len(features)):
-        p1, f1 = features[i]
-        for j in range(i + 1, len(features)):
-            p2, f2 = features[j]
-            sim = _orb_similarity(f1, f2)
-            if sim is not None and sim >= threshold:
-                pairs.append((p1, p2, sim))
-    return pairs
+    return _verify_pairs(_candidate_pairs(images), threshold)[1]
+
+
+def _group_pairs(
+    pairs: List[Tuple[Path, Path, float]],
+) -> List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]]:
+    uf = UnionFind({p for pair in pairs for p in pair[:2]})
+    sim_map: Dict[Tuple[Path, Path], float] = {}
+    for p1, p2, sim in pairs:
+        uf.union(p1, p2)
+        sim_map[(p1, p2)] = sim
+    groups = [g for g in uf.groups() if len(g) >= 2]
+    return [(g, sim_map) for g in groups]
 
 
 def find_duplicate_groups_in_dir(
     dir_path: Path,
     threshold: float = ORB_THRESHOLD,
 ) -> List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]]:
-    images = list(_iter_images(dir_path))
-    if len(images) < 2:
+    return _group_pairs(find_duplicate_pairs_in_dir(dir_path, threshold))
+
+
+async def find_duplicate_groups_in_dirs(
+    dirs: List[Path],
+    threshold: float = ORB_THRESHOLD,
+    on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None,
+) -> List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]]:
+    """查找多个目录中的重复图片
+
+    先在线程中按差值哈希筛选候选图片对（只比较同一目录内的图片），
+    再在线程池中做 ORB 校验，每完成一批调用 on_progress(已校验数, 候选总数)。
+    """
+
+    def _collect() -> List[Tuple[Path, Path]]:
+        pairs: List[Tuple[Path, Path]] = []
+        for d in dirs:
+            images = list(_iter_images(d))
+            if len(images) >= 2:
+                pairs.extend(_candidate_pairs(images))
+        return pairs
+
+    candidates = await asyncio.to_thread(_collect)
+    total = len(candidates)
+    if on_progress:
+        await on_progress(0, total)
+    if not candidates:
         return []
-    features = []
-    for img_path in images:
-        feat = get_orb_features(img_path)
-        if feat is not None:
-            features.append((img_path, feat))
 
-    uf = UnionFind([p for p, _ in features])
-    sim_map: Dict[Tuple[Path, Path], float] = {}
-    for i in range(len(features)):
-        p1, f1 = features[i]
-        for j in range(i + 1, len(features)):
-            p2, f2 = features[j]
-            sim = _orb_similarity(f1, f2)
-            if sim is not None and sim >= threshold:
-                uf.union(p1, p2)
-                sim_map[(p1, p2)] = sim
+    workers = _dedup_workers()
+    images = list(dict.fromkeys(p for pair in candidates for p in pair))
+    loop = asyncio.get_running_loop()
+    matched: List[Tuple[Path, Path, float]] = []
+    with _make_dedup_executor(workers) as executor:
+        step = max(1, -(-len(images) // (workers * 4)))
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(executor, _prepare_orb_features, images[i : i + step])
+                for i in range(0, len(images), step)
+            ]
+        )
 
-    groups = [g for g in uf.groups() if len(g) >= 2]
-    return [(g, sim_map) for g in groups]
+        futures = [
+            loop.run_in_executor(executor, _verify_pairs, candidates[i : i + DEDUP_BATCH], threshold)
+            for i in range(0, total, DEDUP_BATCH)
+        ]
+        done = 0
+        for fut in asyncio.as_completed(futures):
+            count, pairs = await fut
+            matched.extend(pairs)
+            done += count
+            if on_progress:
+                await on_progress(done, total)
+
+    return _group_pairs(matched)
 
 
 def find_duplicates_for_new_images(
@@ -481,25 +758,18 @@ def find_duplicates_for_new_images(
     new_images: List[Path],
     threshold: float = ORB_THRESHOLD,
 ) -> Dict[Path, List[Tuple[Path, float]]]:
+    """上传时的重复检查，结果用于拦截上传
+
+    不使用差值哈希筛选：差值哈希只对缩放、重新压缩有效，裁剪、加水印后的图片
+    哈希距离很大，但 ORB + RANSAC 能识别，这里对所有已有图片做完整的 ORB 校验。
+    """
     existing = [p for p in _iter_images(dir_path) if p not in new_images]
-    existing_feats = {}
-    for p in existing:
-        feat = get_orb_features(p)
-        if feat is not None:
-            existing_feats[p] = feat
+    all_pairs = _candidate_pairs(new_images, existing, radius=DHASH_SIZE * DHASH_SIZE)
+    _, pairs = _verify_pairs(all_pairs, threshold)
 
     result: Dict[Path, List[Tuple[Path, float]]] = {}
-    for new_path in new_images:
-        feat_new = get_orb_features(new_path)
-        if feat_new is None:
-            continue
-        dup_list: List[Tuple[Path, float]] = []
-        for old_path, feat_old in existing_feats.items():
-            sim = _orb_similarity(feat_new, feat_old)
-            if sim is not None and sim >= threshold:
-                dup_list.append((old_path, sim))
-        if dup_list:
-            result[new_path] = dup_list
+    for new_path, old_path, sim in pairs:
+        result.setdefault(new_path, []).append((old_path, sim))
     return result
 
 
@@ -513,7 +783,6 @@ async def send_repeated_custom_cards(
         logger.warning("[鸣潮] opencv-python 未安装，无法使用重复图片查找功能。")
         msg = "[鸣潮] 未安装opencv-python，无法使用重复图片查找功能！"
         return await bot.send((" " if at_sender else "") + msg, at_sender)
-    groups: List[Tuple[List[Path], Dict[Tuple[Path, Path], float]]] = []
     char_dirs: List[Path] = []
     for base in CUSTOM_PATH_MAP.values():
         for char_dir in base.iterdir():
@@ -521,15 +790,26 @@ async def send_repeated_custom_cards(
                 continue
             char_dirs.append(char_dir)
 
-    use_cores = max((os.cpu_count() or 1) - 2, 1)
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor(max_workers=use_cores) as executor:
-        tasks = [
-            loop.run_in_executor(executor, find_duplicate_groups_in_dir, d, threshold)
-            for d in char_dirs
-        ]
-        for result in await asyncio.gather(*tasks):
-            groups.extend(result)
+    last_report = 0.0
+
+    async def _on_progress(done: int, total: int) -> None:
+        nonlocal last_report
+        if done == 0:
+            if total:
+                msg = f"[鸣潮] 共{total}对疑似重复图片，正在比对…"
+                await bot.send((" " if at_sender else "") + msg, at_sender)
+            return
+        now = time.time()
+        if done < total and now - last_report < DEDUP_REPORT_INTERVAL:
+            return
+        last_report = now
+        logger.info(f"[鸣潮] 重复图片比对进度: {done}/{total}")
+        if done < total:
+            msg = f"[鸣潮] 重复图片比对进度: {done}/{total}"
+            await bot.send((" " if at_sender else "") + msg, at_sender)
+
+    last_report = time.time()
+    groups = await find_duplicate_groups_in_dirs(char_dirs, threshold, _on_progress)
 
     if not groups:
         msg = "[鸣潮] 未找到重复图片！"
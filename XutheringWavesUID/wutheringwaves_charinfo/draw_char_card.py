@@ -13,6 +13,7 @@ from gsuid_core.utils.image.image_tools import get_qq_avatar, crop_center_img
 
 from ..utils import hint
 from ..utils.waves_api import waves_api
+from ..utils.damage.snapshot import fork
 from ..wutheringwaves_config import PREFIX
 from ..utils.error_reply import WAVES_CODE_102
 from .role_info_change import change_role_detail
@@ -22,6 +23,7 @@ from ..utils.damage.utils import comma_separated_number
 from ..utils.ascension.template import get_template_data
 from ..utils.char_info_utils import get_all_roleid_detail_info
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import ONE_RANK_URL, OneRankRequest, OneRankResponse
 from ..utils.damage.abstract import DamageRankRegister, DamageDetailRegister
 from ..wutheringwaves_config.wutheringwaves_config import (
@@ -175,22 +177,22 @@ async def get_one_rank(item: OneRankRequest) -> Optional[OneRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                ONE_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            logger.debug(f"获取排行: {res.text}")
-            if res.status_code == 200:
-                return OneRankResponse.model_validate(res.json())
-        except Exception as e:
-            logger.exception(f"获取排行失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.post(
+            ONE_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        logger.debug(f"获取排行: {res.text}")
+        if res.status_code == 200:
+            return OneRankResponse.model_validate(res.json())
+    except Exception as e:
+        logger.exception(f"获取排行失败: {e}")
 
 
 def parse_text_and_number(text):
@@ -668,10 +670,11 @@ async def draw_char_detail_img(
     oneRank: Optional[OneRankResponse] = None
     enemy_detail: Optional[EnemyDetailData] = EnemyDetailData()
     if change_list_regex:
-        temp = copy.deepcopy(role_detail)
+        # role_detail 可能来自共享的面板缓存，在副本上修改
+        temp = role_detail
         try:
             role_detail, change_command = await change_role_detail(
-                uid, ck, role_detail, enemy_detail, change_list_regex
+                uid, ck, fork(role_detail), enemy_detail, change_list_regex
             )
         except Exception as e:
             logger.exception("角色数据转换错误", e)
@@ -688,7 +691,7 @@ async def draw_char_detail_img(
         damage_title = damage_calc["title"]
         # damageAttribute = card_sort_map_to_attribute(card_map)
         calc.damageAttribute = calc.card_sort_map_to_attribute(calc.role_card)
-        damageAttributeTemp = copy.deepcopy(calc.damageAttribute)
+        damageAttributeTemp = fork(calc.damageAttribute)
         crit_damage, expected_damage = damage_calc["func"](damageAttributeTemp, role_detail)
         logger.debug(f"{char_name}-{damage_title} 暴击伤害: {crit_damage}")
         logger.debug(f"{char_name}-{damage_title} 期望伤害: {expected_damage}")
@@ -876,7 +879,7 @@ async def draw_char_detail_img(
         img.alpha_composite(damage_title_bg, dest=(0, 2600 + ph_sum_value + jineng_len))
         for dindex, damage_temp in enumerate(damageDetail):
             damage_title = damage_temp["title"]
-            damageAttributeTemp = copy.deepcopy(calc.damageAttribute)
+            damageAttributeTemp = fork(calc.damageAttribute)
             crit_damage, expected_damage = damage_temp["func"](damageAttributeTemp, role_detail)
             logger.debug(f"{char_name}-{damage_title} 暴击伤害: {crit_damage}")
             logger.debug(f"{char_name}-{damage_title} 期望伤害: {expected_damage}")
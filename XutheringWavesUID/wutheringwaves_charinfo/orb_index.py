@@ -0,0 +1,319 @@
+import os
+import json
+import threading
+from typing import Any, Dict, List, Tuple, Callable, Optional
+from pathlib import Path
+
+from gsuid_core.logger import logger
+
+try:
+    import numpy as np  # type: ignore
+except Exception:
+    np = None
+
+INDEX_VERSION = 1
+# ORB 描述子长度（字节）
+DES_BYTES = 32
+# 每张图片参与粗筛的特征点数量（按响应强度排序后的前若干个）
+SHORTLIST_ROWS = 256
+# 粗筛时视为匹配的最大汉明距离
+SHORTLIST_DIST = 64
+# 粗筛使用的查询描述子数量（按响应强度排序后的前若干个）
+SHORTLIST_QUERY = 500
+# 局部敏感哈希：每个描述子按连续 2 字节分成 16 个桶键，任一桶键相同才计算汉明距离
+LSH_TABLES = DES_BYTES // 2
+# 过大的桶（大量图片共有的平坦区域特征）不参与投票
+LSH_MAX_BUCKET = 512
+# 已删除的行超过该比例时整理文件
+COMPACT_RATIO = 0.5
+
+# (pts, des)
+Feature = Tuple[Any, Any]
+
+# 单字节的 1 的个数
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8) if np is not None else None
+
+
+class OrbIndex:
+    """单个角色目录的 ORB 特征索引
+
+    目录下所有图片的特征点坐标和描述子分别顺序写入 _index.pts / _index.des，
+    _index.json 记录每张图片所在的行区间和图片 mtime，读取时以内存映射方式打开，无需逐个加载 npz。
+    新增图片追加写入，删除只标记，已删除的行过多时整理文件。
+
+    查找时取每张图片最强的 SHORTLIST_ROWS 个描述子建立按桶键排序的数组，
+    查询描述子只与桶键相同的行向量化计算汉明距离并为最近邻所在图片投票，
+    只对得票最多的几张图片做完整的 ORB 校验。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta_path = path / "_index.json"
+        self.des_path = path / "_index.des"
+        self.pts_path = path / "_index.pts"
+        self._lock = threading.Lock()
+        # (文件状态, meta, des, pts, 粗筛矩阵)，整体替换，读取无需加锁
+        self._state: Optional[Tuple[Any, Dict[str, Any], Any, Any, Optional[Tuple[Any, Any, List[str]]]]] = None
+
+    # 文件
+
+    @staticmethod
+    def _empty_meta() -> Dict[str, Any]:
+        return {"version": INDEX_VERSION, "rows": 0, "dead": 0, "entries": {}}
+
+    def _stamp(self):
+        try:
+            st = self.meta_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read_meta(self) -> Dict[str, Any]:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self._empty_meta()
+        if meta.get("version") != INDEX_VERSION:
+            return self._empty_meta()
+        return meta
+
+    def _load(self):
+        stamp = self._stamp()
+        state = self._state
+        if state is not None and state[0] == stamp:
+            return state
+
+        meta = self._read_meta() if stamp is not None else self._empty_meta()
+        rows = meta["rows"]
+        des = pts = None
+        if rows:
+            try:
+                des = np.memmap(self.des_path, dtype=np.uint8, mode="r", shape=(rows, DES_BYTES))
+                pts = np.memmap(self.pts_path, dtype=np.float32, mode="r", shape=(rows, 2))
+            except (OSError, ValueError) as e:
+                logger.warning(f"[鸣潮] ORB索引损坏，将重新生成 {self.path}: {e}")
+                meta = self._empty_meta()
+        state = (stamp, meta, des, pts, None)
+        self._state = state
+        return state
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+        self._state = None
+
+    def _append(self, meta: Dict[str, Any], items: List[Tuple[str, int, Feature]]):
+        """追加写入特征，调用方负责写入 meta"""
+        if not items:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        rows = meta["rows"]
+        entries = meta["entries"]
+        # 释放内存映射后再写文件
+        self._state = None
+        for file_path, width, dtype, idx in (
+            (self.des_path, DES_BYTES, np.uint8, 1),
+            (self.pts_path, 2, np.float32, 0),
+        ):
+            with open(file_path, "ab") as f:
+                size = rows * width * np.dtype(dtype).itemsize
+                if f.tell() != size:
+                    # 截掉上次中断时写入但未提交的部分
+                    f.truncate(size)
+                    f.seek(size)
+                for _, _, feat in items:
+                    f.write(np.ascontiguousarray(feat[idx], dtype=dtype).reshape(-1, width).tobytes())
+
+        for name, mtime_ns, (pts, _) in items:
+            old = entries.get(name)
+            if old is not None:
+                meta["dead"] += old["count"]
+            entries[name] = {"mtime_ns": mtime_ns, "start": rows, "count": len(pts)}
+            rows += len(pts)
+        meta["rows"] = rows
+
+    def _compact(self, meta: Dict[str, Any]):
+        """重写文件，去掉已删除的行
+
+        按内存中的 meta 读取：刚追加的行已写入文件，但磁盘上的 meta 还不包含它们。
+        两个文件都替换成功后才修改 meta，失败时 meta 仍与旧文件一致。
+        """
+        self._state = None
+        des = np.memmap(self.des_path, dtype=np.uint8, mode="r", shape=(meta["rows"], DES_BYTES))
+        pts = np.memmap(self.pts_path, dtype=np.float32, mode="r", shape=(meta["rows"], 2))
+        starts: Dict[str, int] = {}
+        rows = 0
+        tmps = (
+            self.des_path.with_name(self.des_path.name + ".tmp"),
+            self.pts_path.with_name(self.pts_path.name + ".tmp"),
+        )
+        with open(tmps[0], "wb") as f_des, open(tmps[1], "wb") as f_pts:
+            for name, e in meta["entries"].items():
+                s, c = e["start"], e["count"]
+                f_des.write(np.ascontiguousarray(des[s : s + c]).tobytes())
+                f_pts.write(np.ascontiguousarray(pts[s : s + c]).tobytes())
+                starts[name] = rows
+                rows += c
+        # 释放内存映射后再替换文件
+        del des, pts
+
+        os.replace(tmps[0], self.des_path)
+        try:
+            os.replace(tmps[1], self.pts_path)
+        except OSError:
+            # 只替换了一个文件，两者已不一致，清空索引后重新生成
+            meta.clear()
+            meta.update(self._empty_meta())
+            raise
+        for name, start in starts.items():
+            meta["entries"][name]["start"] = start
+        meta["rows"] = rows
+        meta["dead"] = 0
+
+    def _commit(self, meta: Dict[str, Any]):
+        if meta["rows"] and meta["dead"] > meta["rows"] * COMPACT_RATIO:
+            try:
+                self._compact(meta)
+            except OSError as e:
+                # Windows 下文件仍被映射时无法替换，下次再整理
+                logger.debug(f"[鸣潮] ORB索引整理失败 {self.path}: {e}")
+        self._write_meta(meta)
+
+    # 接口
+
+    def get(self, name: str, mtime_ns: int) -> Optional[Feature]:
+        """读取图片的特征，图片在建立索引后被修改过时返回 None"""
+        _, meta, des, pts, _ = self._load()
+        e = meta["entries"].get(name)
+        if e is None or e["mtime_ns"] != mtime_ns or des is None:
+            return None
+        s, c = e["start"], e["count"]
+        return np.asarray(pts[s : s + c]), np.asarray(des[s : s + c])
+
+    def put(self, name: str, mtime_ns: int, feat: Feature):
+        with self._lock:
+            meta = self._load()[1]
+            self._append(meta, [(name, mtime_ns, feat)])
+            self._commit(meta)
+
+    def remove(self, name: str):
+        with self._lock:
+            meta = self._load()[1]
+            e = meta["entries"].pop(name, None)
+            if e is None:
+                return
+            meta["dead"] += e["count"]
+            self._commit(meta)
+
+    def sync(self, images: List[Path], loader: Callable[[Path], Optional[Feature]]):
+        """使索引与目录中的图片一致：补充新增或修改过的图片，移除已不存在的图片"""
+        with self._lock:
+            meta = self._load()[1]
+            entries = meta["entries"]
+            changed = False
+
+            names = set()
+            items: List[Tuple[str, int, Feature]] = []
+            for p in images:
+                names.add(p.name)
+                try:
+                    mtime_ns = p.stat().st_mtime_ns
+                except OSError:
+                    continue
+                e = entries.get(p.name)
+                if e is not None and e["mtime_ns"] == mtime_ns:
+                    continue
+                feat = loader(p)
+                if feat is None:
+                    continue
+                items.append((p.name, mtime_ns, feat))
+
+            for name in [n for n in entries if n not in names]:
+                meta["dead"] += entries.pop(name)["count"]
+                changed = True
+
+            if items:
+                self._append(meta, items)
+                changed = True
+            if changed:
+                self._commit(meta)
+
+    @staticmethod
+    def _bucket_keys(des) -> Any:
+        """(行数, LSH_TABLES) 的桶键，第 t 列为第 2t、2t+1 字节"""
+        des = des.astype(np.uint16)
+        return (des[:, 0::2] << 8) | des[:, 1::2]
+
+    def _build_shortlist(self, meta: Dict[str, Any], des):
+        names = list(meta["entries"])
+        rows = []
+        owners = []
+        for i, name in enumerate(names):
+            e = meta["entries"][name]
+            c = min(e["count"], SHORTLIST_ROWS)
+            rows.append(np.arange(e["start"], e["start"] + c))
+            owners.append(np.full(c, i, dtype=np.int32))
+        matrix = np.ascontiguousarray(des[np.concatenate(rows)])
+        keys = self._bucket_keys(matrix)
+        order = np.argsort(keys, axis=0, kind="stable")
+        sorted_keys = np.take_along_axis(keys, order, axis=0)
+        return matrix, np.concatenate(owners), names, order, sorted_keys
+
+    def shortlist(self, des_query, limit: int) -> List[str]:
+        """按最近邻投票返回最可能匹配的图片名"""
+        stamp, meta, des, pts, short = self._load()
+        if des is None or not meta["entries"]:
+            return []
+        if short is None:
+            short = self._build_shortlist(meta, des)
+            self._state = (stamp, meta, des, pts, short)
+        matrix, owners, names, order, sorted_keys = short
+
+        query = np.ascontiguousarray(des_query[:SHORTLIST_QUERY], dtype=np.uint8)
+        q_keys = self._bucket_keys(query)
+        q_idx = []
+        r_idx = []
+        for t in range(LSH_TABLES):
+            lo = np.searchsorted(sorted_keys[:, t], q_keys[:, t], side="left")
+            hi = np.searchsorted(sorted_keys[:, t], q_keys[:, t], side="right")
+            size = hi - lo
+            size[size > LSH_MAX_BUCKET] = 0
+            total = int(size.sum())
+            if not total:
+                continue
+            # 展开每个查询描述子对应桶内的所有行
+            q = np.repeat(np.arange(len(query)), size)
+            offsets = np.arange(total) - np.repeat(np.cumsum(size) - size, size)
+            q_idx.append(q)
+            r_idx.append(order[np.repeat(lo, size) + offsets, t])
+        if not q_idx:
+            return []
+
+        q_all = np.concatenate(q_idx)
+        r_all = np.concatenate(r_idx)
+        dist = _POPCOUNT[np.bitwise_xor(query[q_all], matrix[r_all])].sum(axis=1, dtype=np.int32)
+
+        # 每个查询描述子只保留最近的一行
+        pick = np.lexsort((dist, q_all))
+        q_all, r_all, dist = q_all[pick], r_all[pick], dist[pick]
+        first = np.ones(len(q_all), dtype=bool)
+        first[1:] = q_all[1:] != q_all[:-1]
+        hits = r_all[first & (dist <= SHORTLIST_DIST)]
+        if not len(hits):
+            return []
+        votes = np.bincount(owners[hits], minlength=len(names))
+        ranked = np.argsort(-votes, kind="stable")[:limit]
+        return [names[i] for i in ranked if votes[i] > 0]
+
+
+_indexes: Dict[Path, OrbIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_orb_index(path: Path) -> OrbIndex:
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = OrbIndex(path)
+        return index
@@ -115,7 +115,7 @@ async def upload_custom_card(
     if success:
         msg = f"[鸣潮]【{char}】上传{type_label}图成功！"
         if new_images:
-            dup_map = find_duplicates_for_new_images(temp_dir, new_images)
+            dup_map = await asyncio.to_thread(find_duplicates_for_new_images, temp_dir, new_images)
             block_msgs = []
             blocked_paths = set()
             for index, new_path in enumerate(new_images, start=1):
@@ -219,11 +219,164 @@ CONFIG_DEFAULT: Dict[str, GSC] = {
         42,
         3650,
     ),
+    "RolePanelCacheSize": GsIntConfig(
+        "面板数据缓存条数",
+        "内存中缓存已解析面板数据（rawData.json）的uid数量，0为关闭缓存",
+        256,
+        100000,
+    ),
+    "RolePanelCacheMaxMB": GsIntConfig(
+        "面板数据缓存大小上限（MB）",
+        "按面板文件大小估算的缓存内存上限",
+        64,
+        4096,
+    ),
+    "HttpPoolLimit": GsIntConfig(
+        "HTTP连接池总连接数",
+        "库洛API及上传共享连接池的最大连接数，0为不限制",
+        100,
+        1000,
+    ),
+    "HttpPoolLimitPerHost": GsIntConfig(
+        "HTTP连接池单host连接数",
+        "同一host的最大连接数，0为不限制",
+        20,
+        1000,
+    ),
+    "HttpKeepAlive": GsIntConfig(
+        "HTTP连接保持时间（秒）",
+        "空闲连接保持时间，0为请求后立即关闭连接",
+        30,
+        600,
+    ),
+    "HttpDnsCacheTTL": GsIntConfig(
+        "DNS缓存时间（秒）",
+        "库洛API域名解析结果缓存时间，0为不缓存",
+        300,
+        3600,
+    ),
+    "UploadBatchSize": GsIntConfig(
+        "排行上传每批数量",
+        "面板/深塔/冥海数据合并后每批上传的数量，达到该数量立即上传",
+        50,
+        1000,
+    ),
+    "UploadBatchInterval": GsIntConfig(
+        "排行上传间隔（秒）",
+        "未达到每批数量时，间隔多少秒上传一次",
+        5,
+        600,
+    ),
+    "UploadConcurrency": GsIntConfig(
+        "排行上传并发数",
+        "同时进行的上传请求数量",
+        4,
+        50,
+    ),
+    "UploadMaxRetries": GsIntConfig(
+        "排行上传最大尝试次数",
+        "上传失败后退避重试，超过次数后丢弃",
+        5,
+        20,
+    ),
+    "DispatcherQueueSize": GsIntConfig(
+        "任务队列长度（重启生效）",
+        "上传等后台任务队列的最大长度",
+        1000,
+        100000,
+    ),
+    "DispatcherFullPolicy": GsStrConfig(
+        "任务队列满时处理方式",
+        "drop_new(丢弃新任务)、drop_old(丢弃最早的任务)、block(等待队列空位)",
+        "drop_old",
+        options=["drop_new", "drop_old", "block"],
+    ),
+    "DispatcherWorkers": GsIntConfig(
+        "后台任务并发数（重启生效）",
+        "同时执行的后台任务数量",
+        8,
+        256,
+    ),
+    "DispatcherMaxInflight": GsIntConfig(
+        "单类后台任务并发数（重启生效）",
+        "每种后台任务同时执行的数量",
+        4,
+        256,
+    ),
+    "CardCacheEnable": GsBoolConfig(
+        "卡片图片缓存",
+        "数据未变化时直接返回上次生成的图片（HTML渲染、日历、角色群排行）",
+        True,
+    ),
+    "CardCacheMemMB": GsIntConfig(
+        "卡片图片内存缓存大小（MB）",
+        "内存中缓存的卡片图片大小上限",
+        32,
+        1024,
+    ),
+    "CardCacheDiskMB": GsIntConfig(
+        "卡片图片磁盘缓存大小（MB）",
+        "磁盘上缓存的卡片图片大小上限，超出后按最近使用时间淘汰",
+        256,
+        10240,
+    ),
+    "CardDedupHashRadius": GsIntConfig(
+        "重复图片查找哈希距离",
+        "查找重复图片时差值哈希的汉明距离不超过该值的图片才做特征比对，越大越不容易漏检但越慢，64为全部比对；上传时的重复检查始终全部比对",
+        20,
+        64,
+    ),
+    "StartupBackgroundResource": GsBoolConfig(
+        "启动时后台下载资源",
+        "启动时先使用已有资源上线，资源下载和校验在后台进行，可使用 资源状态 查看进度",
+        True,
+    ),
+    "ResourceDownloadConcurrency": GsIntConfig(
+        "资源下载并发数",
+        "同时下载的资源文件数量",
+        8,
+        64,
+    ),
+    "ActivityFlushInterval": GsIntConfig(
+        "用户活跃度写入间隔（重启生效）",
+        "用户活跃时间先记录在内存中，每隔该秒数批量写入数据库，关闭时也会写入",
+        30,
+        600,
+    ),
+    "StaminaPushOpen": GsBoolConfig(
+        "内置体力提醒",
+        "开启后结晶波片达到用户设置的阈值时私聊提醒，只在预计到达阈值时查询；已安装 roverreminder 插件时不生效",
+        False,
+    ),
+    "StaminaPushConcurrency": GsIntConfig(
+        "体力推送查询并发数",
+        "体力推送同时查询的账号数量",
+        5,
+        50,
+    ),
+    "MultiUidConcurrency": GsIntConfig(
+        "多账号请求并发数",
+        "每日/资源简报等多账号命令同时进行的接口请求数量",
+        6,
+        20,
+    ),
     "RankActiveFilterGroup": GsBoolConfig(
         "群排行仅活跃用户",
         "群排行（角色/练度/抽卡）是否仅统计活跃账号",
         True,
     ),
+    "RenderPagePoolSize": GsIntConfig(
+        "HTML渲染页面池大小（重启生效）",
+        "预热页面数量，即同时进行的本地HTML渲染数量",
+        4,
+        32,
+    ),
+    "RenderPageMaxUses": GsIntConfig(
+        "HTML渲染页面复用次数",
+        "页面渲染多少次后关闭重建，避免内存增长",
+        50,
+        1000,
+    ),
     "UseHtmlRender": GsBoolConfig(
         "使用HTML渲染",
         "开启后将使用HTML渲染公告卡片，关闭后将回退到PIL或纯文本",
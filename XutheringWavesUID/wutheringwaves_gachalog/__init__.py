@@ -1,7 +1,6 @@
 import re
 import json
 import time
-import shutil
 import asyncio
 from typing import Any, List
 from datetime import datetime
@@ -15,6 +14,7 @@ from gsuid_core.data_store import get_res_path
 from ..utils.cache import TimedCache
 from ..utils.button import WavesButton
 from .gacha_handler import fetch_mcgf_data, merge_gacha_data
+from .gacha_store import GachaStore
 from .get_gachalogs import save_gachalogs, export_gachalogs, import_gachalogs
 from .draw_gachalogs import draw_card, draw_card_help
 from ..utils.waves_api import waves_api
@@ -232,9 +232,8 @@ async def delete_gacha_history(bot: Bot, ev: Event):
     if (not ck or not is_self) and not ev.user_pm == 0:
         return await bot.send(f"UID{uid}未登录或Cookie失效，不允许删除抽卡记录")
 
-    player_dir = PLAYER_PATH / uid
-    gacha_log_file = player_dir / "gacha_logs.json"
-    if not gacha_log_file.exists():
+    store = GachaStore(uid)
+    if not store.exists():
         return await bot.send(f"UID{uid}暂无抽卡记录文件")
 
     GACHA_BACKUP_PATH.mkdir(parents=True, exist_ok=True)
@@ -246,8 +245,8 @@ async def delete_gacha_history(bot: Bot, ev: Event):
         dst_file = backup_dir / f"gacha_logs_{datetime.now().strftime('%Y-%m-%d.%H%M%S')}.json"
 
     try:
-        # 备份抽卡记录到 backup/gacha_backup/{uid}/ 目录
-        shutil.move(str(gacha_log_file), dst_file)
+        # 以 JSON 格式备份抽卡记录到 backup/gacha_backup/{uid}/ 目录
+        await store.remove(dst_file)
     except Exception as e:
         return await bot.send(f"移动抽卡记录失败：{e}")
 
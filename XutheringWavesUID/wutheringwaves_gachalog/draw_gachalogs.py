@@ -1,17 +1,16 @@
 import os
-import json
 import random
 import warnings
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 from datetime import datetime
 
-import aiofiles
 from PIL import Image, ImageDraw
 
 # 忽略PIL解压缩炸弹警告
 warnings.filterwarnings('ignore', category=Image.DecompressionBombWarning)
 
+from gsuid_core.logger import logger
 from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
@@ -41,7 +40,9 @@ from ..utils.fonts.waves_fonts import (
     waves_font_40,
 )
 from ..utils.resource.constant import NORMAL_LIST
-from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+from .gacha_store import GachaStore
+from ..utils.rank_index import GachaRankEntry, rank_index
+from ..utils.panel_store import FileStat
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 HOMO_TAG = ["非到极致", "运气不好", "平稳保底", "小欧一把", "欧狗在此"]
@@ -141,165 +142,102 @@ async def draw_card_help():
 
 
 async def get_gacha_stats(uid: str) -> Dict:
-    """获取抽卡统计信息，优先从缓存读取，否则从原始数据计算"""
-    _dir = PLAYER_PATH / str(uid)
-    _dir.mkdir(parents=True, exist_ok=True)
-
-    gacha_log_path = _dir / "gacha_logs.json"
-    stats_path = _dir / "gachaStats.json"
-    # 如果统计文件存在，直接读取
-    if gacha_log_path.exists() and stats_path.exists():
-        try:
-            async with aiofiles.open(stats_path, "r", encoding="utf-8") as f:
-                return json.loads(await f.read())
-        except Exception:
-            pass
-
-    # 否则从 gacha_logs.json 计算
-    if not gacha_log_path.exists():
-        return {}
-
+    """获取抽卡统计信息，由抽卡记录存储中随记录更新的累加值计算，无需读取全部记录"""
     try:
-        async with aiofiles.open(gacha_log_path, "r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
-        gachalogs = raw_data.get("data", {})
-        total_data = {}
-
-        for gacha_name in gachalogs:
-            total_data[gacha_name] = {
-                "total": 0,
-                "avg": 0,
-                "avg_up": 0,
-                "remain": 0,
-                "r_num": [],
-                "up_list": [],
-                "rank_s_list": [],
-                "level": 0,
-            }
-
-        for gacha_name in gachalogs:
-            num = 1
-            gacha_data = gachalogs[gacha_name]
-            current_data = total_data[gacha_name]
-
-            for data in gacha_data[::-1]:
-                if data["qualityLevel"] == 5:
-                    data["gacha_num"] = num
-
-                    if data["name"] in NORMAL_LIST:
-                        data["is_up"] = False
-                    else:
-                        data["is_up"] = True
-
-                    current_data["r_num"].append(num)
-                    current_data["rank_s_list"].append(data)
-                    if data["is_up"]:
-                        current_data["up_list"].append(data)
-
-                    num = 1
-                else:
-                    num += 1
-                current_data["total"] += 1
-
-            current_data["remain"] = num - 1
-            if len(current_data["rank_s_list"]) == 0:
-                current_data["avg"] = 0
-            else:
-                _d = sum(current_data["r_num"]) / len(current_data["r_num"])
-                current_data["avg"] = float("{:.2f}".format(_d))
-
-            if len(current_data["up_list"]) == 0:
-                current_data["avg_up"] = 0
-            else:
-                _u = sum(current_data["r_num"]) / len(current_data["up_list"])
-                current_data["avg_up"] = float("{:.2f}".format(_u))
-
-            current_data["level"] = 2
-            if current_data["avg_up"] == 0 and current_data["avg"] == 0:
-                current_data["level"] = 2
-            else:
-                if gacha_name == "角色精准调谐":
-                    if current_data["avg_up"] != 0:
-                        current_data["level"] = get_level_from_list(current_data["avg_up"], [74, 87, 99, 105, 120])
-                    elif current_data["avg"] != 0:
-                        current_data["level"] = get_level_from_list(current_data["avg"], [53, 60, 68, 73, 75])
-
-        # 返回转换后的统计数据
-        stats_data = {}
-        for gacha_name, data in total_data.items():
-            # 计算综合平均值：如果有 UP 平均数则用 UP，否则用总平均数，都没有则为 0
-            combined_avg = 0
-            if isinstance(data["avg_up"], (int, float)) and data["avg_up"] > 0:
-                combined_avg = data["avg_up"]
-            elif isinstance(data["avg"], (int, float)) and data["avg"] > 0:
-                combined_avg = data["avg"]
-
-            stats_data[gacha_name] = {
-                "total": data["total"],
-                "avg": data["avg"],  # 总平均抽数
-                "avg_up": data["avg_up"],  # UP平均抽数
-                "combined_avg": combined_avg,  # 综合平均（优先UP）
-                "remain": data["remain"],
-                "r_num": data["r_num"],
-                "up_count": len(data["up_list"]),
-                "rank_s_count": len(data["rank_s_list"]),
-                "level": data["level"],
-                "char_gold": len(data["rank_s_list"]) if gacha_name == "角色精准调谐" else 0,  # 角色金数
-                "weapon_gold": len(data["rank_s_list"]) if gacha_name == "武器精准调谐" else 0,  # 武器金数
-            }
-
-        # 保存统计数据到文件
-        await save_gacha_stats(uid, total_data)
-        return stats_data
+        groups = await GachaStore(uid).get_stats()
     except Exception:
         return {}
+    if not groups:
+        return {}
+
+    stats_data = {}
+    for gacha_name, group in groups.items():
+        r_num: List[int] = group["r_num"]
+        rank_s_count = len(r_num)
+        up_count = len([name for name in group["s_names"] if name not in NORMAL_LIST])
+
+        avg = float("{:.2f}".format(sum(r_num) / rank_s_count)) if rank_s_count else 0
+        avg_up = float("{:.2f}".format(sum(r_num) / up_count)) if up_count else 0
+
+        level = 2
+        if gacha_name == "角色精准调谐":
+            if avg_up != 0:
+                level = get_level_from_list(avg_up, [74, 87, 99, 105, 120])
+            elif avg != 0:
+                level = get_level_from_list(avg, [53, 60, 68, 73, 75])
+
+        # 计算综合平均值：如果有 UP 平均数则用 UP，否则用总平均数，都没有则为 0
+        combined_avg = avg_up or avg or 0
+
+        stats_data[gacha_name] = {
+            "total": group["total"],  # 总抽数
+            "avg": avg,  # 平均抽数
+            "avg_up": avg_up,  # UP平均抽数
+            "combined_avg": combined_avg,  # 综合平均（优先UP）
+            "remain": group["remain"],  # 已xx抽未出金
+            "r_num": r_num,  # 五星出现的抽卡位置列表
+            "up_count": up_count,  # UP五星总数
+            "rank_s_count": rank_s_count,  # 五星总数
+            "level": level,  # 抽卡等级
+            "char_gold": rank_s_count if gacha_name == "角色精准调谐" else 0,  # 角色金数
+            "weapon_gold": rank_s_count if gacha_name == "武器精准调谐" else 0,  # 武器金数
+        }
+    return stats_data
+
+
+def _to_rank_entry(uid: str, stats: Dict) -> GachaRankEntry:
+    char_pool = stats.get("角色精准调谐", {})
+    weapon_pool = stats.get("武器精准调谐", {})
+    return GachaRankEntry(
+        uid=uid,
+        total=char_pool.get("total", 0) + weapon_pool.get("total", 0),
+        char_avg=char_pool.get("avg_up", 0) or char_pool.get("avg", 0),
+        weapon_avg=weapon_pool.get("avg_up", 0) or weapon_pool.get("avg", 0),
+        char_gold=char_pool.get("char_gold", 0),
+        weapon_gold=weapon_pool.get("weapon_gold", 0),
+    )
 
 
-async def save_gacha_stats(uid: str, total_data: Dict):
-    """保存抽卡统计信息到本地文件"""
+async def save_gacha_stats(uid: str) -> Optional[GachaRankEntry]:
+    """抽卡记录更新后调用，同步抽卡排行索引"""
+    stats = await get_gacha_stats(uid)
+    stat = GachaStore(uid).get_stat()
+    if not stats or stat is None:
+        return None
+    entry = _to_rank_entry(uid, stats)
     try:
-        _dir = PLAYER_PATH / str(uid)
-        _dir.mkdir(parents=True, exist_ok=True)
-        path = _dir / "gachaStats.json"
-
-        # 提取关键统计信息
-        stats_data = {}
-        for gacha_name, data in total_data.items():
-            # 计算综合平均值：如果有 UP 平均数则用 UP，否则用总平均数，都没有则为 0
-            combined_avg = 0
-            if isinstance(data["avg_up"], (int, float)) and data["avg_up"] > 0:
-                combined_avg = data["avg_up"]
-            elif isinstance(data["avg"], (int, float)) and data["avg"] > 0:
-                combined_avg = data["avg"]
-
-            stats_data[gacha_name] = {
-                "total": data["total"],  # 总抽数
-                "avg": data["avg"],  # 平均抽数
-                "avg_up": data["avg_up"],  # UP平均抽数
-                "combined_avg": combined_avg,  # 综合平均（优先UP）
-                "remain": data["remain"],  # 已xx抽未出金
-                "r_num": data["r_num"],  # 五星出现的抽卡位置列表
-                "up_count": len(data["up_list"]),  # UP五星总数
-                "rank_s_count": len(data["rank_s_list"]),  # 五星总数
-                "level": data["level"],  # 抽卡等级
-                "char_gold": len(data["rank_s_list"]) if gacha_name == "角色精准调谐" else 0,  # 角色金数
-                "weapon_gold": len(data["rank_s_list"]) if gacha_name == "武器精准调谐" else 0,  # 武器金数
-            }
-
-        async with aiofiles.open(path, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(stats_data, ensure_ascii=False))
-    except Exception:
-        pass
+        await rank_index.save_gacha(entry, stat)
+    except Exception as e:
+        logger.warning(f"[鸣潮] 抽卡排行索引写入失败 uid={uid}: {e}")
+    return entry
+
+
+async def get_gacha_rank_entries(uids: List[str]) -> Dict[str, GachaRankEntry]:
+    """批量获取抽卡排行数据，索引中过期或缺失的 uid 重新统计后写回"""
+    stats: Dict[str, FileStat] = {}
+    missing: List[str] = []
+    for uid in dict.fromkeys(uids):
+        store = GachaStore(uid)
+        stat = store.get_stat()
+        if stat is not None:
+            stats[uid] = stat
+        elif store.exists():
+            # 旧版 gacha_logs.json 尚未转换
+            missing.append(uid)
+
+    entries, stale = await rank_index.query_gacha(stats)
+    for uid in stale + missing:
+        entry = await save_gacha_stats(uid)
+        if entry is not None:
+            entries[uid] = entry
+    return entries
 
 
 async def draw_card(uid: str, ev: Event):
     # 获取数据
-    gacha_log_path = PLAYER_PATH / str(uid) / "gacha_logs.json"
-    if not gacha_log_path.exists():
+    raw_data = await GachaStore(uid).load()
+    if raw_data is None:
         return f"[鸣潮] 你还没有抽卡记录噢!\n 请发送 {PREFIX}导入抽卡链接 后重试!"
-    async with aiofiles.open(gacha_log_path, "r", encoding="UTF-8") as f:
-        raw_data: Dict = json.loads(await f.read())
 
     gachalogs = raw_data["data"]
     title_num = len([1 for i in gachalogs.keys() if "新手" not in i])
@@ -388,9 +326,6 @@ async def draw_card(uid: str, ev: Event):
                 if current_data["avg"] != "-":
                     current_data["level"] = get_level_from_list(current_data["avg"], [10, 20, 30, 40, 45])
 
-    # 保存抽卡统计信息到本地
-    await save_gacha_stats(uid, total_data)
-
     oset = 280
     bset = 170
 
@@ -0,0 +1,94 @@
+import random
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+from datetime import datetime
+
+if TYPE_CHECKING:
+    from ..utils.api.model import GachaLog
+
+
+# 多项式滚动哈希，哈希命中后再逐项比较，不受碰撞影响
+_HASH_MOD = (1 << 61) - 1
+_HASH_BASE = random.randrange(1 << 32, 1 << 60)
+
+
+def _prefix_hashes(seq: List[int]) -> List[int]:
+    h = [0] * (len(seq) + 1)
+    for i, x in enumerate(seq):
+        h[i + 1] = (h[i] * _HASH_BASE + x + 1) % _HASH_MOD
+    return h
+
+
+def _window_hashes(h: List[int], length: int) -> List[int]:
+    power = pow(_HASH_BASE, length, _HASH_MOD)
+    return [(h[i + length] - h[i] * power) % _HASH_MOD for i in range(len(h) - length)]
+
+
+# 找到两个数组中最长公共子串的下标（忽略resourceType字段差异）
+# 长度相同时取 a 中最靠后、其次 b 中最靠后的一段
+def find_longest_common_subarray_indices(
+    a: List["GachaLog"], b: List["GachaLog"]
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    n, m = len(a), len(b)
+    if not n or not m:
+        return None
+
+    # 使用 match_key() 比较，忽略 resourceType 差异；先映射为整数序列
+    ids: Dict[tuple, int] = {}
+    a_ids = [ids.setdefault(log.match_key(), len(ids)) for log in a]
+    b_ids = [ids.setdefault(log.match_key(), len(ids)) for log in b]
+    if set(a_ids).isdisjoint(b_ids):
+        return None
+
+    ha = _prefix_hashes(a_ids)
+    hb = _prefix_hashes(b_ids)
+
+    def _b_windows(length: int) -> Dict[int, List[int]]:
+        windows: Dict[int, List[int]] = {}
+        for j, v in enumerate(_window_hashes(hb, length)):
+            windows.setdefault(v, []).append(j)
+        return windows
+
+    def _has_common(length: int) -> bool:
+        windows = _b_windows(length)
+        for i, v in enumerate(_window_hashes(ha, length)):
+            for j in windows.get(v, ()):
+                if a_ids[i : i + length] == b_ids[j : j + length]:
+                    return True
+        return False
+
+    # 存在长度为 L 的公共子串时必然存在更短的，二分查找最大长度
+    lo, hi = 1, min(n, m)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _has_common(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    length = lo
+
+    windows = _b_windows(length)
+    a_windows = _window_hashes(ha, length)
+    for i in range(n - length, -1, -1):
+        for j in reversed(windows.get(a_windows[i], ())):
+            if a_ids[i : i + length] == b_ids[j : j + length]:
+                return (i, i + length - 1), (j, j + length - 1)
+    return None
+
+
+# 根据最长公共子串递归合并两个GachaLog列表，不去重，按time排序
+def merge_gacha_logs_by_common_subarray(a: List["GachaLog"], b: List["GachaLog"]) -> List["GachaLog"]:
+    common_indices = find_longest_common_subarray_indices(a, b)
+    if not common_indices:
+        return sorted(
+            a + b,
+            key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
+            reverse=True,
+        )
+
+    (a_start, a_end), (b_start, b_end) = common_indices
+
+    prefix = merge_gacha_logs_by_common_subarray(a[:a_start], b[:b_start])
+    common_subarray = a[a_start : a_end + 1]
+    suffix = merge_gacha_logs_by_common_subarray(a[a_end + 1 :], b[b_end + 1 :])
+
+    return prefix + common_subarray + suffix
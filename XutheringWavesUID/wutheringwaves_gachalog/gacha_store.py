@@ -0,0 +1,423 @@
+import os
+import json
+import array
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple, Optional
+from pathlib import Path
+from datetime import datetime, timedelta
+
+from gsuid_core.logger import logger
+
+from ..utils.api.model import GachaLog
+from ..utils.panel_store import FileStat
+from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
+
+STORE_VERSION = 1
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+# 不符合 TIME_FORMAT 的时间字符串存入字符串表，time 列保存 _RAW_TIME - 下标
+# datetime 能表示的秒数范围约为 ±3e11，不会与该区间重叠
+_RAW_TIME = -(1 << 40)
+
+# (列名, array 类型)，字符串列保存字符串表下标
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("group", "I"),  # 所在卡池，如 角色精准调谐
+    ("time", "q"),  # 距 1970-01-01 的秒数（不带时区），无法解析时为 _RAW_TIME - 字符串下标
+    ("pool", "I"),  # cardPoolType
+    ("resource_id", "q"),
+    ("quality", "h"),
+    ("count", "i"),
+    ("name", "I"),
+    ("resource_type", "I"),
+)
+
+Row = Tuple[int, int, int, int, int, int, int, int]
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _get_lock(uid: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(uid, threading.Lock())
+
+
+class _Strings:
+    """只追加的字符串表"""
+
+    def __init__(self, items: List[str]):
+        self.items = items
+        self.index = {s: i for i, s in enumerate(items)}
+        self.size = len(items)
+
+    def get(self, s: str) -> int:
+        idx = self.index.get(s)
+        if idx is None:
+            idx = len(self.items)
+            self.items.append(s)
+            self.index[s] = idx
+        return idx
+
+    def added(self) -> List[str]:
+        return self.items[self.size :]
+
+
+class _Codec:
+    """GachaLog 与列数据之间的转换，同一批数据中的时间字符串只解析一次"""
+
+    def __init__(self, strings: _Strings):
+        self.strings = strings
+        self._to_ts: Dict[str, int] = {}
+        self._to_str: Dict[int, str] = {}
+
+    def _encode_time(self, time_str: str) -> int:
+        try:
+            dt = datetime.strptime(time_str, TIME_FORMAT)
+        except ValueError:
+            dt = None
+        # 能解析但格式化后不同（如未补零）的也按原样保存，读取时与原 JSON 一致
+        if dt is None or dt.strftime(TIME_FORMAT) != time_str:
+            logger.debug(f"[鸣潮] 抽卡记录时间格式异常，按原样保存: {time_str!r}")
+            return _RAW_TIME - self.strings.get(time_str)
+        return int((dt - _EPOCH).total_seconds())
+
+    def encode(self, group: str, log: GachaLog) -> Row:
+        ts = self._to_ts.get(log.time)
+        if ts is None:
+            ts = self._to_ts[log.time] = self._encode_time(log.time)
+        s = self.strings.get
+        return (
+            s(group),
+            ts,
+            s(log.cardPoolType),
+            log.resourceId,
+            log.qualityLevel,
+            log.count,
+            s(log.name),
+            s(log.resourceType),
+        )
+
+    def decode(self, row: Row) -> Dict[str, Any]:
+        _, ts, pool, resource_id, quality, count, name, resource_type = row
+        items = self.strings.items
+        time_str = self._to_str.get(ts)
+        if time_str is None:
+            if ts <= _RAW_TIME:
+                time_str = items[_RAW_TIME - ts]
+            else:
+                time_str = (_EPOCH + timedelta(seconds=ts)).strftime(TIME_FORMAT)
+            self._to_str[ts] = time_str
+        # 与 GachaLog.model_dump() 的字段顺序一致
+        return {
+            "cardPoolType": items[pool],
+            "resourceId": resource_id,
+            "qualityLevel": quality,
+            "resourceType": items[resource_type],
+            "name": items[name],
+            "count": count,
+            "time": time_str,
+        }
+
+
+def _new_group_stats() -> Dict[str, Any]:
+    return {"len": 0, "total": 0, "remain": 0, "r_num": [], "s_names": []}
+
+
+def _update_group_stats(stats: Dict[str, Any], quality: int, name: str):
+    """按时间从旧到新累加，与原先倒序遍历 gacha_logs.json 的统计方式相同"""
+    stats["len"] += 1
+    stats["total"] += 1
+    if quality == 5:
+        stats["r_num"].append(stats["remain"] + 1)
+        stats["s_names"].append(name)
+        stats["remain"] = 0
+    else:
+        stats["remain"] += 1
+
+
+class GachaStore:
+    """按列存储的抽卡记录
+
+    每个 uid 一个目录，每列一个定长数组文件，字符串（卡池、名称、类型）存入只追加的字符串表。
+    每个卡池的记录按时间从旧到新追加，读取时再还原为 gacha_logs.json 中从新到旧的顺序。
+
+    meta.json 记录已提交的记录数、字符串表长度和每个卡池的统计累加值，
+    更新时如果原有记录未变化只追加新记录并更新统计，否则写入新一代文件后再切换 meta.json。
+    旧版的 gacha_logs.json 在首次读取时转换，导出仍使用 JSON 格式。
+    """
+
+    def __init__(self, uid: str):
+        self.uid = str(uid)
+        self.dir = PLAYER_PATH / self.uid
+        self.path = self.dir / "gacha_store"
+        self.legacy_path = self.dir / "gacha_logs.json"
+        self.meta_path = self.path / "meta.json"
+        # 最近一次 load() 因转换失败返回的是未经校验的旧版 gacha_logs.json
+        self.loaded_legacy = False
+
+    def exists(self) -> bool:
+        return self.meta_path.exists() or self.legacy_path.exists()
+
+    def get_stat(self) -> Optional[FileStat]:
+        """meta.json 的 (mtime_ns, size)，每次保存都会变化，用于判断抽卡排行索引是否过期"""
+        try:
+            st = self.meta_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    # 文件
+
+    def _column_file(self, col: str, gen: int) -> Path:
+        return self.path / f"{col}.{gen}.bin"
+
+    def _strings_file(self, gen: int) -> Path:
+        return self.path / f"strings.{gen}.jsonl"
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != STORE_VERSION:
+            return None
+        return meta
+
+    def _write_meta(self, meta: Dict[str, Any]):
+        tmp = self.meta_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.meta_path)
+
+    def _read_strings(self, meta: Dict[str, Any]) -> List[str]:
+        with open(self._strings_file(meta["gen"]), "rb") as f:
+            data = f.read(meta["strings_size"])
+        return [json.loads(line) for line in data.splitlines() if line]
+
+    def _read_rows(self, meta: Dict[str, Any]) -> List[Row]:
+        count = meta["count"]
+        columns = []
+        for col, code in COLUMNS:
+            arr = array.array(code)
+            with open(self._column_file(col, meta["gen"]), "rb") as f:
+                arr.frombytes(f.read(count * arr.itemsize))
+            if len(arr) != count:
+                raise ValueError(f"列 {col} 数据不完整")
+            columns.append(arr)
+        return list(zip(*columns))
+
+    @staticmethod
+    def _encode_strings(strings: List[str]) -> bytes:
+        return b"".join(json.dumps(s, ensure_ascii=False).encode() + b"\n" for s in strings)
+
+    # 写入
+
+    def _rewrite(
+        self,
+        meta: Optional[Dict[str, Any]],
+        groups: Dict[str, List[GachaLog]],
+        data_time: str,
+    ):
+        strings = _Strings([])
+        codec = _Codec(strings)
+        rows: List[Row] = []
+        group_stats: Dict[str, Dict[str, Any]] = {}
+        for group, logs in groups.items():
+            stats = group_stats[group] = _new_group_stats()
+            for log in reversed(logs):
+                rows.append(codec.encode(group, log))
+                _update_group_stats(stats, log.qualityLevel, log.name)
+
+        old_gen = meta["gen"] if meta else None
+        gen = old_gen + 1 if old_gen is not None else 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        for i, (col, code) in enumerate(COLUMNS):
+            with open(self._column_file(col, gen), "wb") as f:
+                f.write(array.array(code, [row[i] for row in rows]).tobytes())
+        strings_data = self._encode_strings(strings.items)
+        with open(self._strings_file(gen), "wb") as f:
+            f.write(strings_data)
+
+        self._write_meta(
+            {
+                "version": STORE_VERSION,
+                "uid": self.uid,
+                "data_time": data_time,
+                "gen": gen,
+                "count": len(rows),
+                "strings_size": len(strings_data),
+                "groups": group_stats,
+            }
+        )
+
+        if old_gen is not None:
+            for col, _ in COLUMNS:
+                self._column_file(col, old_gen).unlink(missing_ok=True)
+            self._strings_file(old_gen).unlink(missing_ok=True)
+
+    def _try_append(
+        self,
+        meta: Dict[str, Any],
+        groups: Dict[str, List[GachaLog]],
+        data_time: str,
+    ) -> bool:
+        """原有记录都是新数据的末尾（更早的部分）时只追加新记录，返回是否成功"""
+        strings = _Strings(self._read_strings(meta))
+        codec = _Codec(strings)
+
+        existing: Dict[str, List[Row]] = {}
+        for row in self._read_rows(meta):
+            existing.setdefault(strings.items[row[0]], []).append(row)
+        if any(rows and group not in groups for group, rows in existing.items()):
+            return False
+
+        appended: List[Row] = []
+        group_stats = {group: meta["groups"].get(group) or _new_group_stats() for group in groups}
+        for group, logs in groups.items():
+            old_rows = existing.get(group, [])
+            if len(logs) < len(old_rows):
+                return False
+            chrono = logs[::-1]
+            for old, log in zip(old_rows, chrono):
+                if old != codec.encode(group, log):
+                    return False
+            for log in chrono[len(old_rows) :]:
+                appended.append(codec.encode(group, log))
+                _update_group_stats(group_stats[group], log.qualityLevel, log.name)
+
+        gen = meta["gen"]
+        if appended:
+            for i, (col, code) in enumerate(COLUMNS):
+                arr = array.array(code, [row[i] for row in appended])
+                with open(self._column_file(col, gen), "r+b") as f:
+                    # 截掉上次中断时写入但未提交的部分
+                    f.truncate(meta["count"] * arr.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    f.write(arr.tobytes())
+
+        strings_size = meta["strings_size"]
+        added = strings.added()
+        if added:
+            strings_data = self._encode_strings(added)
+            with open(self._strings_file(gen), "r+b") as f:
+                f.truncate(strings_size)
+                f.seek(0, os.SEEK_END)
+                f.write(strings_data)
+            strings_size += len(strings_data)
+
+        meta.update(
+            {
+                "data_time": data_time,
+                "count": meta["count"] + len(appended),
+                "strings_size": strings_size,
+                "groups": group_stats,
+            }
+        )
+        self._write_meta(meta)
+        return True
+
+    def _save(self, groups: Dict[str, List[GachaLog]], data_time: str):
+        with _get_lock(self.uid):
+            meta = self._read_meta()
+            if meta is not None:
+                try:
+                    if self._try_append(meta, groups, data_time):
+                        return
+                except (OSError, ValueError) as e:
+                    logger.warning(f"[鸣潮] 抽卡记录追加失败，重新写入 uid={self.uid}: {e}")
+            self._rewrite(meta, groups, data_time)
+
+    # 读取
+
+    def _migrate(self) -> Optional[Dict[str, Any]]:
+        """将旧版 gacha_logs.json 转换为列存储，原文件改名保留"""
+        try:
+            raw = json.loads(self.legacy_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        try:
+            groups = {
+                group: [GachaLog.model_validate(log) for log in logs] for group, logs in raw.get("data", {}).items()
+            }
+            self._rewrite(self._read_meta(), groups, raw.get("data_time", ""))
+            os.replace(self.legacy_path, self.dir / "gacha_logs.migrated.json")
+        except Exception as e:
+            # 无法转换时继续使用原文件，下次写入时再转换
+            logger.warning(f"[鸣潮] 抽卡记录转换失败 uid={self.uid}: {e}")
+            return raw
+        return None
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        self.loaded_legacy = False
+        with _get_lock(self.uid):
+            meta = self._read_meta()
+            if meta is None:
+                if not self.legacy_path.exists():
+                    return None
+                raw = self._migrate()
+                if raw is not None:
+                    self.loaded_legacy = True
+                    return raw
+                meta = self._read_meta()
+                if meta is None:
+                    return None
+
+            strings = _Strings(self._read_strings(meta))
+            rows = self._read_rows(meta)
+
+        codec = _Codec(strings)
+        data: Dict[str, List[Dict[str, Any]]] = {group: [] for group in meta["groups"]}
+        for row in rows:
+            data[strings.items[row[0]]].append(codec.decode(row))
+        for logs in data.values():
+            logs.reverse()
+
+        # 与原 gacha_logs.json 的结构一致
+        result: Dict[str, Any] = {"uid": self.uid, "data_time": meta["data_time"]}
+        for group, logs in data.items():
+            result[group] = len(logs)
+        result["data"] = data
+        return result
+
+    def _get_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        meta = self._read_meta()
+        if meta is None:
+            if not self.legacy_path.exists():
+                return None
+            with _get_lock(self.uid):
+                self._migrate()
+            meta = self._read_meta()
+            if meta is None:
+                return None
+        return meta["groups"]
+
+    def _remove(self, backup_path: Path):
+        data = self._load()
+        with _get_lock(self.uid):
+            if data is not None:
+                backup_path.parent.mkdir(parents=True, exist_ok=True)
+                backup_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            for f in self.path.glob("*"):
+                f.unlink(missing_ok=True)
+            self.legacy_path.unlink(missing_ok=True)
+
+    # 接口
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        """读取全部抽卡记录，结构与原 gacha_logs.json 相同，没有记录时返回 None
+
+        旧版文件无法转换时原样返回其内容，此时 loaded_legacy 为 True，记录需要调用方校验
+        """
+        return await asyncio.to_thread(self._load)
+
+    async def save(self, groups: Dict[str, List[GachaLog]], data_time: str):
+        """保存全部抽卡记录（每个卡池从新到旧），原有记录未变化时只追加新增部分"""
+        await asyncio.to_thread(self._save, groups, data_time)
+
+    async def get_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """每个卡池的统计累加值：总抽数、未出金抽数、每个五星的抽数和名称"""
+        return await asyncio.to_thread(self._get_stats)
+
+    async def remove(self, backup_path: Path):
+        """删除抽卡记录，删除前以 JSON 格式备份到 backup_path"""
+        await asyncio.to_thread(self._remove, backup_path)
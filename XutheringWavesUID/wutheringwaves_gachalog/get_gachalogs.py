@@ -2,17 +2,21 @@ import copy
 import json
 import base64
 import asyncio
-from typing import Dict, List, Tuple, Union, Optional
-from pathlib import Path
+from typing import Dict, List, Union, Optional
 from datetime import datetime
 
-import msgspec
 import aiofiles
 
 from gsuid_core.logger import logger
 from gsuid_core.models import Event
 
 from .model import WWUIDGacha
+from .gacha_store import GachaStore
+from .gacha_merge import (
+    merge_gacha_logs_by_common_subarray,
+    find_longest_common_subarray_indices,
+)
+from .draw_gachalogs import save_gacha_stats
 from ..version import XutheringWavesUID_version
 from ..utils.api.model import GachaLog
 from ..utils.constants import WAVES_GAME_ID
@@ -51,52 +55,6 @@ gachalogs_history_meta = {
 ERROR_MSG_INVALID_LINK = "当前抽卡链接已经失效，请重新导入抽卡链接"
 
 
-# 找到两个数组中最长公共子串的下标（忽略resourceType字段差异）
-def find_longest_common_subarray_indices(
-    a: List[GachaLog], b: List[GachaLog]
-) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
-    n, m = len(a), len(b)
-    dp = [[0] * (m + 1) for _ in range(n + 1)]
-    length = 0
-    a_end = b_end = 0
-
-    for i in range(n - 1, -1, -1):
-        for j in range(m - 1, -1, -1):
-            # 使用 match_key() 比较，忽略 resourceType 差异
-            if a[i].match_key() == b[j].match_key():
-                dp[i][j] = dp[i + 1][j + 1] + 1
-                if dp[i][j] > length:
-                    length = dp[i][j]
-                    a_end = i + length - 1
-                    b_end = j + length - 1
-            else:
-                dp[i][j] = 0
-
-    if length == 0:
-        return None
-
-    return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
-
-
-# 根据最长公共子串递归合并两个GachaLog列表，不去重，按time排序
-def merge_gacha_logs_by_common_subarray(a: List[GachaLog], b: List[GachaLog]) -> List[GachaLog]:
-    common_indices = find_longest_common_subarray_indices(a, b)
-    if not common_indices:
-        return sorted(
-            a + b,
-            key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
-            reverse=True,
-        )
-
-    (a_start, a_end), (b_start, b_end) = common_indices
-
-    prefix = merge_gacha_logs_by_common_subarray(a[:a_start], b[:b_start])
-    common_subarray = a[a_start : a_end + 1]
-    suffix = merge_gacha_logs_by_common_subarray(a[a_end + 1 :], b[b_end + 1 :])
-
-    return prefix + common_subarray + suffix
-
-
 async def get_new_gachalog(
     uid: str, record_id: str, full_data: Dict[str, List[GachaLog]], is_force: bool
 ) -> tuple[Union[str, None], Dict[str, List[GachaLog]], Dict[str, int], Dict[str, List[GachaLog]]]:
@@ -197,14 +155,11 @@ async def save_gachalogs(
     if not path.exists():
         path.mkdir(parents=True, exist_ok=True)
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
+    store = GachaStore(uid)
 
     temp_gachalogs_history = {}
-    if gachalogs_path.exists():
-        with Path.open(gachalogs_path, encoding="UTF-8") as f:
-            gachalogs_history: Dict = json.load(f)
-
+    gachalogs_history = await store.load()
+    if gachalogs_history is not None:
         # import 时备份
         if not record_id:
             await backup_gachalogs(uid, gachalogs_history, type="import")
@@ -240,8 +195,12 @@ async def save_gachalogs(
     if is_need_backup:
         await backup_gachalogs(uid, temp_gachalogs_history, type="update")
 
+    # 列存储中的记录写入前已校验，无需再次校验；转换失败时读取的旧版文件仍需校验
     for gacha_name in gacha_type_meta_data.keys():
-        gachalogs_history[gacha_name] = [GachaLog(**log) for log in gachalogs_history[gacha_name]]
+        if store.loaded_legacy:
+            gachalogs_history[gacha_name] = [GachaLog.model_validate(log) for log in gachalogs_history[gacha_name]]
+        else:
+            gachalogs_history[gacha_name] = [GachaLog.model_construct(**log) for log in gachalogs_history[gacha_name]]
 
     link_source_data: Dict[str, List[GachaLog]] = {}
     if record_id:
@@ -285,21 +244,12 @@ async def save_gachalogs(
                     gachalogs_new[gacha_name] = logs[i:]
                     break
 
-    # 初始化最后保存的数据
-    result = {"uid": uid, "data_time": current_time}
-
-    # 保存数量
-    for gacha_name in gacha_type_meta_data.keys():
-        result[gacha_name] = len(gachalogs_new.get(gacha_name, []))  # type: ignore
-
-    result["data"] = {  # type: ignore
-        gacha_name: [log.model_dump() for log in gachalogs_new.get(gacha_name, [])]
-        for gacha_name in gacha_type_meta_data.keys()
-    }
-
-    vo = msgspec.to_builtins(result)
-    async with aiofiles.open(gachalogs_path, "w", encoding="UTF-8") as file:
-        await file.write(json.dumps(vo, ensure_ascii=False))
+    # 原有记录未变化时只追加新增的记录
+    await store.save(
+        {gacha_name: gachalogs_new.get(gacha_name, []) for gacha_name in gacha_type_meta_data.keys()},
+        current_time,
+    )
+    await save_gacha_stats(uid)
 
     # 计算数据
     all_add = sum(gachalogs_count_add.values())
@@ -396,12 +346,8 @@ async def export_gachalogs(uid: str) -> dict:
     now = datetime.now()
     current_time = now.strftime("%Y-%m-%d %H:%M:%S")
 
-    # 抽卡记录json路径
-    gachalogs_path = path / "gacha_logs.json"
-    if gachalogs_path.exists():
-        async with aiofiles.open(gachalogs_path, "r", encoding="UTF-8") as f:
-            raw_data = json.loads(await f.read())
-
+    raw_data = await GachaStore(uid).load()
+    if raw_data is not None:
         result = {
             "info": {
                 "export_time": current_time,
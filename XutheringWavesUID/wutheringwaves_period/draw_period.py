@@ -1,6 +1,6 @@
 import asyncio
 from pathlib import Path
-from typing import Any, Dict, Union, Optional
+from typing import Any, Dict, Tuple, Union, Optional
 import math
 
 from gsuid_core.bot import Bot
@@ -14,6 +14,7 @@ from gsuid_core.utils.image.image_tools import crop_center_img
 from ..utils.waves_api import waves_api
 from ..wutheringwaves_config import PREFIX
 from ..utils.database.models import WavesBind
+from ..utils.fetch_planner import FetchPlanner
 from ..utils.image import add_footer, get_waves_bg, get_event_avatar
 from ..utils.api.model import Period, PeriodList, PeriodDetail, AccountBaseInfo
 from ..utils.fonts.waves_fonts import (
@@ -105,12 +106,13 @@ def _get_relative_period_node(
     return period_type, period_seq[count]
 
 
-async def process_uid(uid, ev, period_param: Optional[Union[int, str]]) -> Optional[Union[Dict[str, Any], str]]:
-    ck = await waves_api.get_self_waves_ck(uid, ev.user_id, ev.bot_id)
-    if not ck:
-        return None
-
-    period_list = await waves_api.get_period_list(uid, ck)
+async def _get_period(
+    uid: str,
+    ck: str,
+    period_param: Optional[Union[int, str]],
+    plan: FetchPlanner,
+) -> Optional[Union[Tuple[Period, PeriodDetail], str]]:
+    period_list = await plan.call(waves_api.get_period_list, uid, ck)
     if not period_list.success or not period_list.data:
         return None
 
@@ -149,12 +151,28 @@ async def process_uid(uid, ev, period_param: Optional[Union[int, str]]) -> Optio
     if not period_node:
         return MSG_NO_PERIOD.format(uid, period_param, PREFIX)
 
-    period_detail = await waves_api.get_period_detail(period_type, period_node.index, uid, ck)
+    period_detail = await plan.call(waves_api.get_period_detail, period_type, period_node.index, uid, ck)
     if not period_detail.success or not period_detail.data:
         return None
-    period_detail = PeriodDetail.model_validate(period_detail.data)
+    return period_node, PeriodDetail.model_validate(period_detail.data)
+
+
+async def process_uid(
+    uid, ev, period_param: Optional[Union[int, str]], plan: FetchPlanner
+) -> Optional[Union[Dict[str, Any], str]]:
+    ck = await plan.get_ck(uid)
+    if not ck:
+        return None
+
+    # 简报列表 -> 简报详情 与 账号信息互不依赖，同时请求
+    period, account_info = await asyncio.gather(
+        _get_period(uid, ck, period_param, plan),
+        plan.call(waves_api.get_base_info, uid, ck),
+    )
+    if not isinstance(period, tuple):
+        return period
+    period_node, period_detail = period
 
-    account_info = await waves_api.get_base_info(uid, ck)
     if not account_info.success or not account_info.data:
         return None
     if not account_info.data:
@@ -177,27 +195,20 @@ async def draw_period_img(bot: Bot, ev: Event):
         if uid_list is None:
             return MSG_TOKEN.format(PREFIX)
 
-        # 进行校验UID是否绑定CK
-        tasks = [process_uid(uid, ev, period_param) for uid in uid_list]
+        # 所有 UID 的请求同时开始，每个 UID 数据就绪后立即绘制
+        plan = FetchPlanner(ev.user_id, ev.bot_id)
+        tasks = [_draw_uid_period_img(uid, ev, period_param, plan) for uid in uid_list]
         results = await asyncio.gather(*tasks)
 
-        # 过滤掉 None 值
-        valid_period_list = [res for res in results if isinstance(res, dict)]
+        # 收集所有生成的图片
+        images = [res for res in results if isinstance(res, Image.Image)]
 
-        if len(valid_period_list) == 0:
+        if len(images) == 0:
             msg = [res for res in results if isinstance(res, str)]
             if msg:
                 return "\n".join(msg)
             return MSG_TOKEN.format(PREFIX)
 
-        # 开始绘图任务
-        tasks = []
-        for uid_index, valid in enumerate(valid_period_list):
-            tasks.append(_draw_all_period_img(ev, valid, uid_index))
-        
-        # 收集所有生成的图片
-        images = await asyncio.gather(*tasks)
-        
         # 计算总高度
         total_height = sum(img.height for img in images)
         
@@ -218,12 +229,21 @@ async def draw_period_img(bot: Bot, ev: Event):
     return res
 
 
-async def _draw_all_period_img(ev: Event, valid: Dict[str, Any], uid_index: int) -> Image.Image:
-    period_img = await _draw_period_img(ev, valid)
+async def _draw_uid_period_img(
+    uid: str,
+    ev: Event,
+    period_param: Optional[Union[int, str]],
+    plan: FetchPlanner,
+) -> Optional[Union[Image.Image, str]]:
+    # 进行校验UID是否绑定CK
+    valid = await process_uid(uid, ev, period_param, plan)
+    if not isinstance(valid, dict):
+        return valid
+    period_img = await _draw_period_img(ev, valid, plan)
     return period_img.convert("RGBA")
 
 
-async def _draw_period_img(ev: Event, valid: Dict):
+async def _draw_period_img(ev: Event, valid: Dict, plan: FetchPlanner):
     period_detail: PeriodDetail = valid["period_detail"]
     account_info: AccountBaseInfo = valid["account_info"]
     period_node: Period = valid["period_node"]
@@ -297,7 +317,7 @@ async def _draw_period_img(ev: Event, valid: Dict):
     title_img_draw.text((240, 75), f"{account_info.name}", "black", waves_font_36, "lm")
     title_img_draw.text((240, 140), f"特征码: {account_info.id}", "black", waves_font_24, "lm")
 
-    avatar_img = await draw_pic_with_ring(ev)
+    avatar_img = await plan.shared("avatar_ring", draw_pic_with_ring, ev)
     title_img.paste(avatar_img, (27, 8), avatar_img)
 
     img.paste(title_img, (0, 30), title_img)
@@ -4,7 +4,6 @@ import asyncio
 from typing import Dict, Union
 from pathlib import Path
 
-import httpx
 from PIL import Image, ImageDraw
 
 from gsuid_core.logger import logger
@@ -22,6 +21,7 @@ from ..utils.image import (
     get_attribute,
     get_square_avatar,
 )
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import GET_HOLD_RATE_URL
 from ..utils.ascension.char import get_char_model
 from ..utils.char_info_utils import get_all_role_detail_info_list
@@ -254,11 +254,11 @@ async def draw_pic(roleId):
 async def get_char_hold_rate_data() -> Dict:
     """获取角色持有率数据"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(GET_HOLD_RATE_URL, timeout=10)
-            response.raise_for_status()
-            if response.status_code == 200:
-                return response.json().get("data", {})
+        client = http_pool.get_httpx_client()
+        response = await client.get(GET_HOLD_RATE_URL, timeout=10)
+        response.raise_for_status()
+        if response.status_code == 200:
+            return response.json().get("data", {})
     except Exception as e:
         logger.error(f"获取角色持有率数据失败: {e}")
 
@@ -10,6 +10,7 @@ from gsuid_core.utils.image.convert import convert_img
 
 from ..utils.util import timed_async_cache
 from ..utils.image import get_ICON, add_footer, get_waves_bg, get_square_avatar
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import GET_SLASH_APPEAR_RATE
 from ..utils.ascension.char import get_char_model
 from ..utils.ascension.model import CharacterModel
@@ -26,19 +27,19 @@ TEXT_PATH = Path(__file__).parent / "texture2d"
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, dict))
 async def get_slash_appear_rate_data() -> Union[Dict, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_SLASH_APPEAR_RATE,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"获取冥海出场率数据失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.get(
+            GET_SLASH_APPEAR_RATE,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return res.json().get("data", [])
+    except Exception as e:
+        logger.exception(f"获取冥海出场率数据失败: {e}")
 
 
 async def draw_slash_use_rate(ev: Event):
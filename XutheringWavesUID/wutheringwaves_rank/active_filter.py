@@ -0,0 +1,39 @@
+import time
+from typing import List, Optional
+
+from gsuid_core.logger import logger
+
+from ..utils.database.models import WavesBind
+from ..wutheringwaves_config import WutheringWavesConfig
+from ..utils.database.waves_user_activity import WavesUserActivity
+
+
+async def filter_active_group_users(
+    users: List[WavesBind],
+    bot_id: str,
+    bot_self_id: Optional[str] = None,
+) -> List[WavesBind]:
+    """只保留 ActiveUserDays 天内活跃过的用户，所有用户一次查询"""
+    active_days = WutheringWavesConfig.get_config("ActiveUserDays").data
+    if not users or not active_days:
+        return users
+
+    fallback_platform = bot_id
+    fallback_bot_self_id = bot_self_id or ""
+    user_keys = {
+        (user.user_id, user.bot_id or fallback_platform, fallback_bot_self_id)
+        for user in users
+        if user.user_id
+    }
+    if not user_keys:
+        return []
+
+    try:
+        times = await WavesUserActivity.get_last_active_times(user_keys)
+    except Exception as e:
+        logger.warning(f"[鸣潮] 获取用户活跃度失败: {e}")
+        return []
+
+    threshold_time = int(time.time()) - (active_days * 24 * 60 * 60)
+    active_user_ids = {key[0] for key, active_time in times.items() if active_time >= threshold_time}
+    return [user for user in users if user.user_id in active_user_ids]
@@ -1,6 +1,6 @@
 import time
 import asyncio
-from typing import List, Union, Optional
+from typing import Dict, List, Union, Optional
 from pathlib import Path
 
 from PIL import Image, ImageDraw
@@ -13,7 +13,9 @@ from gsuid_core.utils.image.convert import convert_img
 from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.util import hide_uid
+from .active_filter import filter_active_group_users
 from ..utils.cache import TimedCache
+from ..utils.card_cache import card_cache, make_card_key
 from ..utils.image import (
     RED,
     GREY,
@@ -27,7 +29,8 @@ from ..utils.image import (
     get_square_weapon,
     get_custom_waves_bg,
     get_attribute_effect,
-    get_role_pile_default,
+    get_role_pile_default_path,
+    get_custom_waves_bg_inputs,
 )
 from ..utils.api.model import WeaponData, RoleDetailData
 from ..utils.calculate import (
@@ -36,10 +39,10 @@ from ..utils.calculate import (
     get_total_score_bg,
 )
 from ..utils.name_convert import alias_to_char_name, char_name_to_char_id
-from ..utils.char_info_utils import get_all_role_detail_info_list
+from ..utils.rank_index import RankEntry, rank_index
+from ..utils.panel_store import FileStat, panel_store
 from ..utils.damage.abstract import DamageRankRegister
 from ..utils.database.models import WavesBind, WavesUser
-from ..utils.database.waves_user_activity import WavesUserActivity
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_14,
@@ -69,7 +72,7 @@ pic_cache = TimedCache(86400, 200)
 
 
 class RankInfo(BaseModel):
-    roleDetail: RoleDetailData  # 角色明细
+    roleDetail: Optional[RoleDetailData] = None  # 角色明细，仅上榜展示的条目加载
     qid: str  # qq id
     uid: str  # uid
     level: int  # 角色等级
@@ -82,8 +85,11 @@ class RankInfo(BaseModel):
     sonata_name: str  # 合鸣效果
 
 
-async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
+def calc_rank_entry(uid: str, role_detail: RoleDetailData, rankDetail) -> Optional[RankEntry]:
     from ..utils.calc import WuWaCalc
+
+    if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
+        return None
     equipPhantomList = role_detail.phantomData.equipPhantomList
 
     calc: WuWaCalc = WuWaCalc(role_detail)
@@ -105,7 +111,7 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
             phantom_score += _score
 
     if phantom_score == 0:
-        return
+        return None
 
     phantom_score = round(phantom_score, 2)
     phantom_bg = get_total_score_bg(role_detail.role.roleName, phantom_score, calc.calc_temp)
@@ -144,75 +150,95 @@ async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
                 except ValueError:
                     expected_damage_int = 0
 
-    rankInfo = RankInfo(
-        **{
-            "roleDetail": role_detail,
-            "qid": user_id,
-            "uid": uid,
-            "level": role_detail.role.level,
-            "chain": role_detail.get_chain_num(),
-            "chainName": role_detail.get_chain_name(),
-            "score": round(int(phantom_score * 100) / 100, ndigits=2),
-            "score_bg": phantom_bg,
-            "expected_damage": expected_damage,
-            "expected_damage_int": expected_damage_int,
-            "sonata_name": sonata_name,
-        }
+    return RankEntry(
+        uid=uid,
+        role_id=role_detail.role.roleId,
+        level=role_detail.role.level,
+        chain=role_detail.get_chain_num(),
+        score=round(int(phantom_score * 100) / 100, ndigits=2),
+        score_bg=phantom_bg,
+        expected_damage=f"{expected_damage}",
+        expected_damage_int=expected_damage_int,
+        sonata_name=sonata_name,
     )
-    return rankInfo
 
 
-async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[int]]) -> Optional[RoleDetailData]:
-    role_details = await get_all_role_detail_info_list(uid)
-    if role_details is None:
-        return None
+def rank_entry_to_info(user_id: str, entry: RankEntry, role_detail: Optional[RoleDetailData] = None) -> RankInfo:
+    return RankInfo(
+        roleDetail=role_detail,
+        qid=user_id,
+        uid=entry.uid,
+        level=entry.level,
+        chain=entry.chain,
+        chainName=f"{['零', '一', '二', '三', '四', '五', '六'][entry.chain]}链",
+        score=entry.score,
+        score_bg=entry.score_bg,
+        expected_damage=entry.expected_damage,
+        expected_damage_int=entry.expected_damage_int,
+        sonata_name=entry.sonata_name,
+    )
 
-    # 将char_id转换为字符串列表进行匹配
-    if isinstance(char_id, (int, str)):
-        char_id_list = [str(char_id)]
-    else:
-        char_id_list = [str(cid) for cid in char_id]
 
-    # 使用生成器来进行过滤
-    return next((role for role in role_details if str(role.role.roleId) in char_id_list), None)
+async def get_one_rank_info(user_id, uid, role_detail, rankDetail):
+    entry = calc_rank_entry(uid, role_detail, rankDetail)
+    if not entry:
+        return
+    return rank_entry_to_info(user_id, entry, role_detail)
 
 
-async def get_rank_info_for_user(
-    user: WavesBind,
-    char_id,
-    find_char_id,
-    rankDetail,
-    tokenLimitFlag,
-    wavesTokenUsersMap,
+async def update_rank_index(
+    uid: str,
+    role_details: List[RoleDetailData],
+    removed_role_ids: Optional[List[int]] = None,
+    old_stat: Optional[FileStat] = None,
 ):
-    rankInfoList = []
-    if not user.uid:
-        return rankInfoList
-
-    tasks = [find_role_detail(uid, find_char_id) for uid in user.uid.split("_")]
-    role_details = await asyncio.gather(*tasks)
-
-    for uid, role_detail in zip(user.uid.split("_"), role_details):
-        if (
-            tokenLimitFlag
-            and (
-                user.user_id,
-                uid,
-            )
-            not in wavesTokenUsersMap
-        ):
-            continue
-        if not role_detail:
-            continue
-        if not role_detail.phantomData or not role_detail.phantomData.equipPhantomList:
-            continue
+    """面板刷新后，只重新计算变化角色的排行数据"""
+    entries: Dict[int, Optional[RankEntry]] = {i: None for i in removed_role_ids or []}
+    for role_detail in role_details:
+        role_id = role_detail.role.roleId
+        try:
+            rankDetail = DamageRankRegister.find_class(str(role_id))
+            entries[role_id] = calc_rank_entry(uid, role_detail, rankDetail)
+        except Exception as e:
+            logger.warning(f"[鸣潮] 排行数据计算失败 uid={uid} roleId={role_id}: {e}")
+            entries.pop(role_id, None)
+            # 该角色旧结果已失效，不沿用旧数据，查询时重新计算
+            old_stat = None
+    await rank_index.update(uid, entries, old_stat)
 
-        rankInfo = await get_one_rank_info(user.user_id, uid, role_detail, rankDetail)
-        if not rankInfo:
-            continue
-        rankInfoList.append(rankInfo)
 
-    return rankInfoList
+async def find_role_detail(uid: str, char_id: Union[int, str, List[str], List[int]]) -> Optional[RoleDetailData]:
+    # 将char_id转换为列表进行匹配
+    if isinstance(char_id, (int, str)):
+        char_id_list = [char_id]
+    else:
+        char_id_list = list(char_id)
+
+    # 按 (uid, roleId) 从面板索引库读取单个角色，无需解析整个 rawData.json
+    role_data = await panel_store.find_role(uid, char_id_list)
+    if role_data is None:
+        return None
+
+    try:
+        return RoleDetailData.model_validate(role_data)
+    except Exception as e:
+        logger.warning(f"[鸣潮] 角色面板解析失败 uid={uid}: {e}")
+        return None
+
+
+async def rebuild_rank_entry(uid: str, find_char_id) -> Optional[RankEntry]:
+    """排行索引中没有或已过期时，重新计算该 uid 的角色排行数据并写回"""
+    role_detail = await find_role_detail(uid, find_char_id)
+    char_ids = [find_char_id] if isinstance(find_char_id, (int, str)) else find_char_id
+    entries: Dict[int, Optional[RankEntry]] = {int(i): None for i in char_ids}
+    entry = None
+    if role_detail:
+        role_id = role_detail.role.roleId
+        rankDetail = DamageRankRegister.find_class(str(role_id))
+        entry = calc_rank_entry(uid, role_detail, rankDetail)
+        entries[role_id] = entry
+    await rank_index.update(uid, entries)
+    return entry
 
 
 async def get_all_rank_info(
@@ -223,25 +249,48 @@ async def get_all_rank_info(
     tokenLimitFlag,
     wavesTokenUsersMap,
 ):
-    semaphore = asyncio.Semaphore(50)
-
-    async def process_user(user):
-        async with semaphore:
-            return await get_rank_info_for_user(
-                user,
-                char_id,
-                find_char_id,
-                rankDetail,
-                tokenLimitFlag,
-                wavesTokenUsersMap,
-            )
+    """从排行索引读取群成员的角色排行数据，只有缺失或过期的 uid 需要重新计算
 
-    tasks = [process_user(user) for user in users]
-    results = await asyncio.gather(*tasks)
+    返回的 RankInfo 不含 roleDetail，上榜展示前通过 load_rank_role_detail 加载
+    """
+    pairs = []
+    for user in users:
+        if not user.uid:
+            continue
+        for uid in user.uid.split("_"):
+            if tokenLimitFlag and (user.user_id, uid) not in wavesTokenUsersMap:
+                continue
+            pairs.append((user.user_id, uid))
+
+    entries, stale_uids = await rank_index.query(find_char_id, (uid for _, uid in pairs))
+
+    if stale_uids:
+        semaphore = asyncio.Semaphore(50)
+
+        async def rebuild(uid: str):
+            async with semaphore:
+                try:
+                    return uid, await rebuild_rank_entry(uid, find_char_id)
+                except Exception as e:
+                    logger.warning(f"[鸣潮] 排行数据计算失败 uid={uid}: {e}")
+                    return uid, None
+
+        results = await asyncio.gather(*(rebuild(uid) for uid in stale_uids))
+        entries.update({uid: entry for uid, entry in results if entry})
 
-    # Flatten the results list
-    rankInfoList = [rank_info for result in results for rank_info in result]
-    return rankInfoList
+    return [rank_entry_to_info(user_id, entries[uid]) for user_id, uid in pairs if uid in entries]
+
+
+async def load_rank_role_detail(rankInfoList: List[RankInfo], find_char_id) -> List[RankInfo]:
+    """为上榜展示的条目加载角色明细"""
+    role_details = await asyncio.gather(*(find_role_detail(rank.uid, find_char_id) for rank in rankInfoList))
+    result = []
+    for rank, role_detail in zip(rankInfoList, role_details):
+        if not role_detail:
+            continue
+        rank.roleDetail = role_detail
+        result.append(rank)
+    return result
 
 
 async def get_waves_token_condition(ev):
@@ -265,54 +314,6 @@ async def get_waves_token_condition(ev):
     return flag, wavesTokenUsersMap
 
 
-async def filter_active_group_users(
-    users: List[WavesBind],
-    bot_id: str,
-    bot_self_id: Optional[str] = None,
-) -> List[WavesBind]:
-    active_days = WutheringWavesConfig.get_config("ActiveUserDays").data
-    if not users or not active_days:
-        return users
-
-    fallback_platform = bot_id
-    fallback_bot_self_id = bot_self_id or ""
-    user_pairs = {
-        (user.user_id, user.bot_id or fallback_platform, fallback_bot_self_id)
-        for user in users
-        if user.user_id
-    }
-    if not user_pairs:
-        return []
-
-    semaphore = asyncio.Semaphore(50)
-
-    async def check(user_id: str, platform: str, check_bot_self_id: str):
-        async with semaphore:
-            try:
-                import time
-
-                last_active_time = await WavesUserActivity.get_user_last_active_time(
-                    user_id, platform, check_bot_self_id
-                )
-                current_time = int(time.time())
-                threshold_time = current_time - (active_days * 24 * 60 * 60)
-                if last_active_time is None:
-                    is_active = False
-                elif last_active_time < threshold_time:
-                    is_active = False
-                else:
-                    is_active = True
-            except Exception:
-                is_active = False
-            return user_id, is_active
-
-    results = await asyncio.gather(
-        *(check(user_id, platform, check_bot_self_id) for user_id, platform, check_bot_self_id in user_pairs)
-    )
-    active_user_ids = {user_id for user_id, is_active in results if is_active}
-    return [user for user in users if user.user_id in active_user_ids]
-
-
 async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union[str, bytes]:
     char_id = char_name_to_char_id(char)
     if not char_id:
@@ -402,6 +403,29 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     if rankId and rankInfo and rankId > rank_length:
         rankInfoList.append(rankInfo)
 
+    # 自定义立绘随机选取，先选出图片，和背景配置一起计入 key
+    pile_path = get_role_pile_default_path(char_id, custom=True)
+
+    # 上榜数据、面板文件和图片都未变化时直接返回上次的图片
+    cache_key = make_card_key(
+        "rank_char",
+        char_id,
+        rank_type,
+        damage_title,
+        tokenLimitFlag,
+        WutheringWavesConfig.get_config("RankActiveFilterGroup").data,
+        ev.bot_id,
+        rankId,
+        [(rank.model_dump(exclude={"roleDetail"}), panel_store.get_stat(rank.uid)) for rank in rankInfoList],
+        pile_path,
+        get_custom_waves_bg_inputs(),
+    )
+    cached = await card_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rankInfoList = await load_rank_role_detail(rankInfoList, find_char_id)
+
     totalNum = len(rankInfoList)
     title_h = 500
     bar_star_h = 110
@@ -413,13 +437,13 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     total_score = 0
     total_damage = 0
 
-    tasks = [get_avatar(ev, rank.qid, rank.roleDetail.role.roleId) for rank in rankInfoList]
+    tasks = [get_avatar(ev, rank.qid, rank.roleDetail.role.roleId) for rank in rankInfoList]  # type: ignore
     results = await asyncio.gather(*tasks)
 
     for index, temp in enumerate(zip(rankInfoList, results)):
         rank, role_avatar = temp
         rank: RankInfo
-        rank_role_detail: RoleDetailData = rank.roleDetail
+        rank_role_detail: RoleDetailData = rank.roleDetail  # type: ignore
         bar_bg = bar.copy()
         bar_star_draw = ImageDraw.Draw(bar_bg)
         # role_avatar = await get_avatar(ev, rank.qid, role_detail.role.roleId)
@@ -559,7 +583,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     title.alpha_composite(logo_img.copy(), dest=(50, 65))
 
     # 人物bg
-    pile = await get_role_pile_default(char_id, custom=True)
+    pile = Image.open(pile_path).convert("RGBA")
     title.paste(pile, (450, -120), pile)
     title_draw.text((200, 335), f"{avg_score}", "white", waves_font_44, "mm")
     title_draw.text((200, 375), "平均声骸分数", SPECIAL_GOLD, waves_font_20, "mm")
@@ -596,6 +620,7 @@ async def draw_rank_img(bot: Bot, ev: Event, char: str, rank_type: str) -> Union
     card_img.alpha_composite(img_temp, (0, 0))
     card_img = add_footer(card_img)
     card_img = await convert_img(card_img)
+    await card_cache.set(cache_key, card_img)
 
     logger.info(f"[get_rank_info_for_user] end: {time.time() - start_time}")
     return card_img
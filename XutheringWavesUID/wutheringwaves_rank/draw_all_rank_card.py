@@ -37,6 +37,7 @@ from ..utils.image import (
     get_attribute_effect,
     get_role_pile_default,
 )
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import (
     GET_RANK_URL,
     RankItem,
@@ -95,23 +96,23 @@ async def get_rank(item: RankItem) -> Optional[RankInfoResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return RankInfoResponse.model_validate(res.json())
-            else:
-                logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取排行失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.post(
+            GET_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return RankInfoResponse.model_validate(res.json())
+        else:
+            logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"获取排行失败: {e}")
 
 
 async def draw_all_rank_card(bot: Bot, ev: Event, char: str, rank_type: str, pages: int) -> Union[str, bytes]:
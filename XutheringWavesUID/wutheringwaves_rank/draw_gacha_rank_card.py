@@ -10,6 +10,7 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
 from .slash_rank import get_avatar
+from .active_filter import filter_active_group_users
 from ..utils.image import (
     RED,
     GREY,
@@ -19,7 +20,6 @@ from ..utils.image import (
     get_waves_bg,
 )
 from ..utils.database.models import WavesBind, WavesUser
-from ..utils.database.waves_user_activity import WavesUserActivity
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_18,
@@ -28,7 +28,8 @@ from ..utils.fonts.waves_fonts import (
     waves_font_34,
     waves_font_58,
 )
-from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_stats
+from ..utils.rank_index import GachaRankEntry
+from ..wutheringwaves_gachalog.draw_gachalogs import get_gacha_rank_entries
 
 TEXT_PATH = Path(__file__).parent / "texture2d"
 avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
@@ -39,24 +40,20 @@ GACHA_GREEN = (90, 220, 120)
 class GachaRankCard:
     """抽卡排行卡片信息"""
 
-    def __init__(self, user_id: str, uid: str, stats: dict):
+    def __init__(self, user_id: str, entry: GachaRankEntry):
         self.user_id = user_id
-        self.uid = uid
-        self.stats = stats
-        # 获取角色和武器的抽数
-        char_pool = stats.get("角色精准调谐", {})
-        weapon_pool = stats.get("武器精准调谐", {})
+        self.uid = entry.uid
 
-        # 平均抽数
-        self.char_avg = char_pool.get("avg_up", 0) or char_pool.get("avg", 0)
-        self.weapon_avg = weapon_pool.get("avg_up", 0) or weapon_pool.get("avg", 0)
+        # 平均抽数（优先UP）
+        self.char_avg = entry.char_avg
+        self.weapon_avg = entry.weapon_avg
 
         # 总抽数
-        self.total_count = char_pool.get("total", 0) + weapon_pool.get("total", 0)
+        self.total_count = entry.total
 
-        # 获取角色金数和武器金数（直接从 gachaStats 中读取，不加权）
-        self.char_gold = char_pool.get("char_gold", 0)
-        self.weapon_gold = weapon_pool.get("weapon_gold", 0)
+        # 角色金数和武器金数（不加权）
+        self.char_gold = entry.char_gold
+        self.weapon_gold = entry.weapon_gold
         self.gold_total = self.char_gold + self.weapon_gold
 
         # 计算加权抽数：使用实际投入加权公式
@@ -74,8 +71,7 @@ async def get_all_gacha_rank_info(
     wavesTokenUsersMap: Optional[Dict[Tuple[str, str], str]] = None,
 ) -> List[GachaRankCard]:
     """获取所有用户的抽卡排行信息"""
-    rankInfoList = []
-
+    pairs: List[Tuple[str, str]] = []
     for user in users:
         if not user.user_id:
             continue
@@ -87,19 +83,21 @@ async def get_all_gacha_rank_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            try:
-                stats = await get_gacha_stats(uid)
-                if not stats:
-                    continue
+            pairs.append((user.user_id, uid))
 
-                rankInfo = GachaRankCard(user.user_id, uid, stats)
-                if rankInfo.total_count < min_pull:
-                    continue
+    # 统计随抽卡记录更新写入排行索引，一次查询即可
+    try:
+        entries = await get_gacha_rank_entries([uid for _, uid in pairs])
+    except Exception as e:
+        logger.warning(f"获取抽卡排行数据失败: {e}")
+        return []
 
-                rankInfoList.append(rankInfo)
-            except Exception as e:
-                logger.debug(f"获取用户{uid}抽卡排行数据失败: {e}")
-                continue
+    rankInfoList = []
+    for user_id, uid in pairs:
+        entry = entries.get(uid)
+        if entry is None or entry.total < min_pull:
+            continue
+        rankInfoList.append(GachaRankCard(user_id, entry))
 
     return rankInfoList
 
@@ -125,54 +123,6 @@ async def get_gacha_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, str]
     return tokenLimitFlag, wavesTokenUsersMap
 
 
-async def filter_active_group_users(
-    users: List[WavesBind],
-    bot_id: str,
-    bot_self_id: Optional[str] = None,
-) -> List[WavesBind]:
-    active_days = WutheringWavesConfig.get_config("ActiveUserDays").data
-    if not users or not active_days:
-        return users
-
-    fallback_platform = bot_id
-    fallback_bot_self_id = bot_self_id or ""
-    user_pairs = {
-        (user.user_id, user.bot_id or fallback_platform, fallback_bot_self_id)
-        for user in users
-        if user.user_id
-    }
-    if not user_pairs:
-        return []
-
-    semaphore = asyncio.Semaphore(50)
-
-    async def check(user_id: str, platform: str, check_bot_self_id: str):
-        async with semaphore:
-            try:
-                import time
-
-                last_active_time = await WavesUserActivity.get_user_last_active_time(
-                    user_id, platform, check_bot_self_id
-                )
-                current_time = int(time.time())
-                threshold_time = current_time - (active_days * 24 * 60 * 60)
-                if last_active_time is None:
-                    is_active = False
-                elif last_active_time < threshold_time:
-                    is_active = False
-                else:
-                    is_active = True
-            except Exception:
-                is_active = False
-            return user_id, is_active
-
-    results = await asyncio.gather(
-        *(check(user_id, platform, check_bot_self_id) for user_id, platform, check_bot_self_id in user_pairs)
-    )
-    active_user_ids = {user_id for user_id, is_active in results if is_active}
-    return [user for user in users if user.user_id in active_user_ids]
-
-
 async def draw_gacha_rank_card(bot, ev: Event) -> Union[str, bytes]:
     """绘制抽卡排行"""
     # 检查权限配置
@@ -14,6 +14,7 @@ from gsuid_core.models import Event
 from gsuid_core.utils.image.convert import convert_img
 
 from .slash_rank import get_avatar
+from .active_filter import filter_active_group_users
 from ..utils.cache import TimedCache
 from ..utils.image import (
     RED,
@@ -36,9 +37,9 @@ from ..utils.calculate import (
     get_calc_map,
     calc_phantom_score,
 )
+from ..utils.rank_index import rank_index
 from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.database.models import WavesBind, WavesUser
-from ..utils.database.waves_user_activity import WavesUserActivity
 from ..wutheringwaves_config import PREFIX, WutheringWavesConfig
 from ..utils.fonts.waves_fonts import (
     waves_font_12,
@@ -74,54 +75,6 @@ async def get_practice_rank_token_condition(ev) -> Tuple[bool, Dict[Tuple[str, s
     return tokenLimitFlag, wavesTokenUsersMap
 
 
-async def filter_active_group_users(
-    users: List[WavesBind],
-    bot_id: str,
-    bot_self_id: Optional[str] = None,
-) -> List[WavesBind]:
-    active_days = WutheringWavesConfig.get_config("ActiveUserDays").data
-    if not users or not active_days:
-        return users
-
-    fallback_platform = bot_id
-    fallback_bot_self_id = bot_self_id or ""
-    user_pairs = {
-        (user.user_id, user.bot_id or fallback_platform, fallback_bot_self_id)
-        for user in users
-        if user.user_id
-    }
-    if not user_pairs:
-        return []
-
-    semaphore = asyncio.Semaphore(50)
-
-    async def check(user_id: str, platform: str, check_bot_self_id: str):
-        async with semaphore:
-            try:
-                import time
-
-                last_active_time = await WavesUserActivity.get_user_last_active_time(
-                    user_id, platform, check_bot_self_id
-                )
-                current_time = int(time.time())
-                threshold_time = current_time - (active_days * 24 * 60 * 60)
-                if last_active_time is None:
-                    is_active = False
-                elif last_active_time < threshold_time:
-                    is_active = False
-                else:
-                    is_active = True
-            except Exception:
-                is_active = False
-            return user_id, is_active
-
-    results = await asyncio.gather(
-        *(check(user_id, platform, check_bot_self_id) for user_id, platform, check_bot_self_id in user_pairs)
-    )
-    active_user_ids = {user_id for user_id, is_active in results if is_active}
-    return [user for user in users if user.user_id in active_user_ids]
-
-
 def calculate_role_phantom_score(role_detail: RoleDetailData) -> float:
     """计算单个角色的声骸总分
 
@@ -168,6 +121,8 @@ async def save_char_list_data(uid: str, char_list_data: Dict):
 
         async with aiofiles.open(path, "w", encoding="utf-8") as file:
             await file.write(json.dumps(char_list_data, ensure_ascii=False))
+        # 同步到排行索引，群练度排行直接在索引中汇总
+        await rank_index.save_practice(uid, char_list_data)
     except Exception as e:
         logger.debug(f"保存charListData.json失败 uid={uid}: {e}")
 
@@ -216,7 +171,37 @@ class PracticeRankInfo(BaseModel):
     uid: str  # uid
     kuro_name: str  # 玩家名字
     total_score: float  # 总声骸分数
-    role_details: List[RoleDetailData]  # 角色详情列表
+    role_ids: List[str] = []  # 达到阈值的角色id（合并漂泊者后的id）
+    role_details: List[RoleDetailData] = []  # 角色详情列表，仅上榜展示的条目加载
+
+
+async def build_practice_index(uid: str) -> bool:
+    """排行索引中没有该 uid 时，从charListData.json或rawData计算并写入索引"""
+    # 首先尝试从charListData.json读取缓存的角色评分
+    char_list_data = await load_char_list_data(uid)
+    if char_list_data:
+        await rank_index.save_practice(uid, char_list_data)
+        return True
+
+    # charListData.json不存在，从rawData计算并保存
+    role_details_list = await get_all_role_detail_info_list(uid)
+    if role_details_list is None:
+        return False
+
+    from ..utils.resource.constant import SPECIAL_CHAR_RANK_MAP
+
+    char_list_data = {}
+    for role_detail in role_details_list:
+        phantom_score = calculate_role_phantom_score(role_detail)
+        role_id_str = str(role_detail.role.roleId)
+        mapped_id = SPECIAL_CHAR_RANK_MAP.get(role_id_str, role_id_str)
+        char_list_data[mapped_id] = phantom_score
+
+    # 保存计算结果到charListData.json，同时写入索引
+    if not char_list_data:
+        return False
+    await save_char_list_data(uid, char_list_data)
+    return True
 
 
 async def get_all_rank_list_info(
@@ -227,12 +212,14 @@ async def get_all_rank_list_info(
 ) -> List[PracticeRankInfo]:
     """获取所有用户的练度排行信息（基于声骸分数）
 
+    总分直接在排行索引中按阈值汇总，返回的条目不含角色详情，
+    上榜展示前通过 load_practice_role_details 加载
+
     Args:
         users: 用户列表
         threshold: 计入排行的角色声骸分数阈值 (150-195)
     """
-    rankInfoList = []
-
+    pairs = []
     for user in users:
         if not user.uid:
             continue
@@ -242,91 +229,55 @@ async def get_all_rank_list_info(
             if tokenLimitFlag and wavesTokenUsersMap is not None:
                 if (user.user_id, uid) not in wavesTokenUsersMap:
                     continue
-            # 首先尝试从charListData.json读取缓存的角色评分
-            char_list_data = await load_char_list_data(uid)
-
-            if char_list_data:
-                # 使用缓存的角色评分数据
-                total_score = 0.0
-                valid_role_ids = []
-
-                for role_id_str, score in char_list_data.items():
-                    if score >= threshold:
-                        total_score += score
-                        valid_role_ids.append(role_id_str)
-
-                if total_score == 0:
-                    continue
+            pairs.append((user.user_id, uid))
 
-                total_score = round(total_score, 2)
+    uids = [uid for _, uid in pairs]
+    totals, missing = await rank_index.query_practice(uids, threshold)
+    if missing:
+        built = [uid for uid in missing if await build_practice_index(uid)]
+        if built:
+            built_totals, _ = await rank_index.query_practice(built, threshold)
+            totals.update(built_totals)
 
-                # 获取角色详情用于排行展示
-                role_details_list = await get_all_role_detail_info_list(uid)
-                if role_details_list is None:
-                    continue
-
-                from ..utils.resource.constant import SPECIAL_CHAR_RANK_MAP
-                role_details = []
-                for r in role_details_list:
-                    role_id_str = str(r.role.roleId)
-                    mapped_id = SPECIAL_CHAR_RANK_MAP.get(role_id_str, role_id_str)
-                    if mapped_id in valid_role_ids:
-                        role_details.append(r)
-
-                rankInfo = PracticeRankInfo(
-                    qid=user.user_id,
-                    uid=uid,
-                    kuro_name=uid,
-                    total_score=total_score,
-                    role_details=role_details,
-                )
-                rankInfoList.append(rankInfo)
-            else:
-                # charListData.json不存在，从rawData计算并保存
-                role_details_list = await get_all_role_detail_info_list(uid)
-                if role_details_list is None:
-                    continue
-
-                role_details = list(role_details_list)
-                if not role_details:
-                    continue
-
-                # 计算总声骸分数并保存到charListData
-                total_score = 0.0
-                valid_role_details = []
-                char_list_data = {}
-
-                from ..utils.resource.constant import SPECIAL_CHAR_RANK_MAP
+    rankInfoList = []
+    for user_id, uid in pairs:
+        if uid not in totals:
+            continue
+        total_score, role_ids = totals[uid]
+        if total_score == 0:
+            continue
 
-                for role_detail in role_details:
-                    phantom_score = calculate_role_phantom_score(role_detail)
-                    role_id_str = str(role_detail.role.roleId)
-                    mapped_id = SPECIAL_CHAR_RANK_MAP.get(role_id_str, role_id_str)
-                    char_list_data[mapped_id] = phantom_score
+        rankInfo = PracticeRankInfo(
+            qid=user_id,
+            uid=uid,
+            kuro_name=uid,
+            total_score=round(total_score, 2),
+            role_ids=role_ids,
+        )
+        rankInfoList.append(rankInfo)
 
-                    # 只计算分数>=阈值的角色
-                    if phantom_score >= threshold:
-                        total_score += phantom_score
-                        valid_role_details.append(role_detail)
+    return rankInfoList
 
-                # 保存计算结果到charListData.json
-                if char_list_data:
-                    await save_char_list_data(uid, char_list_data)
 
-                if total_score == 0:
-                    continue
+async def load_practice_role_details(rankInfoList: List[PracticeRankInfo]) -> List[PracticeRankInfo]:
+    """为上榜展示的条目加载达到阈值的角色详情，丢弃无法加载角色详情的条目"""
+    from ..utils.resource.constant import SPECIAL_CHAR_RANK_MAP
 
-                total_score = round(total_score, 2)
-                rankInfo = PracticeRankInfo(
-                    qid=user.user_id,
-                    uid=uid,
-                    kuro_name=uid,
-                    total_score=total_score,
-                    role_details=valid_role_details,
-                )
-                rankInfoList.append(rankInfo)
+    loaded = []
+    for rankInfo in rankInfoList:
+        role_details_list = await get_all_role_detail_info_list(rankInfo.uid)
+        if role_details_list is None:
+            continue
 
-    return rankInfoList
+        role_details = []
+        for r in role_details_list:
+            role_id_str = str(r.role.roleId)
+            mapped_id = SPECIAL_CHAR_RANK_MAP.get(role_id_str, role_id_str)
+            if mapped_id in rankInfo.role_ids:
+                role_details.append(r)
+        rankInfo.role_details = role_details
+        loaded.append(rankInfo)
+    return loaded
 
 
 async def draw_rank_list(bot: Bot, ev: Event, threshold: int = 175) -> Union[str, bytes]:
@@ -396,6 +347,7 @@ async def draw_rank_list(bot: Bot, ev: Event, threshold: int = 175) -> Union[str
     rankInfoList_display = rankInfoList[:rank_length]
     if rankId and rankInfo and rankId > rank_length:
         rankInfoList_display.append(rankInfo)
+    rankInfoList_display = await load_practice_role_details(rankInfoList_display)
 
     # 获取等级标签 (S/A/SS)
     threshold_label = "S"  # 默认值
@@ -31,6 +31,7 @@ from ..utils.image import (
     get_square_avatar,
     get_custom_waves_bg,
 )
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import (
     GET_TOTAL_RANK_URL,
     TotalRankRequest,
@@ -72,23 +73,23 @@ async def get_rank(item: TotalRankRequest) -> Optional[TotalRankResponse]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_TOTAL_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return TotalRankResponse.model_validate(res.json())
-            else:
-                logger.warning(f"获取练度排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取练度排行失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.post(
+            GET_TOTAL_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return TotalRankResponse.model_validate(res.json())
+        else:
+            logger.warning(f"获取练度排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"获取练度排行失败: {e}")
 
 
 async def draw_total_rank(bot: Bot, ev: Event, pages: int) -> Union[str, bytes]:
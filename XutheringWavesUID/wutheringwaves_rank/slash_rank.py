@@ -19,6 +19,8 @@ from gsuid_core.utils.image.image_tools import crop_center_img
 
 from ..utils.util import get_version
 from ..utils.cache import TimedCache
+from ..utils.panel_store import panel_store
+from ..utils.char_info_utils import get_all_role_detail_info_list
 from ..utils.image import (
     RED,
     GREY,
@@ -37,6 +39,7 @@ from ..utils.image import (
     pic_download_from_url,
 )
 from ..utils.api.model import SlashDetail
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import (
     GET_SLASH_RANK_URL,
     SlashRank,
@@ -163,23 +166,23 @@ async def get_rank(item: SlashRankItem) -> Optional[SlashRankRes]:
     if not WavesToken:
         return
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.post(
-                GET_SLASH_RANK_URL,
-                json=item.model_dump(),
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {WavesToken}",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return SlashRankRes.model_validate(res.json())
-            else:
-                logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
-        except Exception as e:
-            logger.exception(f"获取排行失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.post(
+            GET_SLASH_RANK_URL,
+            json=item.model_dump(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {WavesToken}",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return SlashRankRes.model_validate(res.json())
+        else:
+            logger.warning(f"获取排行失败: {res.status_code} - {res.text}")
+    except Exception as e:
+        logger.exception(f"获取排行失败: {e}")
 
 
 async def draw_all_slash_rank_card(bot: Bot, ev: Event):
@@ -520,26 +523,16 @@ async def get_all_slash_rank_info(
 
 
 async def get_role_chain_count(uid: str, role_id: int) -> int:
-    """从rawData.json获取角色共鸣链数量"""
-    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-
+    """从面板索引库获取角色共鸣链数量"""
     try:
-        raw_data_path = Path(PLAYER_PATH / str(uid) / "rawData.json")
-        if not raw_data_path.exists():
+        role_data = await panel_store.find_role(str(uid), [role_id])
+        if not role_data:
             return -1
 
-        async with aiofiles.open(raw_data_path, mode="r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
-        # rawData是一个列表，包含每个角色的详细信息
-        if isinstance(raw_data, list):
-            for role_data in raw_data:
-                if role_data.get("role", {}).get("roleId") == role_id:
-                    # 获取chainList长度
-                    chain_list = role_data.get("chainList", [])
-                    unlocked_chains = [c for c in chain_list if c.get("unlocked", False)]
-                    return len(unlocked_chains)
-        return -1
+        # 获取chainList长度
+        chain_list = role_data.get("chainList", [])
+        unlocked_chains = [c for c in chain_list if c.get("unlocked", False)]
+        return len(unlocked_chains)
     except Exception as e:
         logger.debug(f"获取角色{role_id}共鸣链失败: {e}")
         return -1
@@ -547,28 +540,18 @@ async def get_role_chain_count(uid: str, role_id: int) -> int:
 
 async def get_five_star_chain_total(uid: str) -> int:
     """计算五星角色的金数（0链=1金，6链=7金，即链数+1）"""
-    from ..utils.resource.RESOURCE_PATH import PLAYER_PATH
-
     try:
-        raw_data_path = Path(PLAYER_PATH / str(uid) / "rawData.json")
-        if not raw_data_path.exists():
+        role_details = await get_all_role_detail_info_list(str(uid))
+        if role_details is None:
             return 0
 
-        async with aiofiles.open(raw_data_path, mode="r", encoding="utf-8") as f:
-            raw_data = json.loads(await f.read())
-
         total_gold = 0
-        if isinstance(raw_data, list):
-            for role_data in raw_data:
-                role_id = role_data.get("role", {}).get("roleId")
-                if role_id:
-                    char_model = get_char_model(role_id)
-                    # 检查是否是五星角色
-                    if char_model and char_model.starLevel == 5:
-                        chain_list = role_data.get("chainList", [])
-                        unlocked_chains = [c for c in chain_list if c.get("unlocked", False)]
-                        # 金数 = 共鸣链数 + 1
-                        total_gold += len(unlocked_chains) + 1
+        for role_detail in role_details:
+            char_model = get_char_model(role_detail.role.roleId)
+            # 检查是否是五星角色
+            if char_model and char_model.starLevel == 5:
+                # 金数 = 共鸣链数 + 1
+                total_gold += role_detail.get_chain_num() + 1
         return total_gold
     except Exception as e:
         logger.debug(f"计算五星角色金数失败: {e}")
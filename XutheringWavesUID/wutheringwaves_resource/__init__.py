@@ -7,6 +7,7 @@ from gsuid_core.models import Event
 from gsuid_core.aps import scheduler
 from gsuid_core.logger import logger
 
+from .resource_job import resource_job
 from ..wutheringwaves_config import WutheringWavesConfig
 from ..utils.download_utils import copy_if_different, check_file_hash
 from ..utils.resource.download_all_resource import (
@@ -30,76 +31,97 @@ RESOURCE_DOWNLOAD_MINUTE = RESOURCE_DOWNLOAD_TIME[1]
 sv_download_config = SV("ww资源下载", pm=1)
 
 
+async def update_resource(source: str, soft: bool = True, force: bool = False) -> bool:
+    """下载并校验资源，返回构建文件是否有更新（需要重启）"""
+    resource_job.begin(source)
+    try:
+        resource_job.set_stage("下载资源")
+        await download_all_resource(force=force)
+
+        resource_job.set_stage("校验构建文件")
+        if await asyncio.to_thread(check_file_hash, BUILD_TEMP) or await asyncio.to_thread(
+            check_file_hash, MAP_BUILD_TEMP
+        ):
+            resource_job.set_stage("重新下载构建文件")
+            await download_all_resource()
+
+        resource_job.set_stage("比对构建文件")
+        build_updated = await asyncio.to_thread(copy_if_different, BUILD_TEMP, BUILD_PATH, "安全工具资源", soft)
+        map_updated = await asyncio.to_thread(copy_if_different, MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源", soft)
+
+        if not (build_updated or map_updated):
+            resource_job.set_stage("重新加载资源")
+            await reload_all_modules()
+    except BaseException as e:
+        resource_job.finish(e)
+        raise
+
+    resource_job.finish()
+    return build_updated or map_updated
+
+
 @sv_download_config.on_fullmatch(("强制下载全部资源", "下载全部资源", "补充资源", "刷新补充资源"))
 async def send_download_resource_msg(bot: Bot, ev: Event):
+    if resource_job.running:
+        return await bot.send(f"[鸣潮] 资源任务进行中: {resource_job.summary()}，请稍后再试！")
     await bot.send("[鸣潮] 正在开始下载~可能需要较久的时间！请勿重复执行！")
-    await download_all_resource(force="强制" in ev.raw_text)
-    
-    if check_file_hash(BUILD_TEMP) or check_file_hash(MAP_BUILD_TEMP):    
-        await download_all_resource()
-    
-    build_updated = copy_if_different(BUILD_TEMP, BUILD_PATH, "安全工具资源")
-    map_updated = copy_if_different(MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源")
-
-    if build_updated or map_updated:
+
+    if await update_resource("手动下载", soft=False, force="强制" in ev.raw_text):
         await bot.send("[鸣潮] 构建文件已更新，正在重启...")
         from gsuid_core.buildin_plugins.core_command.core_restart.restart import (
             restart_genshinuid,
         )
         await restart_genshinuid(event=ev, is_send=True)
     else:
-        await reload_all_modules()
         await bot.send("[鸣潮] 下载完成！")
 
 
-async def startup():
-    copy_if_different(BUILD_TEMP, BUILD_PATH, "安全工具资源")
-    copy_if_different(MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源")
+@sv_download_config.on_fullmatch(("资源状态", "资源下载状态"))
+async def send_resource_status_msg(bot: Bot, ev: Event):
+    await bot.send("\n".join(resource_job.describe()))
 
-    await reload_all_modules()  # 已有资源，先加载，不然检查资源列表太久了
-    logger.info("[鸣潮] 等待资源下载完成...")
-    await download_all_resource()
-    
-    logger.info("[鸣潮] 资源下载完成，开始校验...")
-    if check_file_hash(BUILD_TEMP) or check_file_hash(MAP_BUILD_TEMP):    
-        await download_all_resource()
-
-    build_updated = copy_if_different(BUILD_TEMP, BUILD_PATH, "安全工具资源", soft=True)
-    map_updated = copy_if_different(MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源", soft=True)
-    
-    if build_updated or map_updated:
-        logger.info("[鸣潮] 构建文件已更新，正在重启...")
+
+async def _update_and_restart(source: str):
+    try:
+        updated = await update_resource(source)
+    except Exception as e:
+        logger.exception(f"[鸣潮] {source}: 资源下载失败 {e}")
+        return
+    if updated:
+        logger.info(f"[鸣潮] {source}: 构建文件已更新，正在重启...")
         from gsuid_core.buildin_plugins.core_command.core_restart.restart import (
             restart_genshinuid,
         )
         await restart_genshinuid(is_send=False)
     else:
-        await reload_all_modules()
+        logger.info(f"[鸣潮] {source}: 资源下载完成")
 
-    logger.info("[鸣潮] 资源下载完成！完成启动！")
+
+async def startup():
+    copy_if_different(BUILD_TEMP, BUILD_PATH, "安全工具资源")
+    copy_if_different(MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源")
+
+    await reload_all_modules()  # 已有资源，先加载，不然检查资源列表太久了
+
+    if WutheringWavesConfig.get_config("StartupBackgroundResource").data:
+        # 先使用已有资源上线，下载和校验在后台进行
+        resource_job.start_background(_update_and_restart("启动"))
+        logger.info("[鸣潮] 资源将在后台下载，可使用 资源状态 查看进度")
+        return
+
+    logger.info("[鸣潮] 等待资源下载完成...")
+    await _update_and_restart("启动")
 
 
 async def auto_download_resource():
     delay_seconds = random.randint(0, 3600)
     if delay_seconds:
         await asyncio.sleep(delay_seconds)
+    if resource_job.running:
+        logger.info(f"[鸣潮] 定时任务: 资源任务进行中，跳过 {resource_job.summary()}")
+        return
     logger.info("[鸣潮] 定时任务: 开始下载全部资源...")
-    await download_all_resource()
-
-    if check_file_hash(BUILD_TEMP) or check_file_hash(MAP_BUILD_TEMP):    
-        await download_all_resource()
-
-    build_updated = copy_if_different(BUILD_TEMP, BUILD_PATH, "安全工具资源", soft=True)
-    map_updated = copy_if_different(MAP_BUILD_TEMP, MAP_BUILD_PATH, "伤害计算资源", soft=True)
-    if build_updated or map_updated:
-        logger.info("[鸣潮] 定时任务: 构建文件已更新，正在重启...")
-        from gsuid_core.buildin_plugins.core_command.core_restart.restart import (
-            restart_genshinuid,
-        )
-        await restart_genshinuid(is_send=False)
-    else:
-        await reload_all_modules()
-    logger.info("[鸣潮] 定时任务: 资源下载完成")
+    await _update_and_restart("定时任务")
 
 if 0 <= RESOURCE_DOWNLOAD_HOUR < 24 and 0 <= int(RESOURCE_DOWNLOAD_MINUTE) < 60:
     scheduler.add_job(
@@ -0,0 +1,84 @@
+import time
+import asyncio
+from typing import Any, List, Optional, Coroutine
+
+from gsuid_core.logger import logger
+
+from ..utils.resource import resource_sync
+
+
+class ResourceJob:
+    """资源下载任务状态
+
+    启动和定时任务中的资源下载、校验在后台进行，记录当前阶段和耗时，供状态命令查询。
+    """
+
+    def __init__(self):
+        self.source = ""
+        self.stage = "未开始"
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.started is not None and self.finished is None
+
+    def begin(self, source: str):
+        self.source = source
+        self.stage = "开始"
+        self.started = time.time()
+        self.finished = None
+        self.error = None
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+        logger.debug(f"[鸣潮] 资源任务({self.source}): {stage}")
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.finished = time.time()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+            self.stage = "失败"
+        else:
+            self.stage = "完成"
+
+    def start_background(self, coro: Coroutine[Any, Any, Any]) -> bool:
+        """在后台运行，已有任务进行中时返回 False"""
+        if self._task is not None and not self._task.done():
+            coro.close()
+            return False
+        self._task = asyncio.create_task(coro)
+        return True
+
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def summary(self) -> str:
+        if self.started is None:
+            return self.stage
+        return f"{self.source} {self.stage} {self.elapsed():.0f}s"
+
+    def describe(self) -> List[str]:
+        if self.started is None:
+            return ["[鸣潮] 资源任务尚未运行"]
+        lines = [
+            f"[鸣潮] 资源任务({self.source}): {self.stage}",
+            f"开始于 {time.strftime('%m-%d %H:%M:%S', time.localtime(self.started))}，耗时 {self.elapsed():.0f}s",
+        ]
+        if self.error:
+            lines.append(f"错误: {self.error}")
+        last_reports = resource_sync.last_reports
+        reports = [r for r in last_reports if r.files or r.failed]
+        if reports:
+            lines.append("最近一次下载:")
+            lines.extend(str(r) for r in reports)
+        elif last_reports:
+            lines.append(f"最近一次下载: 全部 {sum(r.skipped for r in last_reports)} 个文件均为最新")
+        return lines
+
+
+resource_job = ResourceJob()
@@ -1,12 +1,22 @@
 from gsuid_core.sv import SV
+from gsuid_core.aps import scheduler
 from gsuid_core.bot import Bot
 from gsuid_core.models import Event
 
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_103
 from .draw_waves_stamina import draw_stamina_img
-from ..utils.database.models import WavesBind
+from .stamina_push import (
+    MAX_STAMINA,
+    DEFAULT_THRESHOLD,
+    stamina_push,
+    is_roverreminder_loaded,
+)
+from ..utils.database.models import WavesBind, WavesStaminaRecord
+from ..wutheringwaves_config import WutheringWavesConfig
 
 waves_daily_info = SV("waves查询体力")
+# 命令与 roverreminder 插件的 开启/关闭体力推送、推送阈值 区分开
+waves_stamina_push = SV("waves体力提醒")
 
 
 @waves_daily_info.on_fullmatch(
@@ -25,3 +35,63 @@ async def send_daily_info_pic(bot: Bot, ev: Event):
     if not uid:
         return await bot.send(ERROR_CODE[WAVES_CODE_103])
     return await bot.send(await draw_stamina_img(bot, ev))
+
+
+async def check_stamina_push() -> str:
+    if is_roverreminder_loaded():
+        return "[鸣潮] 已安装 roverreminder 插件，请使用【开启体力推送】"
+    if not WutheringWavesConfig.get_config("StaminaPushOpen").data:
+        return "[鸣潮] 体力提醒功能未开启"
+    return ""
+
+
+@waves_stamina_push.on_prefix(("开启体力提醒", "体力提醒阈值"), block=True)
+async def open_stamina_push(bot: Bot, ev: Event):
+    if msg := await check_stamina_push():
+        return await bot.send(msg)
+    uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
+    if not uid:
+        return await bot.send(ERROR_CODE[WAVES_CODE_103])
+
+    text = ev.text.strip()
+    if text and (not text.isdigit() or not 1 <= int(text) <= MAX_STAMINA):
+        return await bot.send(f"[鸣潮] 体力阈值需为 1~{MAX_STAMINA} 的数字")
+    threshold = int(text) if text else None
+
+    await WavesStaminaRecord.set_stamina_push(
+        user_id=ev.user_id,
+        bot_id=ev.bot_id,
+        bot_self_id=ev.bot_self_id or "",
+        uid=uid,
+        switch="on",
+        threshold=threshold,
+    )
+    await stamina_push.reload()
+    sub = stamina_push.subs.get((ev.user_id, ev.bot_id, uid))
+    threshold = sub.threshold if sub else threshold or DEFAULT_THRESHOLD
+    return await bot.send(f"[鸣潮] 特征码 {uid} 已开启体力提醒，结晶波片达到 {threshold} 时私聊提醒")
+
+
+@waves_stamina_push.on_fullmatch("关闭体力提醒", block=True)
+async def close_stamina_push(bot: Bot, ev: Event):
+    if msg := await check_stamina_push():
+        return await bot.send(msg)
+    uid = await WavesBind.get_uid_by_game(ev.user_id, ev.bot_id)
+    if not uid:
+        return await bot.send(ERROR_CODE[WAVES_CODE_103])
+    await WavesStaminaRecord.set_stamina_push(
+        user_id=ev.user_id,
+        bot_id=ev.bot_id,
+        bot_self_id=ev.bot_self_id or "",
+        uid=uid,
+        switch="off",
+    )
+    await stamina_push.reload()
+    return await bot.send(f"[鸣潮] 特征码 {uid} 已关闭体力提醒")
+
+
+@scheduler.scheduled_job("interval", minutes=1)
+async def stamina_push_tick():
+    if not WutheringWavesConfig.get_config("StaminaPushOpen").data or is_roverreminder_loaded():
+        return
+    await stamina_push.tick()
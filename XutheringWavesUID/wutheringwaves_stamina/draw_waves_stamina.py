@@ -1,6 +1,6 @@
 import time
 import asyncio
-from typing import Dict
+from typing import Dict, Optional
 from pathlib import Path
 from datetime import datetime, timedelta
 
@@ -30,6 +30,8 @@ from ..utils.waves_api import waves_api
 from ..utils.error_reply import ERROR_CODE, WAVES_CODE_102, WAVES_CODE_103
 from ..utils.name_convert import char_name_to_char_id
 from ..utils.database.models import WavesBind, WavesUser, WavesStaminaRecord
+from .stamina_push import stamina_push
+from ..utils.fetch_planner import FetchPlanner
 from ..utils.api.request_util import KuroApiResp
 from ..utils.fonts.waves_fonts import (
     waves_font_24,
@@ -65,8 +67,8 @@ async def seconds2hours(seconds: int) -> str:
     return "%02d小时%02d分" % (h, m)
 
 
-async def process_uid(uid, ev):
-    ck = await waves_api.get_self_waves_ck(uid, ev.user_id, ev.bot_id)
+async def process_uid(uid, ev, plan: FetchPlanner):
+    ck = await plan.get_ck(uid)
     if not ck:
         try:
             await WavesStaminaRecord.update_ck_valid(
@@ -80,20 +82,25 @@ async def process_uid(uid, ev):
             logger.exception("[鸣潮][每日信息]体力记录CK有效状态更新失败")
         return None
 
-    # 并行请求所有相关 API
+    # 并行请求所有相关 API，立绘选择需要的角色详情一起请求
     results = await asyncio.gather(
-        waves_api.get_daily_info(uid, ck),
-        waves_api.get_base_info(uid, ck),
+        plan.call(waves_api.get_daily_info, uid, ck),
+        plan.call(waves_api.get_base_info, uid, ck),
+        _get_pile_setting(uid, ev, ck, plan),
         return_exceptions=True,
     )
 
-    (daily_info_res, account_info_res) = results
+    (daily_info_res, account_info_res, pile_setting) = results
     if not isinstance(daily_info_res, KuroApiResp) or not daily_info_res.success:
         return None
 
     if not isinstance(account_info_res, KuroApiResp) or not account_info_res.success:
         return None
 
+    if isinstance(pile_setting, BaseException):
+        logger.warning(f"[鸣潮][每日信息]获取体力背景设置失败: {pile_setting}")
+        pile_setting = {}
+
     daily_info = DailyData.model_validate(daily_info_res.data)
     account_info = AccountBaseInfo.model_validate(account_info_res.data)
 
@@ -108,12 +115,59 @@ async def process_uid(uid, ev):
             mr_value=mr_value,
             is_ck_valid=True,
         )
+        if mr_value is not None:
+            stamina_push.observe(ev.user_id, ev.bot_id, uid, mr_value)
     except Exception:
         logger.exception("[鸣潮][每日信息]体力查询记录写入失败")
 
     return {
         "daily_info": daily_info,
         "account_info": account_info,
+        **pile_setting,
+    }
+
+
+async def _get_pile_setting(uid: str, ev: Event, ck: str, plan: FetchPlanner) -> Dict:
+    """用户的体力背景设置，主角的多个形态同时请求角色详情"""
+    user = await WavesUser.get_user_by_attr(ev.user_id, ev.bot_id, "uid", uid, game_id=WAVES_GAME_ID)
+    if not user or not user.stamina_bg_value:
+        return {}
+
+    logger.debug(f"[鸣潮][每日信息]使用自定义体力背景设置: {user.stamina_bg_value}")
+    stamina_bg_value = (
+        user.stamina_bg_value.replace("背景", "").replace("立绘", "").replace("官方", "").replace("图", "").strip()
+    )
+    char_id = char_name_to_char_id(stamina_bg_value)
+    pile_id = None
+    if char_id in SPECIAL_CHAR:
+        char_ids = SPECIAL_CHAR[char_id]
+        details = await asyncio.gather(
+            *(plan.call(waves_api.get_role_detail_info, i, uid, ck) for i in char_ids),
+            return_exceptions=True,
+        )
+        # 按 SPECIAL_CHAR 中的顺序取第一个已拥有的形态
+        for char_id, role_detail_info in zip(char_ids, details):
+            if not isinstance(role_detail_info, KuroApiResp) or not role_detail_info.success:
+                continue
+            role_detail_info = role_detail_info.data
+            if (
+                not isinstance(role_detail_info, Dict)
+                or "role" not in role_detail_info
+                or role_detail_info["role"] is None
+                or "level" not in role_detail_info
+                or role_detail_info["level"] is None
+            ):
+                continue
+            pile_id = char_id
+            break
+    else:
+        pile_id = char_id
+
+    return {
+        "pile_id": pile_id,
+        "force_use_bg": "背景" in user.stamina_bg_value,
+        "force_not_use_bg": "立绘" in user.stamina_bg_value,
+        "force_not_use_custom": "官方" in user.stamina_bg_value,
     }
 
 
@@ -123,22 +177,21 @@ async def draw_stamina_img(bot: Bot, ev: Event):
         logger.info(f"[鸣潮][每日信息]UID: {uid_list}")
         if uid_list is None:
             return ERROR_CODE[WAVES_CODE_103]
-        # 进行校验UID是否绑定CK
-        tasks = [process_uid(uid, ev) for uid in uid_list]
+
+        # 所有 UID 的请求同时开始，每个 UID 数据就绪后立即绘制
+        plan = FetchPlanner(ev.user_id, ev.bot_id)
+        tasks = [_draw_uid_stamina_img(uid, ev, plan) for uid in uid_list]
         results = await asyncio.gather(*tasks)
 
         # 过滤掉 None 值
-        valid_daily_list = [res for res in results if res is not None]
+        stamina_imgs = [res for res in results if res is not None]
 
-        if len(valid_daily_list) == 0:
+        if len(stamina_imgs) == 0:
             return ERROR_CODE[WAVES_CODE_102]
 
-        # 开始绘图任务
-        task = []
-        img = Image.new("RGBA", (based_w, based_h * len(valid_daily_list)), (0, 0, 0, 0))
-        for uid_index, valid in enumerate(valid_daily_list):
-            task.append(_draw_all_stamina_img(ev, img, valid, uid_index))
-        await asyncio.gather(*task)
+        img = Image.new("RGBA", (based_w, based_h * len(stamina_imgs)), (0, 0, 0, 0))
+        for uid_index, stamina_img in enumerate(stamina_imgs):
+            img.paste(stamina_img, (0, based_h * uid_index), stamina_img)
         res = await convert_img(img)
         logger.info("[鸣潮][每日信息]绘图已完成,等待发送!")
     except TypeError:
@@ -148,13 +201,16 @@ async def draw_stamina_img(bot: Bot, ev: Event):
     return res
 
 
-async def _draw_all_stamina_img(ev: Event, img: Image.Image, valid: Dict, index: int):
-    stamina_img = await _draw_stamina_img(ev, valid)
-    stamina_img = stamina_img.convert("RGBA")
-    img.paste(stamina_img, (0, based_h * index), stamina_img)
+async def _draw_uid_stamina_img(uid: str, ev: Event, plan: FetchPlanner) -> Optional[Image.Image]:
+    # 进行校验UID是否绑定CK
+    valid = await process_uid(uid, ev, plan)
+    if valid is None:
+        return None
+    stamina_img = await _draw_stamina_img(ev, valid, plan)
+    return stamina_img.convert("RGBA")
 
 
-async def _draw_stamina_img(ev: Event, valid: Dict) -> Image.Image:
+async def _draw_stamina_img(ev: Event, valid: Dict, plan: FetchPlanner) -> Image.Image:
     """准备数据并调用绘制函数"""
     daily_info: DailyData = valid["daily_info"]
     account_info: AccountBaseInfo = valid["account_info"]
@@ -181,45 +237,14 @@ async def _draw_stamina_img(ev: Event, valid: Dict) -> Image.Image:
     base_info_bg = Image.open(TEXT_PATH / "base_info_bg.png")
     avatar_ring = Image.open(TEXT_PATH / "avatar_ring.png")
 
-    # 头像
-    avatar = await get_event_avatar(ev)
+    # 头像，多个 UID 共用
+    avatar = await plan.shared("avatar", get_event_avatar, ev)
 
     # 随机获得pile
-    user = await WavesUser.get_user_by_attr(ev.user_id, ev.bot_id, "uid", daily_info.roleId, game_id=WAVES_GAME_ID)
-    pile_id = None
-    force_use_bg = False
-    force_not_use_bg = False
-    force_not_use_custom = False
-
-    if user and user.stamina_bg_value:
-        logger.debug(f"[鸣潮][每日信息]使用自定义体力背景设置: {user.stamina_bg_value}")
-        force_use_bg = "背景" in user.stamina_bg_value
-        force_not_use_bg = "立绘" in user.stamina_bg_value
-        force_not_use_custom = "官方" in user.stamina_bg_value
-        stamina_bg_value = (
-            user.stamina_bg_value.replace("背景", "").replace("立绘", "").replace("官方", "").replace("图", "").strip()
-        )
-        char_id = char_name_to_char_id(stamina_bg_value)
-        if char_id in SPECIAL_CHAR:
-            ck = await waves_api.get_self_waves_ck(daily_info.roleId, ev.user_id, ev.bot_id)
-            if ck:
-                for char_id in SPECIAL_CHAR[char_id]:
-                    role_detail_info = await waves_api.get_role_detail_info(char_id, daily_info.roleId, ck)
-                    if not role_detail_info.success:
-                        continue
-                    role_detail_info = role_detail_info.data
-                    if (
-                        not isinstance(role_detail_info, Dict)
-                        or "role" not in role_detail_info
-                        or role_detail_info["role"] is None
-                        or "level" not in role_detail_info
-                        or role_detail_info["level"] is None
-                    ):
-                        continue
-                    pile_id = char_id
-                    break
-        else:
-            pile_id = char_id
+    pile_id = valid.get("pile_id")
+    force_use_bg = valid.get("force_use_bg", False)
+    force_not_use_bg = valid.get("force_not_use_bg", False)
+    force_not_use_custom = valid.get("force_not_use_custom", False)
 
     logger.debug(f"[鸣潮][每日信息]使用立绘ID: {pile_id}, 强制使用背景: {force_use_bg}, 强制不使用背景: {force_not_use_bg}")
     if force_use_bg:
@@ -261,7 +286,7 @@ async def _draw_stamina_img(ev: Event, valid: Dict) -> Image.Image:
         info=info,
         base_info_bg=base_info_bg,
         avatar_ring=avatar_ring,
-        avatar=await draw_pic_with_ring(ev),
+        avatar=await plan.shared("avatar_ring", draw_pic_with_ring, ev),
         pile=pile,
         has_bg=has_bg,
         daily_info=daily_info,
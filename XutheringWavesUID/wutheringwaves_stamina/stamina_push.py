@@ -0,0 +1,277 @@
+import sys
+import time
+import heapq
+import random
+import asyncio
+from typing import Dict, List, Tuple, Optional
+
+from gsuid_core.gss import gss
+from gsuid_core.logger import logger
+
+from ..utils.waves_api import waves_api
+from ..utils.api.model import DailyData
+from ..utils.api.request_util import KuroApiResp
+from ..utils.database.models import WavesStaminaRecord
+from ..wutheringwaves_config import WutheringWavesConfig
+
+# 结晶波片每 6 分钟恢复 1 点
+REGEN_SECONDS = 6 * 60
+MAX_STAMINA = 240
+DEFAULT_THRESHOLD = 200
+# 预计到达阈值后再等待一会儿查询，避免恢复时间的误差导致提前查询
+POLL_MARGIN = 60
+# 已推送且体力还未消耗时，再次确认的间隔
+RECHECK_SECONDS = 6 * 3600
+# 查询失败后的重试间隔
+RETRY_SECONDS = 30 * 60
+# 从数据库同步订阅的间隔
+RELOAD_SECONDS = 10 * 60
+# 启动时到期的订阅在该时间内分散查询
+STARTUP_SPREAD = 5 * 60
+
+# (user_id, bot_id, uid)
+SubKey = Tuple[str, str, str]
+
+
+def is_roverreminder_loaded() -> bool:
+    """外部插件 roverreminder 已加载时体力推送由它负责，本插件不查询也不推送"""
+    try:
+        from gsuid_core.sv import SL
+
+        if any(name.lower() == "roverreminder" for name in getattr(SL, "plugins", {})):
+            return True
+    except Exception:
+        pass
+    return any(name.rsplit(".", 1)[-1].lower() == "roverreminder" for name in list(sys.modules))
+
+
+class StaminaSub:
+    """单个 UID 的推送订阅和最近一次已知的体力"""
+
+    __slots__ = (
+        "user_id",
+        "bot_id",
+        "bot_self_id",
+        "uid",
+        "threshold",
+        "mr_value",
+        "mr_query_time",
+        "pushed",
+        "due",
+    )
+
+    def __init__(self, record: WavesStaminaRecord):
+        self.user_id = record.user_id
+        self.bot_id = record.bot_id
+        self.bot_self_id = record.bot_self_id or ""
+        self.uid = record.uid
+        self.threshold = clamp_threshold(record.stamina_threshold)
+        self.mr_value: Optional[int] = record.mr_value
+        self.mr_query_time: Optional[int] = record.mr_query_time
+        self.pushed = False
+        self.due: Optional[float] = None
+
+    @property
+    def key(self) -> SubKey:
+        return self.user_id, self.bot_id, self.uid
+
+
+def clamp_threshold(threshold: Optional[int]) -> int:
+    if not threshold:
+        return DEFAULT_THRESHOLD
+    return max(1, min(int(threshold), MAX_STAMINA))
+
+
+class StaminaPushScheduler:
+    """体力推送调度
+
+    根据最近一次查询到的结晶波片和恢复速度预测每个订阅到达阈值的时间，按时间放入最小堆。
+    定时任务每次只取出已到期的订阅查询 get_daily_info：到达阈值则推送，未到达则按新的体力
+    重新预测。用户手动查询体力时同步更新预测，不额外请求接口。
+    每个 UID 每次体力恢复周期通常只需要一到两次查询，每次查询包括 get_self_waves_ck
+    的登录校验和刷新，共 3 次请求。
+    """
+
+    def __init__(self):
+        self.subs: Dict[SubKey, StaminaSub] = {}
+        # (到期时间, 序号, key)，订阅的 due 与堆中的时间不一致时该项已失效
+        self._heap: List[Tuple[float, int, SubKey]] = []
+        self._seq = 0
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.polls = 0
+        self.pushes = 0
+        self.failures = 0
+
+    # 预测
+
+    def _schedule(self, sub: StaminaSub, due: float):
+        sub.due = due
+        self._seq += 1
+        heapq.heappush(self._heap, (due, self._seq, sub.key))
+
+    def predict(self, sub: StaminaSub, now: float) -> float:
+        """下一次需要查询的时间"""
+        if sub.mr_value is None or sub.mr_query_time is None:
+            return now
+        if sub.pushed:
+            return max(now, sub.mr_query_time + RECHECK_SECONDS)
+        if sub.mr_value >= sub.threshold:
+            return now
+        return sub.mr_query_time + (sub.threshold - sub.mr_value) * REGEN_SECONDS + POLL_MARGIN
+
+    def observe(self, user_id: str, bot_id: str, uid: str, cur: int, query_time: Optional[int] = None):
+        """用户手动查询体力后更新预测"""
+        sub = self.subs.get((user_id, bot_id, uid))
+        if sub is None:
+            return
+        now = time.time()
+        sub.mr_value = cur
+        sub.mr_query_time = query_time or int(now)
+        # 用户已经看到了当前体力，不再推送本轮
+        sub.pushed = cur >= sub.threshold
+        if sub.due is not None:
+            self._schedule(sub, self.predict(sub, now))
+
+    # 订阅
+
+    async def reload(self):
+        """与数据库中的订阅同步"""
+        records = await WavesStaminaRecord.get_stamina_push_records()
+        now = time.time()
+        first = not self._loaded_at
+        seen = set()
+        for record in records:
+            key = (record.user_id, record.bot_id, record.uid)
+            seen.add(key)
+            sub = self.subs.get(key)
+            if sub is None:
+                sub = self.subs[key] = StaminaSub(record)
+                due = self.predict(sub, now)
+                if first and due <= now:
+                    due = now + random.uniform(0, STARTUP_SPREAD)
+                self._schedule(sub, due)
+                continue
+            sub.bot_self_id = record.bot_self_id or ""
+            threshold = clamp_threshold(record.stamina_threshold)
+            if threshold != sub.threshold:
+                sub.threshold = threshold
+                sub.pushed = False
+                if sub.due is not None:
+                    self._schedule(sub, self.predict(sub, now))
+
+        for key in [k for k in self.subs if k not in seen]:
+            del self.subs[key]
+        self._loaded_at = now
+        if first:
+            logger.info(f"[鸣潮] 体力推送订阅 {len(self.subs)} 个")
+
+    def _pop_due(self, now: float) -> List[StaminaSub]:
+        due: List[StaminaSub] = []
+        while self._heap and self._heap[0][0] <= now:
+            when, _, key = heapq.heappop(self._heap)
+            sub = self.subs.get(key)
+            if sub is None or sub.due != when:
+                continue
+            sub.due = None
+            due.append(sub)
+        return due
+
+    # 查询和推送
+
+    async def _poll(self, sub: StaminaSub):
+        ck = await waves_api.get_self_waves_ck(sub.uid, sub.user_id, sub.bot_id)
+        if not ck:
+            await WavesStaminaRecord.update_ck_valid(
+                user_id=sub.user_id,
+                bot_id=sub.bot_id,
+                bot_self_id=sub.bot_self_id,
+                uid=sub.uid,
+                is_ck_valid=False,
+            )
+            # CK 重新有效后由 reload 重新加入
+            self.subs.pop(sub.key, None)
+            return
+
+        res = await waves_api.get_daily_info(sub.uid, ck)
+        self.polls += 1
+        if not isinstance(res, KuroApiResp) or not res.success:
+            self.failures += 1
+            self._schedule(sub, time.time() + RETRY_SECONDS)
+            return
+
+        energy = DailyData.model_validate(res.data).energyData
+        now = int(time.time())
+        sub.mr_value = energy.cur
+        sub.mr_query_time = now
+        await WavesStaminaRecord.upsert_stamina_query(
+            user_id=sub.user_id,
+            bot_id=sub.bot_id,
+            bot_self_id=sub.bot_self_id,
+            uid=sub.uid,
+            mr_query_time=now,
+            mr_value=energy.cur,
+            is_ck_valid=True,
+        )
+
+        if energy.cur >= min(sub.threshold, energy.total):
+            if not sub.pushed:
+                await self._push(sub, energy.cur, energy.total)
+                sub.pushed = True
+        else:
+            sub.pushed = False
+        self._schedule(sub, self.predict(sub, now))
+
+    async def _push(self, sub: StaminaSub, cur: int, total: int):
+        msg = f"[鸣潮] 特征码 {sub.uid} 的结晶波片已恢复至 {cur}/{total}，请及时使用"
+        for bot_id in gss.active_bot:
+            await gss.active_bot[bot_id].target_send(
+                msg,
+                "direct",
+                sub.user_id,
+                sub.bot_id,
+                sub.bot_self_id,
+                "",
+            )
+            self.pushes += 1
+            break
+
+    async def tick(self):
+        if self._lock.locked():
+            return
+        async with self._lock:
+            now = time.time()
+            if now - self._loaded_at >= RELOAD_SECONDS:
+                await self.reload()
+
+            due = self._pop_due(now)
+            if not due:
+                return
+
+            sem = asyncio.Semaphore(max(1, WutheringWavesConfig.get_config("StaminaPushConcurrency").data))
+
+            async def run(sub: StaminaSub):
+                async with sem:
+                    try:
+                        await self._poll(sub)
+                    except Exception as e:
+                        self.failures += 1
+                        logger.warning(f"[鸣潮] 体力推送查询失败 {sub.uid}: {e}")
+                        if sub.key in self.subs and sub.due is None:
+                            self._schedule(sub, time.time() + RETRY_SECONDS)
+
+            await asyncio.gather(*(run(sub) for sub in due))
+
+    def stats(self) -> Dict[str, float]:
+        next_due = min((sub.due for sub in self.subs.values() if sub.due is not None), default=None)
+        return {
+            "subs": len(self.subs),
+            "polls": self.polls,
+            "pushes": self.pushes,
+            "failures": self.failures,
+            "next_in": max(0.0, next_due - time.time()) if next_due is not None else -1,
+        }
+
+
+stamina_push = StaminaPushScheduler()
@@ -1,16 +1,36 @@
+import time
+
+from gsuid_core.aps import scheduler
 from gsuid_core.logger import logger
-from gsuid_core.server import on_core_start
+from gsuid_core.server import on_core_start, on_core_shutdown
 
 from ..wutheringwaves_resource import startup
+from ..utils.api.http_pool import http_pool
+from ..wutheringwaves_config import WutheringWavesConfig
+from ..utils.database.waves_user_activity import activity_buffer
+
+activity_flush_interval: int = max(1, WutheringWavesConfig.get_config("ActivityFlushInterval").data)
 
 
 @on_core_start
 async def all_start():
     logger.info("[鸣潮] 启动中...")
+    start = time.perf_counter()
     try:
         await startup()
 
     except Exception as e:
         logger.exception(e)
 
-    logger.success("[鸣潮] 启动完成✅")
+    logger.success(f"[鸣潮] 启动完成✅ 耗时{time.perf_counter() - start:.1f}s")
+
+
+@scheduler.scheduled_job("interval", seconds=activity_flush_interval)
+async def flush_user_activity():
+    await activity_buffer.flush()
+
+
+@on_core_shutdown
+async def all_shutdown():
+    await activity_buffer.flush()
+    await http_pool.close()
@@ -1,8 +1,16 @@
 from gsuid_core.status.plugin_status import register_status
 
 from ..utils.image import get_ICON
+from ..utils.util import ttl_cache_stats
+from ..utils.queues.queues import dispatcher
+from ..utils.api.http_pool import http_pool
+from ..utils.render_utils import page_pool
+from ..utils.card_cache import card_cache
+from ..utils.char_info_utils import role_detail_cache
 from ..utils.database.models import WavesBind, WavesUser
 from ..wutheringwaves_config import WutheringWavesConfig
+from ..wutheringwaves_resource.resource_job import resource_job
+from ..wutheringwaves_stamina.stamina_push import stamina_push
 
 
 async def get_user_num():
@@ -21,6 +29,68 @@ async def get_active_user_num():
     return count
 
 
+async def get_panel_cache_hit_rate():
+    stats = role_detail_cache.stats()
+    return f"{stats['hit_rate'] * 100:.1f}% ({stats['hits']}/{stats['hits'] + stats['misses']})"
+
+
+async def get_panel_cache_size():
+    stats = role_detail_cache.stats()
+    return f"{stats['size']} ({stats['bytes'] / 1024 / 1024:.1f}MB)"
+
+
+async def get_http_pool_stats():
+    stats = http_pool.stats()
+    return " | ".join(
+        f"{name} 新建{s['opened']} 复用{s['reused']} ({s['reuse_rate'] * 100:.1f}%)" for name, s in stats.items()
+    )
+
+
+async def get_dispatcher_stats():
+    stats = dispatcher.get_stats()
+    types = stats["types"].values()
+    dropped = sum(t["dropped"] for t in types)
+    failed = sum(t["failed"] for t in types)
+    wait_max = max((t["wait_max"] for t in types), default=0.0)
+    pending = sum(b["pending"] for b in stats["batchers"].values())
+    return f"队列{stats['depth']} 待上传{pending} 丢弃{dropped} 失败{failed} 最长等待{wait_max:.1f}s"
+
+
+async def get_render_stats():
+    stats = page_pool.stats()
+    return (
+        f"{stats['renders']}次 等待{stats['wait_avg'] * 1000:.0f}ms "
+        f"渲染{stats['render_avg'] * 1000:.0f}ms (最长{stats['render_max']:.1f}s)"
+    )
+
+
+async def get_card_cache_stats():
+    stats = card_cache.stats()
+    hits = stats["mem_hits"] + stats["disk_hits"]
+    return (
+        f"{stats['hit_rate'] * 100:.1f}% ({hits}/{hits + stats['misses']}) "
+        f"内存{stats['mem_bytes'] / 1024 / 1024:.1f}MB 磁盘{stats['disk_bytes'] / 1024 / 1024:.1f}MB"
+    )
+
+
+async def get_resource_job_stats():
+    return resource_job.summary()
+
+
+async def get_stamina_push_stats():
+    stats = stamina_push.stats()
+    next_in = f"{stats['next_in'] / 60:.0f}分钟后" if stats["next_in"] >= 0 else "无"
+    return f"订阅{stats['subs']} 查询{stats['polls']} 推送{stats['pushes']} 失败{stats['failures']} 下次查询{next_in}"
+
+
+async def get_api_cache_stats():
+    stats = ttl_cache_stats()
+    total = stats["hits"] + stats["coalesced"] + stats["misses"]
+    saved = stats["hits"] + stats["coalesced"]
+    rate = saved / total if total else 0.0
+    return f"{rate * 100:.1f}% ({saved}/{total}) 合并{stats['coalesced']} 缓存{stats['size']}"
+
+
 register_status(
     get_ICON(),
     "XutheringWavesUID",
@@ -28,5 +98,14 @@ register_status(
         "绑定UID": get_add_num,
         "登录账号": get_user_num,
         "活跃账号数": get_active_user_num,
+        "面板缓存命中率": get_panel_cache_hit_rate,
+        "面板缓存占用": get_panel_cache_size,
+        "HTTP连接复用": get_http_pool_stats,
+        "后台任务": get_dispatcher_stats,
+        "HTML渲染": get_render_stats,
+        "卡片缓存": get_card_cache_stats,
+        "资源任务": get_resource_job_stats,
+        "接口缓存": get_api_cache_stats,
+        "内置体力提醒": get_stamina_push_stats,
     },
 )
@@ -21,6 +21,7 @@ from ..utils.image import (
     get_square_weapon,
     get_random_share_bg,
 )
+from ..utils.api.http_pool import http_pool
 from ..utils.api.wwapi import GET_POOL_LIST
 from ..utils.name_convert import easy_id_to_name
 from ..utils.fonts.waves_fonts import waves_font_30, waves_font_58
@@ -32,19 +33,19 @@ avatar_mask = Image.open(TEXT_PATH / "avatar_mask.png")
 
 @timed_async_cache(expiration=3600, condition=lambda x: isinstance(x, list))
 async def get_pool_data() -> Union[List, None]:
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(
-                GET_POOL_LIST,
-                headers={
-                    "Content-Type": "application/json",
-                },
-                timeout=httpx.Timeout(10),
-            )
-            if res.status_code == 200:
-                return res.json().get("data", [])
-        except Exception as e:
-            logger.exception(f"获取卡池数据失败: {e}")
+    client = http_pool.get_httpx_client()
+    try:
+        res = await client.get(
+            GET_POOL_LIST,
+            headers={
+                "Content-Type": "application/json",
+            },
+            timeout=httpx.Timeout(10),
+        )
+        if res.status_code == 200:
+            return res.json().get("data", [])
+    except Exception as e:
+        logger.exception(f"获取卡池数据失败: {e}")
 
 
 async def clean_pool_data():
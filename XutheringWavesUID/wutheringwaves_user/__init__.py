@@ -189,13 +189,15 @@ async def waves_delete_inactive_group_members(bot: Bot, ev: Event):
     if not uid_to_user_pairs:
         return await bot.send(f"[鸣潮] 群【{ev.group_id}】暂无绑定记录")
 
+    active_times = await WavesUserActivity.get_last_active_times(
+        {(user_id, platform, bot_self_id) for user_pairs in uid_to_user_pairs.values() for user_id, platform in user_pairs}
+    )
+
     inactive_uids: set[str] = set()
     for uid, user_pairs in uid_to_user_pairs.items():
         latest_time = None
         for user_id, platform in user_pairs:
-            last_active_time = await WavesUserActivity.get_user_last_active_time(
-                user_id, platform, bot_self_id
-            )
+            last_active_time = active_times.get((user_id, platform, bot_self_id))
             if last_active_time is not None:
                 if latest_time is None or last_active_time > latest_time:
                     latest_time = last_active_time
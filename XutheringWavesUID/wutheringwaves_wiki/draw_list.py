@@ -17,8 +17,8 @@ from ..utils.image import (
 )
 from ..utils.resource.constant import WEAPON_TYPE_ID_MAP
 from ..wutheringwaves_config import PREFIX
-from ..utils.ascension.sonata import sonata_id_data
-from ..utils.ascension.weapon import weapon_id_data
+from ..utils.ascension.sonata import sonata_id_data, ensure_data_loaded as ensure_sonata_loaded
+from ..utils.ascension.weapon import weapon_id_data, ensure_data_loaded as ensure_weapon_loaded
 from ..utils.fonts.waves_fonts import waves_font_16, waves_font_18, waves_font_24
 from .other_wiki_render import draw_weapon_list_render, draw_sonata_list_render
 
@@ -54,6 +54,7 @@ async def draw_weapon_list(weapon_type: str):
 async def _draw_weapon_list_pil(weapon_type: str):
     """武器列表 - PIL绘制"""
     # 确保数据已加载
+    ensure_weapon_loaded()
     if not weapon_id_data:
         return "[鸣潮][武器列表]暂无数据"
 
@@ -213,6 +214,7 @@ async def draw_sonata_list(version: str = ""):
 
 async def _draw_sonata_list_pil(version: str = ""):
     """声骸套装列表 - PIL绘制"""
+    ensure_sonata_loaded()
     if not sonata_id_data:
         return "[鸣潮][套装列表]暂无数据"
 
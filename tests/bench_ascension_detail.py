@@ -0,0 +1,64 @@
+"""get_weapon_detail / get_char_detail 基准：每次重新计算 与 按参数缓存
+
+用法：python tests/bench_ascension_detail.py [面板数]
+按排行刷新的访问方式，为每个面板查询一次角色和武器数据，参数组合从已下载的资源中随机选取。
+需要完整的 gsuid_core 运行环境和已下载的资源。
+"""
+
+import sys
+import time
+import random
+
+from conftest import import_plugin
+
+weapon = import_plugin("utils.ascension.weapon")
+char = import_plugin("utils.ascension.char")
+
+# 面板中常见的等级和突破
+LEVELS = [(70, 4), (80, 5), (90, 6)]
+
+
+def make_panels(count: int):
+    rng = random.Random(0)
+    char_ids = char.char_id_data.keys()
+    weapon_ids = weapon.weapon_id_data.keys()
+    return [
+        (
+            rng.choice(char_ids),
+            *rng.choice(LEVELS),
+            rng.choice(weapon_ids),
+            *rng.choice(LEVELS),
+            rng.randint(1, 5),
+        )
+        for _ in range(count)
+    ]
+
+
+def run(panels, get_char, get_weapon) -> float:
+    start = time.perf_counter()
+    for char_id, level, breach, weapon_id, w_level, w_breach, reson in panels:
+        get_char(char_id, level, breach)
+        get_weapon(weapon_id, w_level, w_breach, reson)
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    # 先读取全部数据，只比较计算部分
+    panels = make_panels(count)
+    run(panels, char._build_char_detail, weapon._build_weapon_detail)
+    combos = len({(p[0], p[1], p[2]) for p in panels}) + len({p[3:] for p in panels})
+
+    uncached = run(panels, char._build_char_detail, weapon._build_weapon_detail)
+    char._cached_char_detail.cache_clear()
+    weapon._cached_weapon_detail.cache_clear()
+    first = run(panels, char.get_char_detail, weapon.get_weapon_detail)
+    steady = run(panels, char.get_char_detail, weapon.get_weapon_detail)
+
+    print(f"{count} panels, {combos} distinct char/weapon combos")
+    print(f"uncached:            {uncached * 1000:8.2f}ms")
+    print(f"cached, first run:   {first * 1000:8.2f}ms")
+    print(f"cached, steady:      {steady * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,159 @@
+"""伤害计算前复制面板数据的基准：copy.deepcopy 与 snapshot.fork
+
+用法：python tests/bench_damage_fork.py [伤害条数 ...]
+DamageAttribute 来自下载的计算模块，这里用结构相近的对象代替（约 30 项属性、8 条效果、
+加成字典和敌人对象）；RoleDetailData 使用 5 个声骸的完整面板。
+每张卡片复制一次 RoleDetailData，每条伤害复制一次 DamageAttribute。
+"""
+
+import sys
+import copy
+import time
+
+from conftest import load_module
+
+snapshot = load_module("utils/damage/snapshot.py")
+RoleDetailData = load_module("utils/api/model.py", "_test_api_model").RoleDetailData
+
+LOOPS = 200
+
+
+class Enemy:
+    def __init__(self):
+        self.level = 90
+        self.resistance = {"冷凝": 0.1, "热熔": 0.1, "导电": 0.1, "气动": 0.1, "衍射": 0.1, "湮灭": 0.1}
+        self.defense = 1512.0
+
+
+class Attribute:
+    def __init__(self):
+        for i in range(30):
+            setattr(self, f"stat_{i}", float(i))
+        self.char_attr = "冷凝"
+        self.char_template = "temp_atk"
+        self.effect = [(f"效果{i}", f"+{i}%") for i in range(8)]
+        self.dmg_bonus = {f"bonus_{i}": 0.1 * i for i in range(12)}
+        self.skill_bonus = {"attack": {"atk": 0.1}, "hit": {"crit": 0.05}}
+        self.env_spectro = False
+        self.enemy = Enemy()
+        self.sync_strike = None
+
+
+def props(prefix: str, count: int):
+    return [{"attributeName": f"{prefix}{i}", "attributeValue": f"{i}.0%"} for i in range(count)]
+
+
+def role_detail() -> RoleDetailData:
+    phantom = {
+        "phantomProp": {
+            "phantomPropId": 390080005,
+            "name": "无常凶鹭",
+            "phantomId": 390080005,
+            "quality": 5,
+            "cost": 4,
+            "iconUrl": "https://example.invalid/icon.png",
+            "skillDescription": "描述" * 20,
+        },
+        "cost": 4,
+        "quality": 5,
+        "level": 25,
+        "fetterDetail": {
+            "groupId": 8,
+            "name": "浮星祛暝",
+            "iconUrl": None,
+            "num": 5,
+            "firstDescription": "描述" * 10,
+            "secondDescription": "描述" * 20,
+        },
+        "mainProps": props("主属性", 2),
+        "subProps": props("副属性", 5),
+    }
+    return RoleDetailData.model_validate(
+        {
+            "role": {
+                "roleId": 1205,
+                "level": 90,
+                "breach": 6,
+                "roleName": "长离",
+                "starLevel": 5,
+                "attributeId": 2,
+                "weaponTypeId": 2,
+                "roleSkin": {"skinId": 1, "skinName": "默认"},
+            },
+            "level": 90,
+            "chainList": [
+                {"name": f"链{i}", "order": i, "description": "描述" * 30, "iconUrl": None, "unlocked": i < 2}
+                for i in range(1, 7)
+            ],
+            "weaponData": {
+                "weapon": {
+                    "weaponId": 21020015,
+                    "weaponName": "赫奕流明",
+                    "weaponType": 2,
+                    "weaponStarLevel": 5,
+                    "weaponIcon": None,
+                    "weaponEffectName": None,
+                },
+                "level": 90,
+                "breach": 6,
+                "resonLevel": 1,
+            },
+            "phantomData": {"cost": 12, "equipPhantomList": [phantom] * 5},
+            "skillList": [
+                {
+                    "skill": {"id": i, "type": "常态攻击", "name": f"技能{i}", "description": "描述" * 40, "iconUrl": ""},
+                    "level": 10,
+                }
+                for i in range(8)
+            ],
+        }
+    )
+
+
+def check(attr: Attribute, role: RoleDetailData):
+    forked = snapshot.fork(attr)
+    assert vars(forked.enemy) == vars(attr.enemy) and forked.enemy is not attr.enemy
+    assert forked.dmg_bonus == attr.dmg_bonus and forked.dmg_bonus is not attr.dmg_bonus
+    forked.skill_bonus["attack"]["atk"] = 1.0
+    assert attr.skill_bonus["attack"]["atk"] == 0.1
+
+    forked_role = snapshot.fork(role)
+    assert forked_role.model_dump() == role.model_dump()
+    forked_role.phantomData.equipPhantomList[0].level = 1
+    assert role.phantomData.equipPhantomList[0].level == 25
+
+
+def per_copy(copy_func, obj) -> float:
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        copy_func(obj)
+    return (time.perf_counter() - start) / LOOPS
+
+
+def per_card(copy_func, attr, role, lines: int) -> float:
+    start = time.perf_counter()
+    for _ in range(LOOPS):
+        copy_func(role)
+        for _ in range(lines):
+            copy_func(attr)
+    return (time.perf_counter() - start) / LOOPS
+
+
+def main(line_counts):
+    attr = Attribute()
+    role = role_detail()
+    check(attr, role)
+
+    print(f"{'lines':>6} {'deepcopy':>10} {'fork':>10}")
+    for lines in line_counts:
+        deep = per_card(copy.deepcopy, attr, role, lines)
+        fork = per_card(snapshot.fork, attr, role, lines)
+        print(f"{lines:>6} {deep * 1e6:>8.0f}us {fork * 1e6:>8.0f}us")
+    for name, obj in (("attribute", attr), ("role_detail", role)):
+        deep = per_copy(copy.deepcopy, obj)
+        fork = per_copy(snapshot.fork, obj)
+        print(f"{name} copy: {deep * 1e6:.1f}us -> {fork * 1e6:.1f}us")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [6, 10])
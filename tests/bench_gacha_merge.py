@@ -0,0 +1,43 @@
+"""抽卡记录合并基准：已有记录与有重叠的新导入记录合并
+
+用法：python tests/bench_gacha_merge.py [条数 ...]
+原实现为 O(n·m) 的 DP 表，条数超过 3000 时跳过。
+"""
+
+import sys
+import time
+import random
+
+from test_gacha_merge import gacha_merge, make_log, reference_merge
+
+REFERENCE_LIMIT = 3000
+
+
+def build(pulls: int):
+    rng = random.Random(pulls)
+    history = [make_log(rng.randrange(60), pulls - i) for i in range(pulls)]
+    # 新导入的记录：最近的 90 抽加上已有记录中较新的一半
+    new = [make_log(rng.randrange(60), pulls + 90 - i) for i in range(90)]
+    return history, new + history[: pulls // 2]
+
+
+def timed(func, a, b) -> float:
+    start = time.perf_counter()
+    func(a, b)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'pulls':>8} {'reference':>12} {'current':>12}")
+    for pulls in sizes:
+        history, imported = build(pulls)
+        current = timed(gacha_merge.merge_gacha_logs_by_common_subarray, history, imported)
+        if pulls <= REFERENCE_LIMIT:
+            reference = f"{timed(reference_merge, history, imported) * 1000:.1f}ms"
+        else:
+            reference = "skipped"
+        print(f"{pulls:>8} {reference:>12} {current * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [1000, 3000, 10000])
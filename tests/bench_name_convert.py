@@ -0,0 +1,213 @@
+"""别名查找基准：按顺序遍历别名 与 AliasIndex 索引
+
+用法：python tests/bench_name_convert.py [查询次数]
+使用随机生成的别名数据（角色 120、武器 150、合鸣 30、声骸 200），
+先确认全部公开函数与原实现结果一致，再比较单次调用耗时。
+需要完整的 gsuid_core 运行环境。
+"""
+
+import sys
+import time
+import random
+
+from conftest import import_plugin
+
+nc = import_plugin("utils.name_convert")
+SPECIAL_CHAR_RANK_MAP = import_plugin("utils.resource.constant").SPECIAL_CHAR_RANK_MAP
+
+# 少量常用字，制造大量子串重叠
+CHARS = "之风雷光暗冰火夜月星影刃歌鸣潮声骸武器专套"
+
+
+# 替换前的实现，作为参照
+
+
+def old_alias_to_char_name(char_name):
+    for key, aliases in nc.char_alias_data.items():
+        if char_name == key or char_name in aliases:
+            return key
+    for i in nc.char_alias_data:
+        if (char_name in i) or (char_name in nc.char_alias_data[i]):
+            return i
+    return char_name
+
+
+def old_is_valid_char_name(char_name):
+    data = nc.char_alias_data
+    all_names = set(data.keys()) | {alias for aliases in data.values() for alias in aliases}
+    return char_name in sorted(all_names, key=len, reverse=True)
+
+
+def old_alias_to_char_name_optional(char_name):
+    if not char_name:
+        return None
+    for key, aliases in nc.char_alias_data.items():
+        if char_name == key or char_name in aliases:
+            return key
+    for i in nc.char_alias_data:
+        if (char_name in i) or (char_name in nc.char_alias_data[i]):
+            return i
+    return None
+
+
+def old_alias_to_char_name_list(char_name):
+    for key, aliases in nc.char_alias_data.items():
+        if char_name == key or char_name in aliases:
+            return aliases
+    for i in nc.char_alias_data:
+        if (char_name in i) or (char_name in nc.char_alias_data[i]):
+            return nc.char_alias_data[i]
+    return []
+
+
+def old_char_name_to_char_id(char_name):
+    char_name = old_alias_to_char_name(char_name)
+    for id, name in nc.id2name.items():
+        if char_name == name:
+            return SPECIAL_CHAR_RANK_MAP.get(id, id)
+    return None
+
+
+def old_alias_to_weapon_name(weapon_name):
+    for i in nc.weapon_alias_data:
+        if (weapon_name in i) or (weapon_name in nc.weapon_alias_data[i]):
+            return i
+    if "专武" in weapon_name:
+        char_name = weapon_name.replace("专武", "")
+        name = old_alias_to_char_name(char_name)
+        weapon_name = f"{name}专武"
+    for i in nc.weapon_alias_data:
+        if (weapon_name in i) or (weapon_name in nc.weapon_alias_data[i]):
+            return i
+    return weapon_name
+
+
+def old_weapon_name_to_weapon_id(weapon_name):
+    weapon_name = old_alias_to_weapon_name(weapon_name)
+    for id, name in nc.id2name.items():
+        if weapon_name == name:
+            return id
+    return None
+
+
+def old_alias_to_sonata_name(sonata_name):
+    if sonata_name is None:
+        return None
+    normalized_sonata_name = sonata_name.rstrip("套")
+    for i in nc.sonata_alias_data:
+        if normalized_sonata_name in i.rstrip("套"):
+            return i
+        for alias in nc.sonata_alias_data[i]:
+            if normalized_sonata_name in alias.rstrip("套"):
+                return i
+    return None
+
+
+def old_alias_to_echo_name(echo_name):
+    for i, j in nc.echo_alias_data.items():
+        if echo_name == i:
+            return i
+        if echo_name in j:
+            return i
+        for k in j:
+            if k and echo_name in k:
+                return i
+        if echo_name in i:
+            return i
+    return echo_name
+
+
+def old_echo_name_to_echo_id(echo_name):
+    echo_name = old_alias_to_echo_name(echo_name)
+    for id, name in nc.id2name.items():
+        if echo_name == name:
+            return id
+    return None
+
+
+PAIRS = [
+    (old_alias_to_char_name, nc.alias_to_char_name),
+    (old_is_valid_char_name, nc.is_valid_char_name),
+    (old_alias_to_char_name_optional, nc.alias_to_char_name_optional),
+    (old_alias_to_char_name_list, nc.alias_to_char_name_list),
+    (old_char_name_to_char_id, nc.char_name_to_char_id),
+    (old_alias_to_weapon_name, nc.alias_to_weapon_name),
+    (old_weapon_name_to_weapon_id, nc.weapon_name_to_weapon_id),
+    (old_alias_to_sonata_name, nc.alias_to_sonata_name),
+    (old_alias_to_echo_name, nc.alias_to_echo_name),
+    (old_echo_name_to_echo_id, nc.echo_name_to_echo_id),
+]
+
+
+def word(rng: random.Random, lo: int, hi: int) -> str:
+    return "".join(rng.choice(CHARS) for _ in range(rng.randint(lo, hi)))
+
+
+def alias_data(rng: random.Random, count: int, suffix: str = ""):
+    data = {}
+    while len(data) < count:
+        data[word(rng, 2, 5) + suffix] = [word(rng, 1, 4) + rng.choice(["", suffix]) for _ in range(rng.randint(0, 4))]
+    # 与 load_alias_data 一致按名称长度排序
+    return dict(sorted(data.items(), key=lambda item: len(item[0])))
+
+
+def setup(rng: random.Random):
+    nc.char_alias_data = alias_data(rng, 120)
+    nc.weapon_alias_data = alias_data(rng, 150)
+    nc.sonata_alias_data = alias_data(rng, 30, "套")
+    nc.echo_alias_data = alias_data(rng, 200)
+    names = [*nc.char_alias_data, *nc.weapon_alias_data, *nc.echo_alias_data]
+    nc.id2name = {str(1000 + i): name for i, name in enumerate(names)}
+    nc.name2id = {}
+    for id, name in nc.id2name.items():
+        nc.name2id.setdefault(name, id)
+    nc.build_alias_index()
+    # 跳过读取资源文件
+    nc._data_loaded = True
+
+
+def make_queries(rng: random.Random, count: int):
+    known = [
+        name
+        for data in (nc.char_alias_data, nc.weapon_alias_data, nc.sonata_alias_data, nc.echo_alias_data)
+        for key, aliases in data.items()
+        for name in (key, *aliases)
+    ]
+    queries = list(known)
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.4:
+            name = rng.choice(known)
+            i = rng.randrange(len(name))
+            queries.append(name[i : rng.randint(i + 1, len(name))])
+        elif r < 0.5:
+            queries.append(word(rng, 1, 3) + "专武")
+        else:
+            queries.append(word(rng, 1, 4))
+    return queries
+
+
+def timed(func, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        func(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(count: int):
+    rng = random.Random(0)
+    setup(rng)
+    queries = make_queries(rng, count)
+
+    for old, new in PAIRS:
+        for q in queries:
+            assert old(q) == new(q), (new.__name__, q)
+    print(f"{len(queries)} queries, all {len(PAIRS)} helpers match the previous implementation")
+
+    print(f"{'function':<30} {'scan':>10} {'index':>10}")
+    for old, new in PAIRS:
+        print(f"{new.__name__:<30} {timed(old, queries) * 1e6:>8.2f}us {timed(new, queries) * 1e6:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
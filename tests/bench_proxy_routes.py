@@ -0,0 +1,59 @@
+"""WavesApi 请求代理路由开销基准：inspect.stack() 取调用方函数名 与 PROXY_ROUTES 查表
+
+用法：python tests/bench_proxy_routes.py [调用栈深度 ...]
+需要完整的 gsuid_core 运行环境。
+"""
+
+import sys
+import time
+import inspect
+
+from conftest import import_plugin
+
+requests = import_plugin("utils.api.requests")
+PROXY_ROUTES = requests.PROXY_ROUTES
+URL = next(iter(PROXY_ROUTES))
+LOOPS = 200
+
+
+def by_stack(url: str) -> str:
+    # 替换前 _waves_request 中的写法
+    return inspect.stack()[1].function
+
+
+def by_table(url: str) -> str:
+    return PROXY_ROUTES.get(url)
+
+
+def get_role_info(lookup):
+    return lookup(URL)
+
+
+def at_depth(depth: int, func):
+    # 模拟事件循环、命令处理等外层调用栈
+    if depth <= 0:
+        return func()
+    return at_depth(depth - 1, func)
+
+
+def timed(depth: int, lookup) -> float:
+    def run():
+        start = time.perf_counter()
+        for _ in range(LOOPS):
+            get_role_info(lookup)
+        return time.perf_counter() - start
+
+    return at_depth(depth, run) / LOOPS
+
+
+def main(depths):
+    assert at_depth(5, lambda: get_role_info(by_stack)) == "get_role_info"
+    print(f"{'depth':>6} {'inspect.stack':>14} {'PROXY_ROUTES':>14}")
+    for depth in depths:
+        stack = timed(depth, by_stack)
+        table = timed(depth, by_table)
+        print(f"{depth:>6} {stack * 1e6:>12.1f}us {table * 1e6:>12.2f}us")
+
+
+if __name__ == "__main__":
+    main([int(x) for x in sys.argv[1:]] or [10, 30, 60])
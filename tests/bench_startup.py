@@ -0,0 +1,65 @@
+"""启动到可以处理第一条命令的耗时
+
+用法：python tests/bench_startup.py [background|blocking]
+background 为 StartupBackgroundResource 开启（默认），blocking 为等待资源下载完成后再上线。
+分别记录 startup() 返回（上线）的耗时，以及随后第一条面板类命令所需的
+别名查找、角色数据和伤害计算模块加载的耗时；后台模式最后等待资源任务结束。
+
+需要完整的 gsuid_core 运行环境和已下载过一次的资源。
+资源有构建文件更新时会按正常流程重启，请在资源已是最新时运行。
+
+尚未在真实环境中运行过，后台下载前后的首条命令耗时还没有实测数据。
+"""
+
+import sys
+import time
+import asyncio
+
+from conftest import import_plugin
+
+CHAR_NAME = "今汐"
+
+
+def first_command():
+    nc = import_plugin("utils.name_convert")
+    char = import_plugin("utils.ascension.char")
+    abstract = import_plugin("utils.damage.abstract")
+
+    char_id = nc.char_name_to_char_id(nc.alias_to_char_name(CHAR_NAME))
+    char.get_char_detail(char_id, 90, 6)
+    abstract.DamageDetailRegister.find_class(char_id)
+
+
+async def run(background: bool):
+    config = import_plugin("wutheringwaves_config").WutheringWavesConfig
+    resource = import_plugin("wutheringwaves_resource")
+    resource_job = import_plugin("wutheringwaves_resource.resource_job").resource_job
+
+    old = config.get_config("StartupBackgroundResource").data
+    config.set_config("StartupBackgroundResource", background)
+    try:
+        start = time.perf_counter()
+        await resource.startup()
+        ready = time.perf_counter() - start
+
+        first_start = time.perf_counter()
+        first_command()
+        first = time.perf_counter() - first_start
+
+        task = resource_job._task
+        if task is not None:
+            await task
+        total = time.perf_counter() - start
+    finally:
+        config.set_config("StartupBackgroundResource", old)
+
+    print(f"mode: {'background' if background else 'blocking'}")
+    print(f"startup() returned:       {ready:8.2f}s")
+    print(f"first command:            {first:8.2f}s")
+    print(f"time to first command:    {ready + first:8.2f}s")
+    print(f"resource job finished:    {total:8.2f}s")
+
+
+if __name__ == "__main__":
+    mode = sys.argv[1] if len(sys.argv) > 1 else "background"
+    asyncio.run(run(mode != "blocking"))
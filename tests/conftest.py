@@ -0,0 +1,44 @@
+import sys
+import types
+import logging
+import importlib.util
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PLUGIN = ROOT / "XutheringWavesUID"
+
+# 单独加载的模块只用到 gsuid_core.logger，未安装 gsuid_core 时用标准库 logging 代替
+try:
+    import gsuid_core.logger  # noqa: F401
+except ImportError:
+    _core = types.ModuleType("gsuid_core")
+    _core.__path__ = []
+    _logger = types.ModuleType("gsuid_core.logger")
+    _logger.logger = logging.getLogger("gsuid_core")
+    _core.logger = _logger
+    sys.modules.setdefault("gsuid_core", _core)
+    sys.modules.setdefault("gsuid_core.logger", _logger)
+
+
+def load_module(relpath: str, name: str = ""):
+    """按路径单独加载插件内的模块，不执行插件包的 __init__（注册命令等）
+
+    只适用于没有相对导入的模块。
+    """
+    path = PLUGIN / relpath
+    name = name or "_test_" + path.stem
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def import_plugin(dotted: str):
+    """按包名导入插件内的模块，支持相对导入
+
+    会执行插件包的 __init__，需要完整的 gsuid_core 运行环境。
+    """
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    return importlib.import_module(f"XutheringWavesUID.{dotted}")
@@ -0,0 +1,129 @@
+import random
+from datetime import datetime, timedelta
+from typing import List, Tuple, Optional
+
+import pytest
+from conftest import load_module
+
+gacha_merge = load_module("wutheringwaves_gachalog/gacha_merge.py")
+GachaLog = load_module("utils/api/model.py", "_test_api_model").GachaLog
+
+BASE_TIME = datetime(2025, 1, 1)
+
+
+# 替换前的 O(n·m) 实现，作为参照
+def reference_indices(
+    a: List[GachaLog], b: List[GachaLog]
+) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    n, m = len(a), len(b)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    length = 0
+    a_end = b_end = 0
+
+    for i in range(n - 1, -1, -1):
+        for j in range(m - 1, -1, -1):
+            if a[i].match_key() == b[j].match_key():
+                dp[i][j] = dp[i + 1][j + 1] + 1
+                if dp[i][j] > length:
+                    length = dp[i][j]
+                    a_end = i + length - 1
+                    b_end = j + length - 1
+            else:
+                dp[i][j] = 0
+
+    if length == 0:
+        return None
+
+    return (a_end - length + 1, a_end), (b_end - length + 1, b_end)
+
+
+def reference_merge(a: List[GachaLog], b: List[GachaLog]) -> List[GachaLog]:
+    common_indices = reference_indices(a, b)
+    if not common_indices:
+        return sorted(
+            a + b,
+            key=lambda log: datetime.strptime(log.time, "%Y-%m-%d %H:%M:%S"),
+            reverse=True,
+        )
+
+    (a_start, a_end), (b_start, b_end) = common_indices
+    prefix = reference_merge(a[:a_start], b[:b_start])
+    suffix = reference_merge(a[a_end + 1 :], b[b_end + 1 :])
+    return prefix + a[a_start : a_end + 1] + suffix
+
+
+def make_log(resource_id: int, minute: int, resource_type: str = "角色") -> GachaLog:
+    return GachaLog(
+        cardPoolType="角色精准调谐",
+        resourceId=resource_id,
+        qualityLevel=3 + resource_id % 3,
+        resourceType=resource_type,
+        name=f"物品{resource_id}",
+        count=1,
+        time=(BASE_TIME + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def random_logs(rng: random.Random, length: int, alphabet: int, minutes: int) -> List[GachaLog]:
+    # 字母表和时间范围都很小，以制造大量重复项和相同时间（十连）
+    return [
+        make_log(rng.randrange(alphabet), rng.randrange(minutes), rng.choice(["角色", "武器"]))
+        for _ in range(length)
+    ]
+
+
+def overlapping_pair(rng: random.Random, length: int, alphabet: int, minutes: int):
+    # 模拟已有记录与新导入记录：两者共享中间一段，各自带有不同的头尾
+    shared = random_logs(rng, length, alphabet, minutes)
+    a_cut = rng.randrange(length + 1)
+    b_cut = rng.randrange(length + 1)
+    a = random_logs(rng, rng.randrange(4), alphabet, minutes) + shared[:a_cut]
+    b = shared[b_cut:] + random_logs(rng, rng.randrange(4), alphabet, minutes)
+    return a, b
+
+
+def test_disjoint_and_empty():
+    a = [make_log(1, 0), make_log(2, 1)]
+    b = [make_log(3, 2)]
+    assert gacha_merge.find_longest_common_subarray_indices(a, b) is None
+    assert gacha_merge.find_longest_common_subarray_indices([], b) is None
+    assert gacha_merge.find_longest_common_subarray_indices(a, []) is None
+
+
+def test_ignores_resource_type():
+    a = [make_log(1, 0, "角色"), make_log(2, 0, "角色")]
+    b = [make_log(1, 0, "武器"), make_log(2, 0, "武器")]
+    assert gacha_merge.find_longest_common_subarray_indices(a, b) == ((0, 1), (0, 1))
+
+
+def test_tie_breaks_like_reference():
+    # 同样长度的公共段出现多次时，与原实现取同一段
+    a = [make_log(1, 0), make_log(1, 0), make_log(1, 0)]
+    b = [make_log(1, 0), make_log(1, 0)]
+    assert gacha_merge.find_longest_common_subarray_indices(a, b) == reference_indices(a, b)
+
+
+@pytest.mark.parametrize("alphabet", [1, 2, 3, 8])
+@pytest.mark.parametrize("minutes", [1, 3, 50])
+def test_indices_match_reference(alphabet, minutes):
+    rng = random.Random(alphabet * 1000 + minutes)
+    for _ in range(150):
+        a = random_logs(rng, rng.randrange(25), alphabet, minutes)
+        b = random_logs(rng, rng.randrange(25), alphabet, minutes)
+        assert gacha_merge.find_longest_common_subarray_indices(a, b) == reference_indices(a, b)
+
+
+@pytest.mark.parametrize("alphabet", [1, 2, 4, 20])
+@pytest.mark.parametrize("minutes", [1, 5, 200])
+def test_merge_matches_reference(alphabet, minutes):
+    rng = random.Random(alphabet * 7919 + minutes)
+    for _ in range(100):
+        if rng.random() < 0.5:
+            a, b = overlapping_pair(rng, rng.randrange(1, 30), alphabet, minutes)
+        else:
+            a = random_logs(rng, rng.randrange(20), alphabet, minutes)
+            b = random_logs(rng, rng.randrange(20), alphabet, minutes)
+        merged = gacha_merge.merge_gacha_logs_by_common_subarray(a, b)
+        expected = reference_merge(a, b)
+        # 逐条比较同一对象，连 resourceType 的来源也必须一致
+        assert [id(log) for log in merged] == [id(log) for log in expected]
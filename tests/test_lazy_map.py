@@ -0,0 +1,33 @@
+import json
+
+from conftest import load_module
+
+lazy_map = load_module("utils/ascension/lazy_map.py")
+
+
+def make_map(tmp_path, count: int, capacity: int):
+    for i in range(count):
+        (tmp_path / f"{i}.json").write_text(json.dumps({"name": f"名称{i}", "value": i}), encoding="utf-8")
+    return lazy_map.LazyJsonMap(tmp_path, capacity=capacity)
+
+
+def test_get_keeps_lru(tmp_path):
+    data = make_map(tmp_path, 5, capacity=2)
+    for key in ("0", "1", "0", "2"):
+        assert data[key]["value"] == int(key)
+    assert list(data._entries) == ["0", "2"]
+    assert data.get("9") is None
+    assert "4" in data and len(data) == 5
+
+
+def test_items_does_not_evict_hot_entries(tmp_path):
+    data = make_map(tmp_path, 20, capacity=3)
+    hot = {key: data[key] for key in ("1", "2")}
+
+    items = dict(data.items())
+    assert sorted(items, key=int) == [str(i) for i in range(20)]
+    assert all(items[key]["value"] == int(key) for key in items)
+    # 遍历不放入 LRU，已缓存的条目原样保留
+    assert list(data._entries) == ["1", "2"]
+    assert all(data._entries[key] is value for key, value in hot.items())
+    assert [v["value"] for v in data.values()] == [items[k]["value"] for k in items]
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+from conftest import load_module
+
+orb_index = load_module("wutheringwaves_charinfo/orb_index.py")
+
+
+def _feat(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    pts = rng.random((rows, 2), dtype=np.float32) * 1000
+    des = rng.integers(0, 256, (rows, orb_index.DES_BYTES), dtype=np.uint8)
+    return pts, des
+
+
+def _check(path, expected):
+    # 新建实例，只从磁盘读取
+    index = orb_index.OrbIndex(path)
+    meta = index._load()[1]
+    assert set(meta["entries"]) == set(expected)
+    for name, (mtime_ns, (pts, des)) in expected.items():
+        got = index.get(name, mtime_ns)
+        assert got is not None, name
+        np.testing.assert_array_equal(got[0], pts)
+        np.testing.assert_array_equal(got[1], des)
+
+
+def test_put_replace_remove_compact(tmp_path):
+    index = orb_index.OrbIndex(tmp_path)
+    expected = {}
+
+    def put(name, rows, seed):
+        feat = _feat(rows, seed)
+        index.put(name, seed, feat)
+        expected[name] = (seed, feat)
+        _check(tmp_path, expected)
+
+    put("a", 100, 1)
+    put("b", 100, 2)
+    put("a", 50, 3)
+    index.remove("b")
+    expected.pop("b")
+    _check(tmp_path, expected)
+    put("c", 100, 4)
+    # 替换 c 后已删除的行超过一半，追加和整理发生在同一次提交中
+    put("c", 20, 5)
+
+    meta = orb_index.OrbIndex(tmp_path)._load()[1]
+    assert meta["dead"] == 0
+    assert meta["rows"] == 70
+    assert (tmp_path / "_index.des").stat().st_size == 70 * orb_index.DES_BYTES
+    assert (tmp_path / "_index.pts").stat().st_size == 70 * 2 * 4
+
+
+def test_sync_compacts_after_replacing_images(tmp_path):
+    for i in range(4):
+        (tmp_path / f"{i}.png").write_bytes(b"x")
+        os.utime(tmp_path / f"{i}.png", ns=(10**9, 10**9))
+    images = sorted(tmp_path.glob("*.png"))
+    seeds = {p.name: i for i, p in enumerate(images)}
+    index = orb_index.OrbIndex(tmp_path)
+    index.sync(images, lambda p: _feat(40, seeds[p.name]))
+
+    # 反复修改三张图片后同步，旧行被标记删除，超过一半后触发整理
+    for _ in range(2):
+        for p in images[:3]:
+            seeds[p.name] += 10
+            os.utime(p, ns=(seeds[p.name] * 10**9, seeds[p.name] * 10**9))
+        index.sync(images, lambda p: _feat(40, seeds[p.name]))
+
+    expected = {p.name: (p.stat().st_mtime_ns, _feat(40, seeds[p.name])) for p in images}
+    _check(tmp_path, expected)
+    assert orb_index.OrbIndex(tmp_path)._load()[1]["dead"] == 0
+
+
+@pytest.mark.parametrize("rows", [1, 300])
+def test_shortlist_finds_indexed_image(tmp_path, rows):
+    index = orb_index.OrbIndex(tmp_path)
+    for i in range(5):
+        index.put(f"{i}.png", i, _feat(rows, i))
+    _, des = _feat(rows, 3)
+    assert index.shortlist(des, 1) == ["3.png"]
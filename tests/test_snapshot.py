@@ -0,0 +1,138 @@
+import copy
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+from conftest import load_module
+
+snapshot = load_module("utils/damage/snapshot.py")
+
+ATOMIC = (type(None), int, float, bool, str, bytes)
+
+
+def assert_same_graph(original, forked, expected):
+    """forked 与 deepcopy 的结果 expected 结构相同：类型、值和对象之间的共享关系一致，
+    并且可变对象都不与 original 共享"""
+    pairs: Dict[int, int] = {}
+
+    def walk(o, f, e):
+        assert type(f) is type(e)
+        if isinstance(e, ATOMIC):
+            assert f == e
+            return
+        if id(e) in pairs:
+            # deepcopy 中共享的对象，fork 中也必须共享同一个副本
+            assert pairs[id(e)] == id(f)
+            return
+        pairs[id(e)] = id(f)
+        if not isinstance(o, (tuple, frozenset)):
+            assert f is not o
+        if isinstance(e, dict):
+            assert list(f) == list(e)
+            for k in e:
+                walk(o[k], f[k], e[k])
+        elif isinstance(e, (list, tuple)):
+            assert len(f) == len(e)
+            for oi, fi, ei in zip(o, f, e):
+                walk(oi, fi, ei)
+        elif isinstance(e, (set, frozenset)):
+            assert f == e
+        if hasattr(e, "__dict__"):
+            walk(vars(o), vars(f), vars(e))
+
+    walk(original, forked, expected)
+
+
+class Enemy:
+    def __init__(self):
+        self.level = 90
+        self.resistance = {"冷凝": 0.1, "热熔": 0.2}
+
+
+class Bonus(dict):
+    pass
+
+
+class Effects(list):
+    pass
+
+
+class Attribute:
+    def __init__(self):
+        self.atk = 1000.0
+        self.tags = ("a", "b")
+        self.nested = ([1], {"k": [2]})
+        self.bonus = Bonus(a=[1], b={"c": 2})
+        self.bonus.note = ["x"]
+        self.effects = Effects([("效果", 1), ["可变"]])
+        self.flags = {1, 2}
+        self.enemy = Enemy()
+        # 同一个对象在多处引用
+        self.shared = [1, 2]
+        self.alias = self.shared
+        self.enemy_again = self.enemy
+        # 引用自身
+        self.me = self
+        self.loop = [self.shared]
+        self.loop.append(self.loop)
+
+
+class Phantom(BaseModel):
+    level: int
+    props: List[str]
+
+
+class Panel(BaseModel):
+    uid: str
+    phantoms: List[Phantom]
+    extra: Optional[Dict[str, List[int]]] = None
+
+
+def test_matches_deepcopy():
+    attr = Attribute()
+    assert_same_graph(attr, snapshot.fork(attr), copy.deepcopy(attr))
+
+
+def test_fork_is_independent():
+    attr = Attribute()
+    forked = snapshot.fork(attr)
+    forked.bonus["a"].append(2)
+    forked.bonus.note.append("y")
+    forked.effects[1].append("改")
+    forked.nested[0].append(9)
+    forked.shared.append(3)
+    forked.enemy.resistance["冷凝"] = 0.5
+    assert attr.bonus["a"] == [1]
+    assert attr.bonus.note == ["x"]
+    assert attr.effects[1] == ["可变"]
+    assert attr.nested[0] == [1]
+    assert attr.shared == [1, 2]
+    assert attr.enemy.resistance["冷凝"] == 0.1
+    # 共享关系和循环引用在副本内部保持
+    assert forked.alias is forked.shared
+    assert forked.enemy_again is forked.enemy
+    assert forked.me is forked
+    assert forked.loop[1] is forked.loop
+    assert forked.loop[0] is forked.shared
+
+
+def test_container_subclasses():
+    value = {"d": Bonus(a=[1]), "l": Effects([[1]])}
+    forked = snapshot.fork(value)
+    assert_same_graph(value, forked, copy.deepcopy(value))
+    forked["d"]["a"].append(2)
+    forked["l"][0].append(2)
+    assert value == {"d": {"a": [1]}, "l": [[1]]}
+
+
+def test_pydantic_model():
+    panel = Panel(
+        uid="100000001",
+        phantoms=[Phantom(level=25, props=["暴击"]), Phantom(level=20, props=[])],
+        extra={"a": [1]},
+    )
+    forked = snapshot.fork(panel)
+    assert forked.model_dump() == panel.model_dump()
+    forked.phantoms[0].props.append("攻击")
+    forked.extra["a"].append(2)
+    assert panel.phantoms[0].props == ["暴击"]
+    assert panel.extra == {"a": [1]}